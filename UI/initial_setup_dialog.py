@@ -1,9 +1,13 @@
+import threading
+import time
+
 from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QWidget, QLabel, QLineEdit, QPushButton,
-    QMessageBox
+    QMessageBox, QProgressBar
 )
 from PyQt6.QtGui import QMovie, QPixmap, QDesktopServices
-from PyQt6.QtCore import Qt, QUrl, QSettings
+from PyQt6.QtCore import Qt, QUrl, QSettings, QObject, QThread, pyqtSignal
+import requests
 
 from UI.collapsible_sidebar import CollapsibleSidebar
 from UI.footer import FooterWidget
@@ -12,6 +16,7 @@ from UI.signals import on_settings, on_show_doc
 from core.resources import resource_path, get_icon_path, get_logo_path
 from core.update_checker import get_update_checker
 from core.version import __app_version__
+from core import http_client
 from core.cabbage_service import fetch_event_data as cabbage_fetch_event_data
 from core.cabbage_service import process_data as cabbage_process_data
 from core.timeful_service import fetch_event_data as timeful_fetch_event_data
@@ -51,6 +56,74 @@ def parse_timeful_link(raw_input: str) -> str:
     return raw_input
 
 
+# note: fetch threads (and their workers) are kept here until they finish, the dialog may be gone by then
+_fetch_threads = set()
+
+
+class FetchWorker(QObject):
+    """
+    Worker fetching and parsing poll data off the GUI thread.
+    Emits received(bytes, total_bytes) during the download (total_bytes is 0 when unknown),
+    parsed(done, total) for every processed respondent and finished(result, error) at the end,
+    where result is (participants, poll_dates, day_ranges) and error the raised exception.
+
+    Progress is emitted at most once per PROGRESS_INTERVAL seconds (and for the last respondent).
+    cancel() may be called from the UI thread; the download stops after the current chunk
+    and finished carries http_client.FetchCancelled.
+    """
+    received = pyqtSignal(int, int)
+    parsed = pyqtSignal(int, int)
+    finished = pyqtSignal(object, object)
+
+    PROGRESS_INTERVAL = 0.1
+
+    def __init__(self, fetch_event_data, process_data, event_url, time_offset_hours, parent=None):
+        """
+        Initialize the worker with the fetch and process functions of a service.
+        """
+        super().__init__(parent)
+        self.fetch_event_data = fetch_event_data
+        self.process_data = process_data
+        self.event_url = event_url
+        self.time_offset_hours = time_offset_hours
+        self._cancel = threading.Event()
+        self._last_emit = 0.0
+
+    def cancel(self):
+        """
+        Request cancellation of the fetch.
+        """
+        self._cancel.set()
+
+    def _throttled(self, signal):
+        """
+        Progress callback emitting signal at most once per PROGRESS_INTERVAL.
+        """
+        def emit(done, total):
+            now = time.monotonic()
+            if now - self._last_emit >= self.PROGRESS_INTERVAL or done == total:
+                self._last_emit = now
+                signal.emit(done, total)
+        return emit
+
+    def run(self):
+        """
+        Fetch and process the event data and emit the result.
+        """
+        try:
+            json_resp = self.fetch_event_data(
+                self.event_url, on_progress=self._throttled(self.received), cancel=self._cancel
+            )
+            result = self.process_data(
+                json_resp, time_offset_hours=self.time_offset_hours, on_progress=self._throttled(self.parsed)
+            )
+            if self._cancel.is_set():
+                raise http_client.FetchCancelled()
+            self.finished.emit(result, None)
+        except Exception as e:
+            self.finished.emit(None, e)
+
+
 class InitialSetupDialog(QDialog):
     """
     Dialog for the initial setup of Harmobot.
@@ -68,6 +141,7 @@ class InitialSetupDialog(QDialog):
         self.loaded_participants = []
         self.loaded_poll_dates = []
         self.loaded_day_ranges = None
+        self.fetch_worker = None
 
         main_layout = QVBoxLayout(self)
         main_layout.setContentsMargins(0, 0, 0, 0)
@@ -124,6 +198,13 @@ class InitialSetupDialog(QDialog):
         self.fetch_button.clicked.connect(self.on_fetch_data)
         self.center_layout.addWidget(self.fetch_button, alignment=Qt.AlignmentFlag.AlignCenter)
 
+        # Fetch progress (visible while fetching)
+        self.fetch_progress = QProgressBar()
+        self.fetch_progress.setFixedWidth(400)
+        self.fetch_progress.setTextVisible(True)
+        self.fetch_progress.hide()
+        self.center_layout.addWidget(self.fetch_progress, alignment=Qt.AlignmentFlag.AlignCenter)
+
         # Error label
         self.error_label = QLabel("")
         self.error_label.setStyleSheet("color: red; font-size: 10px;")
@@ -213,37 +294,144 @@ class InitialSetupDialog(QDialog):
         """
         Enable or disable the fetch button based on the URL input.
         """
-        self.fetch_button.setEnabled(bool(text.strip()))
+        self.fetch_button.setEnabled(self.fetch_worker is not None or bool(text.strip()))
 
     def on_fetch_data(self):
         """
-        Fetch event data using the selected engine.
+        Fetch event data using the selected engine in a background thread.
+        Clicked again while fetching, the button cancels the fetch.
         """
+        if self.fetch_worker is not None:
+            self.on_fetch_cancel()
+            return
+
         raw_input = self.event_id_edit.text().strip()
         if not raw_input:
             self.show_error("Proszę wpisać pełny URL wydarzenia.")
             return
 
         self.error_label.setText("")
+        self.read_timeout = int(self.settings.value("http_timeout", 30))
+        http_client.configure(
+            read_timeout=self.read_timeout,
+            offline=self.settings.value("offline_mode", False, type=bool)
+        )
         try:
             if self.current_engine == "Cabbage":
                 event_url = parse_cabbage_link(raw_input)
-                json_resp = cabbage_fetch_event_data(event_url)
+                fetch, process = cabbage_fetch_event_data, cabbage_process_data
                 timezone_offset = int(self.settings.value("timezone_cabbage", 1))
-                participants, dates, day_ranges = cabbage_process_data(json_resp, time_offset_hours=timezone_offset)
-                self.loaded_engine = "Cabbage"
             else:
                 event_url = parse_timeful_link(raw_input)
-                json_resp = timeful_fetch_event_data(event_url)
+                fetch, process = timeful_fetch_event_data, timeful_process_data
                 timezone_offset = int(self.settings.value("timezone_timeful", 1))
-                participants, dates, day_ranges = timeful_process_data(json_resp, time_offset_hours=timezone_offset)
-                self.loaded_engine = "Timeful"
-            self.loaded_participants = participants
-            self.loaded_poll_dates = dates
-            self.loaded_day_ranges = day_ranges
-            self.accept()
-        except Exception as e:
+        except ValueError as e:
             self.show_error(str(e))
+            return
+
+        self.fetch_engine = self.current_engine
+        self._set_fetching(True)
+        fetch_thread = QThread()
+        worker = self.fetch_worker = FetchWorker(fetch, process, event_url, timezone_offset)
+        self.fetch_worker.moveToThread(fetch_thread)
+        fetch_thread.started.connect(self.fetch_worker.run)
+        # note: the worker is passed along, sender() is gone once deleteLater has run
+        self.fetch_worker.received.connect(lambda received, total: self.on_fetch_received(worker, received, total))
+        self.fetch_worker.parsed.connect(lambda done, total: self.on_fetch_parsed(worker, done, total))
+        self.fetch_worker.finished.connect(lambda result, error: self.on_fetch_finished(worker, result, error))
+        self.fetch_worker.finished.connect(fetch_thread.quit)
+        self.fetch_worker.finished.connect(self.fetch_worker.deleteLater)
+        fetch_thread.finished.connect(lambda: _fetch_threads.discard(fetch_thread))
+        fetch_thread.finished.connect(fetch_thread.deleteLater)
+        # note: keeps the worker alive as well when the dialog drops it on cancel
+        fetch_thread.worker = self.fetch_worker
+        _fetch_threads.add(fetch_thread)
+        fetch_thread.start()
+
+    def on_fetch_cancel(self):
+        """
+        Cancel the running fetch. The dialog is usable again right away, the worker's
+        result is ignored when it arrives.
+        """
+        if self.fetch_worker is None:
+            return
+        self.fetch_worker.cancel()
+        self.fetch_worker = None
+        self._set_fetching(False)
+        self.show_error("Anulowano pobieranie danych.")
+
+    def _set_fetching(self, fetching: bool):
+        """
+        Switch the fetch button and progress bar between the idle and fetching states.
+        """
+        self.fetch_button.setText("Anuluj" if fetching else "Pobierz dane")
+        self.event_id_edit.setEnabled(not fetching)
+        self.fetch_progress.setVisible(fetching)
+        if fetching:
+            # info: busy indicator until the first chunk arrives
+            self.fetch_progress.setRange(0, 0)
+            self.fetch_progress.setFormat("Łączenie z serwerem...")
+        else:
+            self.toggle_fetch_button(self.event_id_edit.text())
+
+    def on_fetch_received(self, worker, received: int, total: int):
+        """
+        Show the download progress.
+        """
+        if worker is not self.fetch_worker:
+            return
+        if total >= received > 0:
+            self.fetch_progress.setRange(0, total)
+            self.fetch_progress.setValue(received)
+        else:
+            self.fetch_progress.setRange(0, 0)
+        self.fetch_progress.setFormat(f"Pobrano {received / 1024:.0f} kB")
+
+    def on_fetch_parsed(self, worker, done: int, total: int):
+        """
+        Show the parsing progress.
+        """
+        if worker is not self.fetch_worker:
+            return
+        self.fetch_progress.setRange(0, max(1, total))
+        self.fetch_progress.setValue(done)
+        self.fetch_progress.setFormat(f"Wczytano uczestników: {done} z {total}")
+
+    def on_fetch_finished(self, worker, result, error):
+        """
+        Accept the dialog with the fetched data or show the error.
+        """
+        if worker is not self.fetch_worker:
+            # info: result of a cancelled fetch
+            return
+        self.fetch_worker = None
+        self._set_fetching(False)
+        if error is None:
+            self.loaded_participants, self.loaded_poll_dates, self.loaded_day_ranges = result
+            self.loaded_engine = self.fetch_engine
+            self.accept()
+        elif isinstance(error, http_client.FetchCancelled):
+            return
+        elif isinstance(error, http_client.NotCached):
+            self.show_error("Brak zapisanej kopii tej ankiety. Wyłącz tryb offline w ustawieniach, aby ją pobrać.")
+        elif isinstance(error, requests.Timeout):
+            self.show_error(f"Serwer nie odpowiedział w ciągu {self.read_timeout} s. Spróbuj ponownie później.")
+        elif isinstance(error, requests.ConnectionError):
+            self.show_error(
+                "Nie udało się połączyć z serwerem. Sprawdź połączenie z internetem "
+                "lub włącz tryb offline, aby użyć zapisanej kopii ankiety."
+            )
+        else:
+            self.show_error(str(error))
+
+    def done(self, result):
+        """
+        Cancel a running fetch when the dialog is closed.
+        """
+        if self.fetch_worker is not None:
+            self.fetch_worker.cancel()
+            self.fetch_worker = None
+        super().done(result)
 
     def show_error(self, message: str):
         """
@@ -1,8 +1,10 @@
+import time as wall_clock
+from collections import defaultdict
 from datetime import time
 
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QSplitter, QMessageBox,
-    QPushButton, QFormLayout, QSpinBox, QDialog, QProgressDialog, QFrame
+    QPushButton, QFormLayout, QSpinBox, QDialog, QProgressDialog, QFrame, QCheckBox, QLabel, QComboBox
 )
 from PyQt6.QtCore import Qt, QThread, pyqtSignal, QObject, QSettings
 
@@ -13,8 +15,18 @@ from UI.footer import FooterWidget
 from UI.collapsible_sidebar import CollapsibleSidebar
 from UI.signals import on_settings, on_show_doc, on_load_from_csv, on_export_to_csv, on_export_to_html, on_export_to_png
 from UI.day_selection_widget import DaySelectionWidget
-
-from core.scheduler import build_day_slots, assign_shifts
+from UI.sweep_dialog import SweepResultsDialog
+
+from core.scheduler import build_day_slots, assign_shifts, hint_retention, SolveControl, ModelCache, ShiftModel
+from core.symmetry import assign_shifts_grouped
+from core.slot_blocks import assign_shifts_aggregated
+from core.sweep import run_sweep
+from core.portfolio import run_portfolio
+from core.decomposition import assign_shifts_decomposed
+from core.greedy import assign_shifts_greedy
+from core.lns import assign_shifts_lns
+from core.coarse_to_fine import assign_shifts_coarse_to_fine
+from core.availability_index import AvailabilityIndex
 from core.update_checker import get_update_checker
 from core.resources import resource_path, get_icon_path
 from core.version import __app_version__
@@ -23,15 +35,38 @@ from core.version import __app_version__
 class SolverWorker(QObject):
     """
     Worker for solving shift assignments.
-    Emits progress and finished signals.
+    Emits progress, incumbent and finished signals.
+
+    progress carries a status line for every improving solution (objective, best bound,
+    gap and wall time); incumbent carries the latest solution as schedule_data, at most
+    once per INCUMBENT_INTERVAL seconds.
+
+    stop() may be called from the UI thread; the solver then stops and the best solution
+    found so far is emitted through finished as usual.
     """
     finished = pyqtSignal(object, object)
     progress = pyqtSignal(str)
+    incumbent = pyqtSignal(object)
+
+    INCUMBENT_INTERVAL = 1.0
 
     def __init__(self, participants, slot_list, num_required, min_required,
-                max_hours, max_hours_per_day, solver_time_limit, solver_num_threads, parent=None):
+                max_hours, max_hours_per_day, solver_time_limit, solver_num_threads,
+                availability_index=None, symmetry_reduction=False, aggregate_slots=False,
+                hint_schedule=None, relative_gap_limit=0.0, no_improvement_time=0, model_cache=None,
+                portfolio_size=1, decomposition="none", lns=False, pinned_schedule=None,
+                pinned_slots=None, pinned_names=None, formulation="standard", relax=False, coarse_minutes=0,
+                parent=None):
         """
         Initialize the worker.
+
+        With lns=True the schedule is improved by large neighbourhood search starting
+        from hint_schedule. With pinned_schedule only its unpinned part is re-solved
+        (see assign_shifts), bending the limits the pins conflict with if relax is set.
+        In both cases the symmetry, aggregation, portfolio and
+        decomposition options are not used. formulation selects the CP-SAT model
+        (see ShiftModel); the grouped model ignores it. coarse_minutes > 0 solves a coarser grid
+        first (see core.coarse_to_fine) instead of aggregating slots.
         """
         super().__init__(parent)
         self.participants = participants
@@ -42,13 +77,95 @@ class SolverWorker(QObject):
         self.max_hours_per_day = max_hours_per_day
         self.solver_time_limit = solver_time_limit
         self.solver_num_threads = solver_num_threads
+        self.availability_index = availability_index
+        self.symmetry_reduction = symmetry_reduction
+        self.aggregate_slots = aggregate_slots
+        self.hint_schedule = hint_schedule
+        self.control = SolveControl(relative_gap_limit, no_improvement_time)
+        self.model_cache = model_cache
+        self.portfolio_size = portfolio_size
+        self.decomposition = decomposition
+        self.lns = lns
+        self.pinned_schedule = pinned_schedule
+        self.pinned_slots = pinned_slots
+        self.pinned_names = pinned_names
+        self.formulation = formulation
+        self.relax = relax
+        self.coarse_minutes = coarse_minutes
+        self._last_incumbent_time = None
+
+    def stop(self):
+        """
+        Ask the running solver to stop and keep its best solution.
+        """
+        self.control.stop()
+
+    def on_solution(self, progress):
+        """
+        Solver callback (runs in the solver thread): forward progress to the UI.
+        """
+        self.progress.emit(
+            f"Rozwiązanie: {progress['objective']:.0f} (granica {progress['best_bound']:.0f}, "
+            f"luka {100 * progress['gap']:.1f}%), {progress['wall_time']:.1f} s"
+        )
+        now = wall_clock.monotonic()
+        if self._last_incumbent_time is None or now - self._last_incumbent_time >= self.INCUMBENT_INTERVAL:
+            self._last_incumbent_time = now
+            self.incumbent.emit(progress['schedule_data'])
+
+    def _build_engine(self):
+        """
+        Chain the solver wrappers selected in the settings.
+
+        Returns:
+            tuple: (solve, extra_args) for the outermost engine.
+        """
+        decompose = self.decomposition in ("day", "week")
+        solve = assign_shifts_grouped if self.symmetry_reduction and not decompose else assign_shifts
+        extra_args = {}
+        if solve is assign_shifts:
+            extra_args['formulation'] = self.formulation
+        if solve is assign_shifts and self.model_cache is not None and self.portfolio_size <= 1 and not decompose:
+            extra_args['model_cache'] = self.model_cache
+        if self.coarse_minutes:
+            extra_args['solve'] = solve
+            extra_args['coarse_minutes'] = self.coarse_minutes
+            solve = assign_shifts_coarse_to_fine
+        elif self.aggregate_slots:
+            extra_args['solve'] = solve
+            solve = assign_shifts_aggregated
+        if decompose:
+            extra_args['engine'] = solve
+            extra_args['split_by'] = self.decomposition
+            solve = assign_shifts_decomposed
+        elif self.portfolio_size > 1:
+            extra_args['engine'] = solve
+            extra_args['members'] = self.portfolio_size
+            solve = run_portfolio
+        return solve, extra_args
 
     def run(self):
         """
         Execute the solver and emit the final result.
         """
         self.progress.emit("Liczenie...")
-        schedule_data, total_hrs = assign_shifts(
+        if self.lns:
+            solve, extra_args = assign_shifts_lns, {
+                'model_cache': self.model_cache,
+                'formulation': self.formulation,
+            }
+        elif self.pinned_schedule is not None:
+            solve, extra_args = assign_shifts, {
+                'model_cache': self.model_cache,
+                'pinned_schedule': self.pinned_schedule,
+                'pinned_slots': self.pinned_slots,
+                'pinned_names': self.pinned_names,
+                'formulation': self.formulation,
+                'relax': self.relax,
+            }
+        else:
+            solve, extra_args = self._build_engine()
+        schedule_data, total_hrs = solve(
             participants=self.participants,
             slot_list=self.slot_list,
             num_required=self.num_required,
@@ -56,12 +173,63 @@ class SolverWorker(QObject):
             max_hours=self.max_hours,
             max_hours_per_day=self.max_hours_per_day,
             solver_time_limit=self.solver_time_limit,
-            solver_num_threads=self.solver_num_threads
+            solver_num_threads=self.solver_num_threads,
+            availability_index=self.availability_index,
+            hint_schedule=self.hint_schedule,
+            on_solution=self.on_solution,
+            control=self.control,
+            **extra_args
         )
         self.progress.emit("Zakończono liczenie.")
         self.finished.emit(schedule_data, total_hrs)
 
 
+class SweepWorker(QObject):
+    """
+    Worker running a parameter sweep (see core.sweep.run_sweep).
+    Emits progress(done, total) after every solved point and finished(results) at the end.
+    """
+    finished = pyqtSignal(object)
+    progress = pyqtSignal(int, int)
+
+    def __init__(self, participants, slot_list, num_required, min_required,
+                max_hours, max_hours_per_day, solver_time_limit, max_workers,
+                availability_index=None, parent=None):
+        """
+        Initialize the worker.
+        """
+        super().__init__(parent)
+        self.participants = participants
+        self.slot_list = slot_list
+        self.num_required = num_required
+        self.min_required = min_required
+        self.max_hours = max_hours
+        self.max_hours_per_day = max_hours_per_day
+        self.solver_time_limit = solver_time_limit
+        self.max_workers = max_workers
+        self.availability_index = availability_index
+        self.control = SolveControl()
+
+    def run(self):
+        """
+        Execute the sweep and emit the results.
+        """
+        results = run_sweep(
+            participants=self.participants,
+            slot_list=self.slot_list,
+            num_required=self.num_required,
+            min_required=self.min_required,
+            max_hours=self.max_hours,
+            max_hours_per_day=self.max_hours_per_day,
+            solver_time_limit=self.solver_time_limit,
+            max_workers=self.max_workers,
+            availability_index=self.availability_index,
+            on_result=self.progress.emit,
+            control=self.control
+        )
+        self.finished.emit(results)
+
+
 class MainWindow(QMainWindow):
     """
     Main application window.
@@ -81,6 +249,10 @@ class MainWindow(QMainWindow):
         self.participants = []
         self.poll_dates = []
         self.day_ranges = None
+        self.availability_index = None
+        self.hint_schedule = None
+        self.pinned_schedule = None
+        self.model_cache = ModelCache()
         self.full_slots = []
         self.day_slots_dict = {}
         self.current_highlight_person = None
@@ -158,6 +330,10 @@ class MainWindow(QMainWindow):
         """
         Initialize the schedule table using participants and poll dates.
         """
+        self.availability_index = AvailabilityIndex(self.participants)
+        # info: models of the previous poll can never be hit again
+        self.model_cache.clear()
+        self.schedule_widget.clear_pins(refresh=False)
         shift_duration = 15 if self.engine_name == "Timeful" else 30
         self.day_slots_dict, self.full_slots = build_day_slots(
             self.participants,
@@ -177,7 +353,8 @@ class MainWindow(QMainWindow):
             schedule_data=schedule_data,
             participants=self.participants,
             poll_dates=self.poll_dates,
-            time_slot_list=time_slot_list
+            time_slot_list=time_slot_list,
+            availability_index=self.availability_index
         )
 
     def _create_param_frame(self):
@@ -218,10 +395,43 @@ class MainWindow(QMainWindow):
         form_layout.addRow("Max godzin/osoba:", self.max_hours_spin)
         form_layout.addRow("Max godz/os/dzień:", self.max_hours_per_day_spin)
 
+        self.mode_combo = QComboBox()
+        self.mode_combo.addItem("Optymalny", "optimal")
+        self.mode_combo.addItem("Szybki szkic", "draft")
+        self.mode_combo.addItem("Ulepszanie (LNS)", "lns")
+        self.mode_combo.setToolTip(
+            "Optymalny: pełne liczenie solverem (do limitu czasu z ustawień).\n"
+            "Szybki szkic: natychmiastowy grafik heurystyczny do dalszej ręcznej edycji.\n"
+            "Ulepszanie (LNS): obecny grafik (lub szybki szkic) jest poprawiany fragmentami\n"
+            "przez cały limit czasu; dobre wyniki od pierwszych sekund przy bardzo dużych ankietach."
+        )
+        form_layout.addRow("Tryb:", self.mode_combo)
+
+        self.warm_start_check = QCheckBox("Start od obecnego grafiku")
+        self.warm_start_check.setToolTip(
+            "Obecny grafik (ostatni wynik lub ręczne zmiany) jest podawany solverowi jako podpowiedź.\n"
+            "Po niewielkiej zmianie parametrów dobre rozwiązanie pojawia się znacznie szybciej.\n"
+            "Gdy grafik jest pusty, podpowiedzią jest szybki szkic."
+        )
+        form_layout.addRow(self.warm_start_check)
+
         self.generate_button = QPushButton("Generuj grafik")
         self.generate_button.setFixedHeight(40)
         self.generate_button.clicked.connect(self.on_generate_schedule)
         form_layout.addRow(self.generate_button)
+
+        self.sweep_button = QPushButton("Przegląd wag...")
+        self.sweep_button.setToolTip(
+            "Liczy grafik równolegle dla wielu ustawień wag (przerwy, ciągłość, \"jeśli trzeba\")\n"
+            "i pokazuje tabelę wyników do porównania. Wybrany grafik trafia do tabeli."
+        )
+        self.sweep_button.clicked.connect(self.on_sweep_weights)
+        form_layout.addRow(self.sweep_button)
+
+        self.solver_status_label = QLabel("")
+        self.solver_status_label.setObjectName("SolverStatusLabel")
+        self.solver_status_label.setWordWrap(True)
+        form_layout.addRow(self.solver_status_label)
         param_vlayout.addLayout(form_layout)
         return param_frame
 
@@ -241,20 +451,20 @@ class MainWindow(QMainWindow):
         if self.max_hours_per_day_spin.value() > max_hours:
             self.max_hours_per_day_spin.setValue(max_hours)
 
-    def on_generate_schedule(self):
+    def _prepare_slots(self):
         """
-        Generate the schedule and update the schedule matrix.
+        Build the slots of the active days. Returns False (after telling the user) if there is nothing to solve.
         """
         if not self.participants or not self.poll_dates:
             QMessageBox.warning(self, "Brak danych", "Nie ma załadowanych uczestników/dostępności.")
-            return
+            return False
 
         disabled_dates = [self.schedule_widget.date_list[i] for i in self.schedule_widget.disabled_columns]
         self.active_poll_dates = [d for d in self.poll_dates if d not in disabled_dates]
         
         if not self.active_poll_dates:
             QMessageBox.warning(self, "Brak dni", "Musisz pozostawić zaznaczony przynajmniej jeden dzień.")
-            return
+            return False
 
         shift_duration = 15 if self.engine_name == "Timeful" else 30
 
@@ -266,13 +476,39 @@ class MainWindow(QMainWindow):
         )
         if not self.full_slots:
             QMessageBox.information(self, "Grafik", "Brak wczytanej dyspozycji.")
+            return False
+        return True
+
+    def on_generate_schedule(self):
+        """
+        Generate the schedule and update the schedule matrix.
+        """
+        if not self._prepare_slots():
+            return
+
+        if self.mode_combo.currentData() == "draft":
+            self.on_generate_draft()
             return
 
         solver_time_limit = int(self.settings.value("processing_time", 15))
         solver_num_threads = int(self.settings.value("max_threads", 4))
+        symmetry_reduction = self.settings.value("symmetry_reduction", False, type=bool)
+        aggregate_slots = self.settings.value("aggregate_slots", False, type=bool)
+        relative_gap_limit = float(self.settings.value("gap_target", 0)) / 100
+        no_improvement_time = int(self.settings.value("no_improvement_time", 0))
+        lns = self.mode_combo.currentData() == "lns"
+        self.pinned_schedule = None
+        if not lns and self.schedule_widget.has_pins():
+            # info: re-solve only the unpinned part, starting from the current schedule
+            self.pinned_schedule = self.schedule_widget.get_current_schedule_data()
+        self.hint_schedule = None
+        if self.pinned_schedule is not None:
+            self.hint_schedule = self.pinned_schedule
+        elif self.warm_start_check.isChecked() or lns:
+            self.hint_schedule = self.schedule_widget.get_current_schedule_data() or self._greedy_draft()[0]
+        self.solver_status_label.setText("")
         self.generate_button.setEnabled(False)
-        self.progress_dialog = QProgressDialog("Liczenie...", None, 0, 0, self)
-        self.progress_dialog.setCancelButtonText(None)
+        self.progress_dialog = QProgressDialog("Liczenie...", "Zatrzymaj", 0, 0, self)
         self.progress_dialog.setWindowTitle("Generowanie grafiku")
         self.progress_dialog.setWindowModality(Qt.WindowModality.WindowModal)
         self.progress_dialog.setMinimumDuration(0)
@@ -288,16 +524,161 @@ class MainWindow(QMainWindow):
             max_hours=float(self.max_hours_spin.value()),
             max_hours_per_day=float(self.max_hours_per_day_spin.value()),
             solver_time_limit=solver_time_limit,
-            solver_num_threads=solver_num_threads
+            solver_num_threads=solver_num_threads,
+            availability_index=self.availability_index,
+            symmetry_reduction=symmetry_reduction,
+            aggregate_slots=aggregate_slots,
+            hint_schedule=self.hint_schedule,
+            relative_gap_limit=relative_gap_limit,
+            no_improvement_time=no_improvement_time,
+            model_cache=self.model_cache,
+            portfolio_size=int(self.settings.value("portfolio_size", 1)),
+            decomposition=self.settings.value("decomposition", "none"),
+            lns=lns,
+            pinned_schedule=self.pinned_schedule,
+            pinned_slots=self.schedule_widget.get_pinned_slots(),
+            pinned_names=set(self.schedule_widget.pinned_names),
+            formulation=self.settings.value("formulation", "standard"),
+            relax=self.settings.value("relax_limits", False, type=bool),
+            coarse_minutes=int(self.settings.value("coarse_minutes", 0))
         )
+        self.solve_control = self.solver_worker.control
         self.solver_worker.moveToThread(self.solver_thread)
         self.solver_thread.started.connect(self.solver_worker.run)
+        self.solver_worker.progress.connect(self.progress_dialog.setLabelText)
+        # note: called directly, the worker's thread is busy inside the solver and does not process events
+        self.progress_dialog.canceled.connect(self.on_solver_stop_requested)
+        if self.settings.value("live_preview", True, type=bool):
+            self.solver_worker.incumbent.connect(self.on_solver_incumbent)
         self.solver_worker.finished.connect(self.on_solver_finished)
         self.solver_worker.finished.connect(self.solver_thread.quit)
         self.solver_worker.finished.connect(self.solver_worker.deleteLater)
         self.solver_thread.finished.connect(self.solver_thread.deleteLater)
         self.solver_thread.start()
 
+    def _greedy_draft(self):
+        """
+        Run the greedy heuristic on the prepared slots with the current panel parameters.
+        """
+        return assign_shifts_greedy(
+            participants=self.participants,
+            slot_list=self.full_slots,
+            num_required=self.num_required_spin.value(),
+            min_required=self.min_required_spin.value(),
+            max_hours=float(self.max_hours_spin.value()),
+            max_hours_per_day=float(self.max_hours_per_day_spin.value()),
+            availability_index=self.availability_index
+        )
+
+    def on_generate_draft(self):
+        """
+        Build a quick heuristic schedule without the solver.
+        """
+        started = wall_clock.monotonic()
+        schedule_data, _ = self._greedy_draft()
+        elapsed_ms = 1000 * (wall_clock.monotonic() - started)
+        if schedule_data is None:
+            QMessageBox.information(self, "Solver", "Nie znaleziono rozwiązania.")
+            return
+        self._load_schedule(schedule_data)
+        self.solver_status_label.setText(f"Szkic gotowy w {elapsed_ms:.0f} ms.")
+
+    def on_sweep_weights(self):
+        """
+        Solve the schedule for a grid of objective weights in parallel and let the user pick one.
+        """
+        if not self._prepare_slots():
+            return
+
+        self.generate_button.setEnabled(False)
+        self.sweep_button.setEnabled(False)
+        self.sweep_dialog = QProgressDialog("Przegląd wag...", "Zatrzymaj", 0, 0, self)
+        self.sweep_dialog.setWindowTitle("Przegląd wag")
+        self.sweep_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        self.sweep_dialog.setMinimumDuration(0)
+        self.sweep_dialog.setAutoReset(False)
+        self.sweep_dialog.setValue(0)
+        self.sweep_dialog.show()
+
+        self.sweep_thread = QThread(self)
+        self.sweep_worker = SweepWorker(
+            participants=self.participants,
+            slot_list=self.full_slots,
+            num_required=self.num_required_spin.value(),
+            min_required=self.min_required_spin.value(),
+            max_hours=float(self.max_hours_spin.value()),
+            max_hours_per_day=float(self.max_hours_per_day_spin.value()),
+            solver_time_limit=int(self.settings.value("processing_time", 15)),
+            max_workers=int(self.settings.value("max_threads", 4)),
+            availability_index=self.availability_index
+        )
+        self.sweep_control = self.sweep_worker.control
+        self.sweep_worker.moveToThread(self.sweep_thread)
+        self.sweep_thread.started.connect(self.sweep_worker.run)
+        self.sweep_worker.progress.connect(self.on_sweep_progress)
+        self.sweep_dialog.canceled.connect(self.sweep_control.stop)
+        self.sweep_worker.finished.connect(self.on_sweep_finished)
+        self.sweep_worker.finished.connect(self.sweep_thread.quit)
+        self.sweep_worker.finished.connect(self.sweep_worker.deleteLater)
+        self.sweep_thread.finished.connect(self.sweep_thread.deleteLater)
+        self.sweep_thread.start()
+
+    def on_sweep_progress(self, done, total):
+        """
+        Update the sweep progress dialog.
+        """
+        self.sweep_dialog.setMaximum(total)
+        self.sweep_dialog.setValue(done)
+        self.sweep_dialog.setLabelText(f"Przegląd wag: {done} z {total}")
+
+    def on_sweep_finished(self, results):
+        """
+        Show the sweep results and load the schedule the user picks.
+        """
+        self.generate_button.setEnabled(True)
+        self.sweep_button.setEnabled(True)
+        self.sweep_dialog.close()
+        if not results:
+            QMessageBox.information(self, "Przegląd wag", "Nie znaleziono rozwiązania.")
+            return
+
+        dialog = SweepResultsDialog(results, self)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+        result = dialog.selected_result()
+        if result is None:
+            return
+        self._load_schedule(result['schedule_data'])
+        self.solver_status_label.setText(
+            f"Wczytano wariant: przerwy {result['gap_penalty']}, ciągłość {result['coverage_reward']}, "
+            f"\"jeśli trzeba\" {result['ifNeeded_penalty']}."
+        )
+
+    def on_solver_stop_requested(self):
+        """
+        Stop button of the progress dialog: finish with the best solution found so far.
+        """
+        if self.generate_button.isEnabled():
+            return
+        self.solve_control.stop()
+        self.solver_status_label.setText("Zatrzymywanie...")
+
+    def on_solver_incumbent(self, schedule_data):
+        """
+        Show the latest intermediate solution in the schedule matrix while the solver runs.
+        """
+        if not schedule_data:
+            return
+        shift_duration = 15 if self.engine_name == "Timeful" else 30
+        self.schedule_widget.load_schedule_matrix(
+            schedule_data=schedule_data,
+            participants=self.participants,
+            poll_dates=self.poll_dates,
+            time_slot_list=self._build_time_slot_list(shift_duration),
+            availability_index=self.availability_index
+        )
+        self.schedule_widget.restore_disabled_columns()
+
     def on_solver_finished(self, schedule_data, total_hrs):
         """
         Handle the solver result by updating the schedule matrix and summary.
@@ -306,16 +687,151 @@ class MainWindow(QMainWindow):
         if hasattr(self, 'progress_dialog') and self.progress_dialog:
             self.progress_dialog.close()
         if schedule_data is None:
-            QMessageBox.information(self, "Solver", "Nie znaleziono rozwiązania.")
+            self.solver_status_label.setText("")
+            if self.solve_control.stop_reason == 'user':
+                QMessageBox.information(self, "Solver", "Zatrzymano przed znalezieniem rozwiązania.")
+            elif self.pinned_schedule is not None and self.solve_control.infeasibility:
+                QMessageBox.information(
+                    self, "Solver",
+                    "Przypiętych przydziałów nie da się pogodzić z parametrami:\n\n"
+                    + "\n".join(self._describe_conflicts(self.solve_control.infeasibility))
+                    + "\n\nOdepnij część dyżurów albo zmień limity obsady lub godzin."
+                )
+            elif self.pinned_schedule is not None:
+                QMessageBox.information(
+                    self, "Solver",
+                    "Nie znaleziono rozwiązania zgodnego z przypiętymi przydziałami.\n"
+                    "Przypięte dyżury mogą przekraczać limity godzin lub obsady - odepnij część z nich."
+                )
+            else:
+                QMessageBox.information(self, "Solver", "Nie znaleziono rozwiązania.")
             return
 
+        self._load_schedule(schedule_data)
+
+        status_lines = []
+        if self.pinned_schedule is not None:
+            status_lines.append("Przeliczono tylko nieprzypiętą część grafiku.")
+        relaxation = self.solve_control.relaxation
+        if relaxation and relaxation['bent']:
+            status_lines.extend(self._describe_relaxation(relaxation))
+        stop_reason = self.solve_control.stop_reason
+        if stop_reason is not None:
+            reason_text = {
+                'user': "Zatrzymano na żądanie",
+                'stall': "Zatrzymano z powodu braku poprawy",
+                'gap': "Osiągnięto docelową lukę",
+            }[stop_reason]
+            if self.solve_control.objective is not None:
+                reason_text += (
+                    f" (wynik {self.solve_control.objective:.0f}, granica {self.solve_control.best_bound:.0f})"
+                )
+            status_lines.append(reason_text + ".")
+        dropped = self.solve_control.dropped
+        if dropped:
+            status_lines.append(
+                f"Nie udało się rozdzielić {dropped['assignments']} przydziałów między osoby o tej samej "
+                f"dostępności (dotyczy slotów: {len(dropped['slots'])})."
+            )
+        pruning = self.solve_control.pruning
+        if pruning:
+            removed = [
+                f"{label}: {len(pruning[key])}" for key, label in (
+                    ('slots', "sloty nie do obsadzenia"),
+                    ('participants', "osoby bez dostępności"),
+                    ('days', "dni bez obsady"),
+                ) if pruning[key]
+            ]
+            if removed:
+                status_lines.append("Pominięto w modelu - " + ", ".join(removed) + ".")
+        if self.hint_schedule:
+            kept, total = hint_retention(self.hint_schedule, schedule_data)
+            status_lines.append(
+                f"Zachowano {kept} z {total} przydziałów z podpowiedzi ({100 * kept // total}%)."
+            )
+        self.solver_status_label.setText("\n".join(status_lines))
+
+    def _describe_conflicts(self, conflicts, limit=5):
+        """
+        Describe the conflicts found by core.feasibility.check_pinned_feasibility() in a few lines.
+        """
+        def slots(indices):
+            labels = [
+                f"{self.full_slots[j][0].strftime('%d.%m %H:%M')}-{self.full_slots[j][1].strftime('%H:%M')}"
+                for j in indices[:limit]
+            ]
+            return ", ".join(labels) + (f" (+{len(indices) - limit})" if len(indices) > limit else "")
+
+        def names(indices):
+            labels = [self.participants[i]['name'] for i in indices[:limit]]
+            return ", ".join(labels) + (f" (+{len(indices) - limit})" if len(indices) > limit else "")
+
+        lines = []
+        if conflicts['overstaffed']:
+            lines.append(f"- więcej osób niż maksymalna obsada: {slots(conflicts['overstaffed'])}")
+        if conflicts['understaffed']:
+            lines.append(f"- przypięta obsada poniżej minimum: {slots(conflicts['understaffed'])}")
+        if conflicts['hours']:
+            lines.append(f"- przypięte dyżury ponad limit godzin: {names(conflicts['hours'])}")
+        if conflicts['day_hours']:
+            people = sorted({i for i, _ in conflicts['day_hours']})
+            lines.append(f"- przypięte dyżury ponad dzienny limit godzin: {names(people)}")
+        if conflicts['unmet']:
+            lines.append(f"- nie da się dobrać brakujących osób: {slots(conflicts['unmet'])}")
+            if conflicts['bottleneck']:
+                lines.append(f"  (brakuje godzin u: {names(conflicts['bottleneck'])})")
+            else:
+                lines.append("  (za mało dostępnych, nieprzypiętych osób)")
+        return lines
+
+    def _describe_relaxation(self, relaxation):
+        """
+        Describe the limits bent by a relaxed solve (see assign_shifts(relax=True)) in a few lines.
+        """
+        labels = {
+            'min_required': "min. obsada",
+            'num_required': "maks. obsada",
+            'max_hours': "limit godzin",
+            'max_hours_per_day': "dzienny limit godzin",
+        }
+        lines = []
+        if relaxation['conflict']:
+            lines.append("Sprzeczne limity: " + ", ".join(labels[limit] for limit in relaxation['conflict']) + ".")
+        by_limit = defaultdict(list)
+        for bent in relaxation['bent']:
+            by_limit[bent['limit']].append(bent)
+        for limit in ShiftModel.RELAXABLE_LIMITS:
+            bents = by_limit.get(limit)
+            if not bents:
+                continue
+            if limit in ('min_required', 'num_required'):
+                people = sum(b['amount'] for b in bents)
+                sign = "-" if limit == 'min_required' else "+"
+                lines.append(f"Nagięto {labels[limit]} w {len(bents)} slotach ({sign}{people} os. łącznie).")
+            else:
+                minutes = defaultdict(int)
+                for b in bents:
+                    i = b['key'][0] if limit == 'max_hours_per_day' else b['key']
+                    minutes[self.participants[i]['name']] += b['amount']
+                largest = sorted(minutes.items(), key=lambda item: -item[1])
+                details = ", ".join(f"{name} +{m / 60:g} h" for name, m in largest[:5])
+                if len(largest) > 5:
+                    details += f" (+{len(largest) - 5})"
+                lines.append(f"Nagięto {labels[limit]}: {details}.")
+        return lines
+
+    def _load_schedule(self, schedule_data):
+        """
+        Show a solved schedule in the schedule matrix and refresh the summary.
+        """
         shift_duration = 15 if self.engine_name == "Timeful" else 30
         time_slot_list = self._build_time_slot_list(shift_duration)
         self.schedule_widget.load_schedule_matrix(
             schedule_data=schedule_data,
             participants=self.participants,
             poll_dates=self.poll_dates,
-            time_slot_list=time_slot_list
+            time_slot_list=time_slot_list,
+            availability_index=self.availability_index
         )
         self.update_summary()
         self.schedule_widget.restore_disabled_columns()
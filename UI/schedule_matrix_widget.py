@@ -1,6 +1,6 @@
 from PyQt6.QtWidgets import (
     QTableWidget, QTableWidgetItem, QWidget,
-    QHBoxLayout, QInputDialog
+    QHBoxLayout, QInputDialog, QMenu
 )
 from PyQt6.QtCore import pyqtSignal, Qt
 from datetime import datetime
@@ -8,6 +8,7 @@ from collections import defaultdict
 import random
 
 from UI.occupant_chip import OccupantChip
+from core.availability_matrix import AvailabilityMatrix, AVAILABLE, IF_NEEDED
 
 class ScheduleMatrixWidget(QTableWidget):
     """
@@ -21,6 +22,9 @@ class ScheduleMatrixWidget(QTableWidget):
         - If a participant exceeds the max hours or has no availability overlap, highlighted in red.
         - Otherwise, styling depends on the current theme.
     The highlight_availability method sets a green (or yellow) background for cells overlapping a person's availability.
+
+    Cells, whole days (columns) and persons can be pinned from the context menu. Pinned parts keep
+    their assignments when the schedule is re-solved (see get_pinned_slots / pinned_names).
     """
 
     scheduleChanged = pyqtSignal()
@@ -37,6 +41,7 @@ class ScheduleMatrixWidget(QTableWidget):
         self.setAcceptDrops(True)
 
         self.participants = []
+        self.availability_matrix = None
         self.date_list = []
         self.time_slot_list = []
         self.max_hours = 0.0
@@ -48,6 +53,10 @@ class ScheduleMatrixWidget(QTableWidget):
         self.occupant_data_color_map = {}
         self.colorize_mode = False
 
+        self.pinned_cells = set()
+        self.pinned_columns = set()
+        self.pinned_names = set()
+
         # Set default row and column sizes
         self.verticalHeader().setDefaultSectionSize(30)
         self.horizontalHeader().setDefaultSectionSize(110)
@@ -98,7 +107,7 @@ class ScheduleMatrixWidget(QTableWidget):
         """
         self.max_hours = val
 
-    def load_schedule_matrix(self, schedule_data, participants, poll_dates, time_slot_list):
+    def load_schedule_matrix(self, schedule_data, participants, poll_dates, time_slot_list, availability_index=None):
         """
         Loads the schedule matrix from the provided data.
 
@@ -107,8 +116,12 @@ class ScheduleMatrixWidget(QTableWidget):
             participants: List of participant dictionaries (each must contain a 'name' key).
             poll_dates: List of date strings.
             time_slot_list: List of time slot tuples (start, end) as time objects.
+            availability_index: Prebuilt AvailabilityIndex for participants; built here if omitted.
         """
         self.clear()
+        # info: pins refer to cells, so they only survive reloading the same grid
+        if sorted(poll_dates) != self.date_list or time_slot_list != self.time_slot_list:
+            self.clear_pins(refresh=False)
         self.participants = participants
         self.date_list = sorted(poll_dates)
         self.time_slot_list = time_slot_list
@@ -118,6 +131,10 @@ class ScheduleMatrixWidget(QTableWidget):
         self.setRowCount(rows)
         self.setColumnCount(cols)
 
+        # info: one matrix column per cell, laid out column by column (see _cell_index)
+        cell_slots = [self._cell_slot(r, c) for c in range(cols) for r in range(rows)]
+        self.availability_matrix = AvailabilityMatrix(participants, cell_slots, availability_index)
+
         for c, d_str in enumerate(self.date_list):
             item = QTableWidgetItem(d_str)
             flags = item.flags() | Qt.ItemFlag.ItemIsUserCheckable
@@ -156,6 +173,20 @@ class ScheduleMatrixWidget(QTableWidget):
         self.resizeRowsToContents()
         self.validate_all_cells()
 
+    def _cell_slot(self, row, col):
+        """
+        Returns the (start, end) datetimes of the cell at (row, col).
+        """
+        y, m, d = map(int, self.date_list[col].split('-'))
+        t1, t2 = self.time_slot_list[row]
+        return datetime(y, m, d, t1.hour, t1.minute, 0), datetime(y, m, d, t2.hour, t2.minute, 0)
+
+    def _cell_index(self, row, col):
+        """
+        Returns the availability matrix column of the cell at (row, col).
+        """
+        return col * len(self.time_slot_list) + row
+
     def _set_cell_widget(self, row, col, occupant_list):
         """
         Creates a QWidget with occupant chips for the cell at (row, col).
@@ -168,12 +199,15 @@ class ScheduleMatrixWidget(QTableWidget):
         cell_widget = QWidget()
         cell_widget.setObjectName("CellWidget")
         cell_widget.setAttribute(Qt.WidgetAttribute.WA_StyledBackground, True)
+        cell_widget.setProperty("pinned", (row, col) in self.pinned_cells or col in self.pinned_columns)
         layout = QHBoxLayout(cell_widget)
         layout.setContentsMargins(2, 2, 2, 2)
         layout.setSpacing(2)
 
         for occupant_name in occupant_list:
             chip = OccupantChip(occupant_name, row=row, col=col)
+            if occupant_name in self.pinned_names:
+                chip.label.setText(f"📌 {occupant_name}")
             layout.addWidget(chip)
 
         layout.addStretch()
@@ -207,6 +241,77 @@ class ScheduleMatrixWidget(QTableWidget):
                     })
         return data
 
+    def has_pins(self):
+        """
+        Returns True if any cell, day or person is pinned.
+        """
+        return bool(self.pinned_cells or self.pinned_columns or self.pinned_names)
+
+    def get_pinned_slots(self):
+        """
+        Returns the (start, end) datetimes of all pinned cells, including the cells of pinned days.
+        """
+        cells = set(self.pinned_cells)
+        for col in self.pinned_columns:
+            cells.update((r, col) for r in range(len(self.time_slot_list)))
+        return {self._cell_slot(r, c) for r, c in cells if c < len(self.date_list)}
+
+    def clear_pins(self, refresh=True):
+        """
+        Removes all pins.
+        """
+        self.pinned_cells.clear()
+        self.pinned_columns.clear()
+        self.pinned_names.clear()
+        if refresh:
+            self._refresh_pins()
+
+    def _refresh_pins(self):
+        """
+        Rebuilds the cell widgets so that they show the current pins.
+        """
+        for (r, c), occupant_list in self.occupant_data.items():
+            self._set_cell_widget(r, c, occupant_list)
+        for col in self.disabled_columns:
+            self._set_column_enabled(col, False)
+        self.validate_all_cells()
+
+    def contextMenuEvent(self, event):
+        """
+        Shows the pinning menu for the cell under the cursor.
+        """
+        row = self.rowAt(event.pos().y())
+        col = self.columnAt(event.pos().x())
+        if row < 0 or col < 0:
+            super().contextMenuEvent(event)
+            return
+
+        def toggle(pins, key):
+            pins.symmetric_difference_update({key})
+            self._refresh_pins()
+
+        menu = QMenu(self)
+        cell_pinned = (row, col) in self.pinned_cells
+        menu.addAction(
+            "Odepnij komórkę" if cell_pinned else "Przypnij komórkę",
+            lambda: toggle(self.pinned_cells, (row, col))
+        )
+        day_pinned = col in self.pinned_columns
+        menu.addAction(
+            "Odepnij dzień" if day_pinned else "Przypnij cały dzień",
+            lambda: toggle(self.pinned_columns, col)
+        )
+        occupant_list = self.occupant_data.get((row, col), [])
+        if occupant_list:
+            menu.addSeparator()
+            for name in occupant_list:
+                label = f"Odepnij osobę: {name}" if name in self.pinned_names else f"Przypnij osobę: {name}"
+                menu.addAction(label, lambda name=name: toggle(self.pinned_names, name))
+        if self.has_pins():
+            menu.addSeparator()
+            menu.addAction("Odepnij wszystko", self.clear_pins)
+        menu.exec(event.globalPos())
+
     def mouseDoubleClickEvent(self, event):
         """
         Handles double-click events to edit occupant names in a cell.
@@ -308,26 +413,15 @@ class ScheduleMatrixWidget(QTableWidget):
         if not self.current_highlight_person:
             return
 
-        person = next((p for p in self.participants if p['name'] == self.current_highlight_person), None)
-        if not person:
+        if self.availability_matrix is None:
             return
 
-        availability = person['availabilities']
-        # info: Use ifNeeded availability if present; default to empty list if not
-        ifneeded = person.get('ifNeeded', [])
-        d_str = self.date_list[col]
-        y, m, d = map(int, d_str.split('-'))
-        t1, t2 = self.time_slot_list[row]
-        sdt = datetime(y, m, d, t1.hour, t1.minute, 0)
-        edt = datetime(y, m, d, t2.hour, t2.minute, 0)
-
         # Determine overlaps
-        normal_overlap = any(sdt >= avs and edt <= ave for (avs, ave) in availability)
-        ifneeded_overlap = any(sdt >= ivs and edt <= ive for (ivs, ive) in ifneeded)
+        state = self.availability_matrix.row(self.current_highlight_person)[self._cell_index(row, col)]
 
-        if ifneeded_overlap and not normal_overlap:
+        if state == IF_NEEDED:
             cell_w.setStyleSheet("QWidget#CellWidget { background-color: rgba(255,255,153,150); }")
-        elif normal_overlap:
+        elif state == AVAILABLE:
             cell_w.setStyleSheet("QWidget#CellWidget { background-color: rgba(204,255,204,180); }")
 
     def validate_all_cells(self):
@@ -370,15 +464,12 @@ class ScheduleMatrixWidget(QTableWidget):
             basic_bg = "#E0E0E0"
             basic_text = "#000000"
 
+        person_by_name = {}
+        for p in self.participants:
+            person_by_name.setdefault(p['name'], p)
+
         for c in range(cols):
-            d_str = self.date_list[c]
-            y, m, d = map(int, d_str.split('-'))
             for r in range(rows):
-                occupant_list = self.occupant_data.get((r, c), [])
-                t1, t2 = self.time_slot_list[r]
-                sdt = datetime(y, m, d, t1.hour, t1.minute, 0)
-                edt = datetime(y, m, d, t2.hour, t2.minute, 0)
-
                 cell_widget = self.cellWidget(r, c)
                 if not cell_widget:
                     continue
@@ -408,7 +499,7 @@ class ScheduleMatrixWidget(QTableWidget):
                         chip.setStyleSheet(style_chip)
                         continue
 
-                    person = next((p for p in self.participants if p['name'] == nm), None)
+                    person = person_by_name.get(nm)
                     if person is None or person.get("external", False):
                         style_chip = f"""
                             QFrame#OccupantChip {{
@@ -433,9 +524,8 @@ class ScheduleMatrixWidget(QTableWidget):
                         """
                     else:
                         # info: For internal participants, check availability overlap.
-                        availability = person.get('availabilities', [])
-                        overlap = any(sdt >= avs and edt <= ave for (avs, ave) in availability)
-                        if not overlap:
+                        state = self.availability_matrix.row(nm)[self._cell_index(r, c)]
+                        if state != AVAILABLE:
                             style_chip = f"""
                                 QFrame#OccupantChip {{
                                     background-color: #FF9999;
@@ -1,11 +1,12 @@
 import multiprocessing
 from PyQt6.QtWidgets import (
     QDialog, QGridLayout, QLabel, QSpinBox, QComboBox, QHBoxLayout, QWidget,
-    QDialogButtonBox, QToolButton
+    QDialogButtonBox, QToolButton, QCheckBox, QPushButton
 )
 from PyQt6.QtGui import QIcon
 from PyQt6.QtCore import QSettings
 
+from core import http_client
 from core.resources import get_icon_path
 
 def pluralize_cores(n: int) -> str:
@@ -76,6 +77,38 @@ class SettingsDialog(QDialog):
         layout.addWidget(label_time, 1, 0)
         layout.addWidget(timeWidget, 1, 1)
 
+        self.gapTargetSpin = QSpinBox()
+        self.gapTargetSpin.setRange(0, 50)
+        self.gapTargetSpin.setSuffix(" %")
+        self.gapTargetSpin.setSpecialValueText("luka: wył.")
+        self.gapTargetSpin.setValue(int(self.settings.value("gap_target", 0)))
+
+        self.noImprovementSpin = QSpinBox()
+        self.noImprovementSpin.setRange(0, 60)
+        self.noImprovementSpin.setSuffix(" s")
+        self.noImprovementSpin.setSpecialValueText("bez poprawy: wył.")
+        self.noImprovementSpin.setValue(int(self.settings.value("no_improvement_time", 0)))
+
+        stopInfoBtn = QToolButton()
+        stopInfoBtn.setIcon(QIcon(get_icon_path("info")))
+        stopInfoBtn.setToolTip(
+            "Wcześniejsze zakończenie liczenia z najlepszym znalezionym grafikiem:\n"
+            "- gdy luka do górnej granicy wyniku spadnie do podanego procentu,\n"
+            "- gdy przez podaną liczbę sekund nie znaleziono lepszego rozwiązania.\n"
+            "0 = wyłączone. Liczenie można też przerwać przyciskiem \"Zatrzymaj\"."
+        )
+
+        stopWidget = QWidget()
+        stopHLayout = QHBoxLayout(stopWidget)
+        stopHLayout.setContentsMargins(0, 0, 0, 0)
+        stopHLayout.setSpacing(6)
+        stopHLayout.addWidget(self.gapTargetSpin)
+        stopHLayout.addWidget(self.noImprovementSpin)
+        stopHLayout.addWidget(stopInfoBtn)
+
+        layout.addWidget(QLabel("Zatrzymaj przy:"), 2, 0)
+        layout.addWidget(stopWidget, 2, 1)
+
         self.maxThreadsSpin = QSpinBox()
         self.maxThreadsSpin.setObjectName("MaxThreadsSpin")
         self.maxThreadsSpin.setRange(1, 64)
@@ -97,13 +130,13 @@ class SettingsDialog(QDialog):
         threadsHLayout.addWidget(threadsInfoBtn)
 
         label_threads = QLabel("Maks. wątków:")
-        layout.addWidget(label_threads, 2, 0)
-        layout.addWidget(threadsWidget, 2, 1)
+        layout.addWidget(label_threads, 3, 0)
+        layout.addWidget(threadsWidget, 3, 1)
 
         self.threadsStatusLabel = QLabel()
         self.threadsStatusLabel.setObjectName("ThreadStatusLabel")
         self.threadsStatusLabel.setWordWrap(True)
-        layout.addWidget(self.threadsStatusLabel, 3, 0, 1, 2)
+        layout.addWidget(self.threadsStatusLabel, 4, 0, 1, 2)
 
         self.maxThreadsSpin.valueChanged.connect(self.updateThreadsStatus)
         self.updateThreadsStatus(self.maxThreadsSpin.value())
@@ -126,8 +159,8 @@ class SettingsDialog(QDialog):
         cabbageHLayout.addWidget(self.timezoneCabbageSpin)
         cabbageHLayout.addWidget(tzCabbageBtn)
 
-        layout.addWidget(QLabel("Cabbage TimeZone:"), 4, 0)
-        layout.addWidget(cabbageWidget, 4, 1)
+        layout.addWidget(QLabel("Cabbage TimeZone:"), 5, 0)
+        layout.addWidget(cabbageWidget, 5, 1)
 
         self.timezoneTimefulSpin = QSpinBox()
         self.timezoneTimefulSpin.setRange(-12, 14)
@@ -147,15 +180,216 @@ class SettingsDialog(QDialog):
         timefulHLayout.addWidget(self.timezoneTimefulSpin)
         timefulHLayout.addWidget(tzTimefulBtn)
 
-        layout.addWidget(QLabel("Timeful TimeZone:"), 5, 0)
-        layout.addWidget(timefulWidget, 5, 1)
+        layout.addWidget(QLabel("Timeful TimeZone:"), 6, 0)
+        layout.addWidget(timefulWidget, 6, 1)
+
+        self.symmetryCheck = QCheckBox("Grupuj identyczne dyspozycje")
+        self.symmetryCheck.setChecked(self.settings.value("symmetry_reduction", False, type=bool))
+
+        symmetryInfoBtn = QToolButton()
+        symmetryInfoBtn.setIcon(QIcon(get_icon_path("info")))
+        symmetryInfoBtn.setToolTip(
+            "Osoby o identycznej dyspozycji są liczone przez solver jako jedna grupa,\n"
+            "a wynik jest potem rozdzielany między członków grupy.\n"
+            "Znacznie przyspiesza duże ankiety, w których wiele osób zaznacza te same godziny."
+        )
+
+        symmetryWidget = QWidget()
+        symmetryHLayout = QHBoxLayout(symmetryWidget)
+        symmetryHLayout.setContentsMargins(0, 0, 0, 0)
+        symmetryHLayout.setSpacing(6)
+        symmetryHLayout.addWidget(self.symmetryCheck)
+        symmetryHLayout.addWidget(symmetryInfoBtn)
+
+        layout.addWidget(QLabel("Solver:"), 7, 0)
+        layout.addWidget(symmetryWidget, 7, 1)
+
+        self.aggregateCheck = QCheckBox("Łącz sloty w bloki")
+        self.aggregateCheck.setChecked(self.settings.value("aggregate_slots", False, type=bool))
+
+        aggregateInfoBtn = QToolButton()
+        aggregateInfoBtn.setIcon(QIcon(get_icon_path("info")))
+        aggregateInfoBtn.setToolTip(
+            "Kolejne sloty z identycznym zestawem dostępnych osób są łączone w bloki (maks. 1 h),\n"
+            "a osoba przydzielona do bloku pracuje we wszystkich jego slotach.\n"
+            "Zmniejsza model kilkukrotnie, szczególnie dla 15-minutowych slotów Timeful.\n"
+            "To tryb przybliżony: nikt nie może przepracować tylko części bloku, więc wynik\n"
+            "bywa nieco gorszy niż bez łączenia."
+        )
+
+        aggregateWidget = QWidget()
+        aggregateHLayout = QHBoxLayout(aggregateWidget)
+        aggregateHLayout.setContentsMargins(0, 0, 0, 0)
+        aggregateHLayout.setSpacing(6)
+        aggregateHLayout.addWidget(self.aggregateCheck)
+        aggregateHLayout.addWidget(aggregateInfoBtn)
+
+        layout.addWidget(aggregateWidget, 8, 1)
+
+        self.portfolioSpin = QSpinBox()
+        self.portfolioSpin.setRange(1, 8)
+        self.portfolioSpin.setPrefix("Portfel: ")
+        self.portfolioSpin.setSpecialValueText("Portfel: wył.")
+        self.portfolioSpin.setValue(int(self.settings.value("portfolio_size", 1)))
+
+        portfolioInfoBtn = QToolButton()
+        portfolioInfoBtn.setIcon(QIcon(get_icon_path("info")))
+        portfolioInfoBtn.setToolTip(
+            "Liczba niezależnych solverów (różne ziarna losowe i strategie) uruchamianych\n"
+            "w osobnych procesach. Wynikiem jest najlepszy znaleziony grafik.\n"
+            "Maks. wątków jest dzielone między solvery, więc ich liczba nie przekroczy liczby wątków."
+        )
+
+        portfolioWidget = QWidget()
+        portfolioHLayout = QHBoxLayout(portfolioWidget)
+        portfolioHLayout.setContentsMargins(0, 0, 0, 0)
+        portfolioHLayout.setSpacing(6)
+        portfolioHLayout.addWidget(self.portfolioSpin)
+        portfolioHLayout.addWidget(portfolioInfoBtn)
+
+        layout.addWidget(portfolioWidget, 9, 1)
+
+        self.decompositionCombo = QComboBox()
+        self.decompositionCombo.addItem("Bez podziału", "none")
+        self.decompositionCombo.addItem("Podział na dni", "day")
+        self.decompositionCombo.addItem("Podział na tygodnie", "week")
+        self.decompositionCombo.setCurrentIndex(
+            max(0, self.decompositionCombo.findData(self.settings.value("decomposition", "none")))
+        )
+
+        decompositionInfoBtn = QToolButton()
+        decompositionInfoBtn.setIcon(QIcon(get_icon_path("info")))
+        decompositionInfoBtn.setToolTip(
+            "Dzieli ankietę na dni lub tygodnie liczone równolegle w osobnych procesach.\n"
+            "Limit godzin na osobę jest rozdzielany między części, a niewykorzystane godziny\n"
+            "trafiają do nich w krótkim dodatkowym przebiegu. Przydatne przy ankietach na cały miesiąc.\n"
+            "Przy podziale grupowanie identycznych dyspozycji i portfel nie są używane."
+        )
+
+        decompositionWidget = QWidget()
+        decompositionHLayout = QHBoxLayout(decompositionWidget)
+        decompositionHLayout.setContentsMargins(0, 0, 0, 0)
+        decompositionHLayout.setSpacing(6)
+        decompositionHLayout.addWidget(self.decompositionCombo)
+        decompositionHLayout.addWidget(decompositionInfoBtn)
+
+        layout.addWidget(decompositionWidget, 10, 1)
+
+        self.formulationCombo = QComboBox()
+        self.formulationCombo.addItem("Model standardowy", "standard")
+        self.formulationCombo.addItem("Model zwarty", "compact")
+        self.formulationCombo.setCurrentIndex(
+            max(0, self.formulationCombo.findData(self.settings.value("formulation", "standard")))
+        )
+
+        formulationInfoBtn = QToolButton()
+        formulationInfoBtn.setIcon(QIcon(get_icon_path("info")))
+        formulationInfoBtn.setToolTip(
+            "Sposób zapisu modelu dla solvera. Model zwarty ma mniej zmiennych pomocniczych\n"
+            "i kilkukrotnie mniej ograniczeń, a jego optimum jest takie samo.\n"
+            "Zwykle szybciej przechodzi presolve; czas dojścia do optimum zależy od ankiety."
+        )
+
+        formulationWidget = QWidget()
+        formulationHLayout = QHBoxLayout(formulationWidget)
+        formulationHLayout.setContentsMargins(0, 0, 0, 0)
+        formulationHLayout.setSpacing(6)
+        formulationHLayout.addWidget(self.formulationCombo)
+        formulationHLayout.addWidget(formulationInfoBtn)
+
+        layout.addWidget(formulationWidget, 11, 1)
+
+        self.coarseToFineCombo = QComboBox()
+        self.coarseToFineCombo.addItem("Bez etapu zgrubnego", 0)
+        self.coarseToFineCombo.addItem("Najpierw co 60 min", 60)
+        self.coarseToFineCombo.addItem("Najpierw co 30 min", 30)
+        self.coarseToFineCombo.setCurrentIndex(
+            max(0, self.coarseToFineCombo.findData(int(self.settings.value("coarse_minutes", 0))))
+        )
+
+        coarseToFineInfoBtn = QToolButton()
+        coarseToFineInfoBtn.setIcon(QIcon(get_icon_path("info")))
+        coarseToFineInfoBtn.setToolTip(
+            "Dla ankiet z krótszymi slotami (Timeful, co 15 min): najpierw liczy grafik na grubszej\n"
+            "siatce, a potem dopracowuje go co 15 min na pełnym modelu, zaczynając od zgrubnego\n"
+            "rozwiązania. Przy tym samym limicie czasu zwykle daje lepszy wynik niż bez etapu\n"
+            "zgrubnego, choć bywa odwrotnie. Nie łączy się z łączeniem slotów."
+        )
+
+        coarseToFineWidget = QWidget()
+        coarseToFineHLayout = QHBoxLayout(coarseToFineWidget)
+        coarseToFineHLayout.setContentsMargins(0, 0, 0, 0)
+        coarseToFineHLayout.setSpacing(6)
+        coarseToFineHLayout.addWidget(self.coarseToFineCombo)
+        coarseToFineHLayout.addWidget(coarseToFineInfoBtn)
+
+        layout.addWidget(coarseToFineWidget, 12, 1)
+
+        self.livePreviewCheck = QCheckBox("Podgląd rozwiązań na żywo")
+        self.livePreviewCheck.setChecked(self.settings.value("live_preview", True, type=bool))
+        self.livePreviewCheck.setToolTip(
+            "Podczas liczenia grafik jest odświeżany (najwyżej raz na sekundę)\n"
+            "najlepszym dotychczas znalezionym rozwiązaniem."
+        )
+        layout.addWidget(self.livePreviewCheck, 13, 1)
+
+        self.relaxCheck = QCheckBox("Naginaj limity przy sprzecznych przypięciach")
+        self.relaxCheck.setChecked(self.settings.value("relax_limits", False, type=bool))
+        self.relaxCheck.setToolTip(
+            "Gdy przypięte dyżury nie mieszczą się w limitach obsady lub godzin, solver nagina\n"
+            "te limity tak mało, jak to możliwe, zamiast kończyć bez rozwiązania.\n"
+            "Po liczeniu pokazuje, które limity nagięto i o ile."
+        )
+        layout.addWidget(self.relaxCheck, 14, 1)
+
+        self.httpTimeoutSpin = QSpinBox()
+        self.httpTimeoutSpin.setRange(5, 300)
+        self.httpTimeoutSpin.setValue(int(self.settings.value("http_timeout", 30)))
+
+        httpTimeoutInfoBtn = QToolButton()
+        httpTimeoutInfoBtn.setIcon(QIcon(get_icon_path("info")))
+        httpTimeoutInfoBtn.setToolTip(
+            "Jak długo (w sekundach) czekać na odpowiedź serwera Cabbage lub Timeful.\n"
+            "Chwilowe błędy serwera (429, 5xx) są ponawiane automatycznie z rosnącym odstępem."
+        )
+
+        httpTimeoutWidget = QWidget()
+        httpTimeoutHLayout = QHBoxLayout(httpTimeoutWidget)
+        httpTimeoutHLayout.setContentsMargins(0, 0, 0, 0)
+        httpTimeoutHLayout.setSpacing(6)
+        httpTimeoutHLayout.addWidget(self.httpTimeoutSpin)
+        httpTimeoutHLayout.addWidget(httpTimeoutInfoBtn)
+
+        layout.addWidget(QLabel("Limit odpowiedzi (s):"), 15, 0)
+        layout.addWidget(httpTimeoutWidget, 15, 1)
+
+        self.offlineCheck = QCheckBox("Tryb offline: używaj zapisanych kopii ankiet")
+        self.offlineCheck.setChecked(self.settings.value("offline_mode", False, type=bool))
+        self.offlineCheck.setToolTip(
+            "Każda pobrana ankieta jest zapisywana na dysku, a przy ponownym otwarciu\n"
+            "pobierana jest tylko wtedy, gdy się zmieniła. W trybie offline ankiety są\n"
+            "wczytywane wyłącznie z zapisanych kopii, bez łączenia z serwerem."
+        )
+
+        self.clearCacheButton = QPushButton("Wyczyść kopie")
+        self.clearCacheButton.setToolTip("Usuwa wszystkie zapisane kopie ankiet z dysku.")
+        self.clearCacheButton.clicked.connect(self.clearHttpCache)
+
+        offlineWidget = QWidget()
+        offlineHLayout = QHBoxLayout(offlineWidget)
+        offlineHLayout.setContentsMargins(0, 0, 0, 0)
+        offlineHLayout.setSpacing(6)
+        offlineHLayout.addWidget(self.offlineCheck)
+        offlineHLayout.addWidget(self.clearCacheButton)
+
+        layout.addWidget(offlineWidget, 16, 1)
 
         self.buttonBox = QDialogButtonBox(
             QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel
         )
         self.buttonBox.accepted.connect(self.validateAndAccept)
         self.buttonBox.rejected.connect(self.reject)
-        layout.addWidget(self.buttonBox, 6, 0, 1, 2)
+        layout.addWidget(self.buttonBox, 17, 0, 1, 2)
 
     def updateThreadsStatus(self, value: int):
         """
@@ -184,13 +418,33 @@ class SettingsDialog(QDialog):
 
         self.threadsStatusLabel.setText(status_text)
 
+    def clearHttpCache(self):
+        """
+        Removes the cached poll copies (see core.http_cache).
+        """
+        http_client.get_cache().clear()
+        self.clearCacheButton.setText("Wyczyszczono")
+        self.clearCacheButton.setEnabled(False)
+
     def validateAndAccept(self):
         """
         Validates the settings and saves them to the settings file.
         """
         self.settings.setValue("theme", self.themeCombo.currentText())
         self.settings.setValue("processing_time", self.processingTimeSpin.value())
+        self.settings.setValue("gap_target", self.gapTargetSpin.value())
+        self.settings.setValue("no_improvement_time", self.noImprovementSpin.value())
         self.settings.setValue("max_threads", self.maxThreadsSpin.value())
         self.settings.setValue("timezone_cabbage", self.timezoneCabbageSpin.value())
         self.settings.setValue("timezone_timeful", self.timezoneTimefulSpin.value())
+        self.settings.setValue("symmetry_reduction", self.symmetryCheck.isChecked())
+        self.settings.setValue("aggregate_slots", self.aggregateCheck.isChecked())
+        self.settings.setValue("portfolio_size", self.portfolioSpin.value())
+        self.settings.setValue("decomposition", self.decompositionCombo.currentData())
+        self.settings.setValue("formulation", self.formulationCombo.currentData())
+        self.settings.setValue("coarse_minutes", self.coarseToFineCombo.currentData())
+        self.settings.setValue("live_preview", self.livePreviewCheck.isChecked())
+        self.settings.setValue("relax_limits", self.relaxCheck.isChecked())
+        self.settings.setValue("http_timeout", self.httpTimeoutSpin.value())
+        self.settings.setValue("offline_mode", self.offlineCheck.isChecked())
         self.accept()
@@ -0,0 +1,91 @@
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QLabel, QTableWidget, QTableWidgetItem, QDialogButtonBox, QAbstractItemView,
+    QHeaderView
+)
+from PyQt6.QtCore import Qt
+
+# (result key, header, number format)
+SWEEP_COLUMNS = [
+    ('gap_penalty', "Kara za przerwy", "{:d}"),
+    ('coverage_reward', "Nagroda za ciągłość", "{:d}"),
+    ('ifNeeded_penalty', "Kara za \"jeśli trzeba\"", "{:d}"),
+    ('coverage', "Pokrycie (%)", "{:.1f}"),
+    ('gaps', "Przerwy", "{:d}"),
+    ('if_needed', "\"Jeśli trzeba\"", "{:d}"),
+    ('hour_spread', "Rozrzut godzin", "{:.1f}"),
+]
+
+
+class NumericItem(QTableWidgetItem):
+    """
+    Table item that sorts by its numeric value instead of its text.
+    """
+    def __init__(self, value, text):
+        super().__init__(text)
+        self.value = value
+        self.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+
+    def __lt__(self, other):
+        if isinstance(other, NumericItem):
+            return self.value < other.value
+        return super().__lt__(other)
+
+
+class SweepResultsDialog(QDialog):
+    """
+    Sortable table of parameter sweep results (see core.sweep.run_sweep).
+    The chosen result is available as selected_result() after the dialog is accepted.
+    """
+
+    def __init__(self, results, parent=None):
+        super().__init__(parent)
+        self.setObjectName("SweepResultsDialog")
+        self.setWindowTitle("Przegląd wag")
+        self.resize(760, 420)
+        self.results = results
+
+        layout = QVBoxLayout(self)
+        info = QLabel(
+            "Kliknij nagłówek, aby posortować. Wiersze oznaczone ★ nie są gorsze od żadnego innego\n"
+            "jednocześnie pod każdym względem. Wybierz wiersz i wczytaj grafik."
+        )
+        info.setWordWrap(True)
+        layout.addWidget(info)
+
+        self.table = QTableWidget(len(results), len(SWEEP_COLUMNS) + 1)
+        self.table.setHorizontalHeaderLabels([""] + [header for _, header, _ in SWEEP_COLUMNS])
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+
+        for row, result in enumerate(results):
+            marker = QTableWidgetItem("★" if result['pareto'] else "")
+            # note: the result index travels with the row, so it survives sorting
+            marker.setData(Qt.ItemDataRole.UserRole, row)
+            self.table.setItem(row, 0, marker)
+            for col, (key, _, fmt) in enumerate(SWEEP_COLUMNS, start=1):
+                self.table.setItem(row, col, NumericItem(result[key], fmt.format(result[key])))
+        self.table.setSortingEnabled(True)
+        if results:
+            self.table.selectRow(0)
+        self.table.doubleClicked.connect(self.accept)
+        layout.addWidget(self.table)
+
+        self.buttonBox = QDialogButtonBox(
+            QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel
+        )
+        self.buttonBox.button(QDialogButtonBox.StandardButton.Ok).setText("Wczytaj grafik")
+        self.buttonBox.accepted.connect(self.accept)
+        self.buttonBox.rejected.connect(self.reject)
+        layout.addWidget(self.buttonBox)
+
+    def selected_result(self):
+        """
+        Returns the result dict of the selected row, or None.
+        """
+        row = self.table.currentRow()
+        if row < 0:
+            return None
+        return self.results[self.table.item(row, 0).data(Qt.ItemDataRole.UserRole)]
@@ -0,0 +1,147 @@
+"""
+Side-by-side benchmark of the ShiftModel formulations ('standard' and 'compact').
+
+For every formulation it reports the model size, the build and presolve times, the
+objective and bound reached within the time limit and the time at which the final
+objective was first found. The poll is synthetic and reproducible from its seed.
+
+Run from the repository root:
+    python -m benchmarks.compare_formulations --people 40 --days 5 --time-limit 60
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from ortools.sat.python import cp_model
+
+from core.availability_index import AvailabilityIndex
+from core.availability_matrix import AvailabilityMatrix
+from core.pruning import prune_availability
+from core.scheduler import build_day_slots, ShiftModel, SolutionStreamer
+
+
+def make_poll(people, days, shift_duration, seed, available=0.45, if_needed=0.1, run_length=4):
+    """
+    Generates participants with random availability in runs of run_length slots.
+
+    Returns:
+        tuple: (participants, poll_dates, day_ranges) in the format used by the services.
+    """
+    rnd = random.Random(seed)
+    base = datetime(2025, 3, 3)
+    poll_dates = []
+    day_ranges = {}
+    for d in range(days):
+        start = base + timedelta(days=d, hours=9)
+        poll_dates.append(start.date().isoformat())
+        day_ranges[poll_dates[-1]] = (start, start + timedelta(hours=8))
+
+    participants = []
+    step = timedelta(minutes=shift_duration)
+    for i in range(people):
+        availabilities, ifNeeded = [], []
+        for day_str in poll_dates:
+            t, end = day_ranges[day_str]
+            k = 0
+            while t < end:
+                if k % run_length == 0:
+                    r = rnd.random()
+                if r < available:
+                    availabilities.append((t, t + step))
+                elif r < available + if_needed:
+                    ifNeeded.append((t, t + step))
+                t += step
+                k += 1
+        participants.append({'name': f'P{i}', 'availabilities': availabilities, 'ifNeeded': ifNeeded})
+    return participants, poll_dates, day_ranges
+
+
+def run(formulation, participants, slot_list, matrix, caps, args):
+    """
+    Builds, presolves and solves one formulation.
+
+    Returns:
+        dict: Measurements of the run.
+    """
+    started = time.perf_counter()
+    shift_model = ShiftModel(participants, slot_list, matrix, formulation=formulation)
+    shift_model.configure(
+        args.num_required, args.min_required, args.max_hours, args.max_hours_per_day,
+        max_hours_by_participant=caps
+    )
+    build_time = time.perf_counter() - started
+    proto = shift_model.model.Proto()
+
+    presolver = cp_model.CpSolver()
+    presolver.parameters.num_workers = args.threads
+    presolver.parameters.stop_after_presolve = True
+    presolver.parameters.random_seed = args.seed
+    presolver.Solve(shift_model.model)
+
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = args.time_limit
+    solver.parameters.num_workers = args.threads
+    solver.parameters.random_seed = args.seed
+    improvements = []
+    streamer = SolutionStreamer(shift_model.decode, lambda progress: improvements.append(
+        (progress['objective'], progress['wall_time'])
+    ))
+    status = solver.Solve(shift_model.model, streamer)
+
+    result = {
+        'variables': len(proto.variables),
+        'constraints': len(proto.constraints),
+        'build [s]': build_time,
+        'presolve [s]': presolver.WallTime(),
+        'status': solver.StatusName(status),
+        'objective': solver.ObjectiveValue() if improvements else None,
+        'bound': solver.BestObjectiveBound(),
+        'time to best [s]': None,
+        'total [s]': solver.WallTime(),
+    }
+    if improvements:
+        result['time to best [s]'] = next(t for obj, t in improvements if obj >= result['objective'])
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--people', type=int, default=40)
+    parser.add_argument('--days', type=int, default=5)
+    parser.add_argument('--shift-duration', type=int, default=30)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--num-required', type=int, default=3)
+    parser.add_argument('--min-required', type=int, default=1)
+    parser.add_argument('--max-hours', type=float, default=8)
+    parser.add_argument('--max-hours-per-day', type=float, default=2)
+    parser.add_argument('--time-limit', type=float, default=60)
+    parser.add_argument('--threads', type=int, default=4)
+    args = parser.parse_args()
+
+    participants, poll_dates, day_ranges = make_poll(args.people, args.days, args.shift_duration, args.seed)
+    _, slot_list = build_day_slots(participants, poll_dates, args.shift_duration, day_ranges)
+    matrix = AvailabilityMatrix(participants, slot_list, AvailabilityIndex(participants))
+    matrix, caps, _ = prune_availability(
+        matrix, slot_list, args.min_required, args.max_hours, args.max_hours_per_day
+    )
+    print(f"{len(participants)} participants, {len(slot_list)} slots, time limit {args.time_limit:g} s, "
+          f"{args.threads} threads\n")
+
+    results = {f: run(f, participants, slot_list, matrix, caps, args) for f in ShiftModel.FORMULATIONS}
+
+    def fmt(value):
+        if value is None:
+            return "-"
+        if isinstance(value, float):
+            return f"{value:.2f}"
+        return str(value)
+
+    width = max(len(key) for key in results['standard'])
+    print(f"{'':<{width}}  " + "  ".join(f"{f:>12}" for f in results))
+    for key in results['standard']:
+        print(f"{key:<{width}}  " + "  ".join(f"{fmt(r[key]):>12}" for r in results.values()))
+
+
+if __name__ == '__main__':
+    main()
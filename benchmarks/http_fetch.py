@@ -0,0 +1,219 @@
+"""
+Offline benchmark of core.http_client against a local stub of the poll APIs.
+
+The stub answers GET /poll?id=<key>&fail=<n>&delay=<s> with a JSON payload of --size bytes
+(gzip-compressed when the client asks for it) and an ETag, after waiting delay seconds, or with
+304 to a matching If-None-Match. The first n requests for every key are answered with 503 and
+Retry-After: 0. Three scenarios are measured, each with a bare requests.get() per call (as the
+services used to do) and with the shared client:
+    - sequential fetches (connection reuse, compression),
+    - fetches that fail twice before succeeding (retries),
+    - a server that hangs longer than the read timeout.
+A fourth one re-opens unchanged polls with http_client.get_json(): without the disk cache,
+revalidated against the cache (304), and in offline mode.
+
+Run from the repository root:
+    python -m benchmarks.http_fetch --requests 50 --latency 0.02
+"""
+import argparse
+import gzip
+import json
+import statistics
+import tempfile
+import threading
+import time
+import zlib
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from urllib.parse import urlparse, parse_qs
+
+import requests
+
+from core import http_client
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    Poll API stub; the server object carries the payload, latency and per-key failure counters.
+    """
+
+    protocol_version = 'HTTP/1.1'
+    # note: headers and body are separate writes, Nagle would hold the body back on kept-alive connections
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        server = self.server
+        query = parse_qs(urlparse(self.path).query)
+        key = query.get('id', [''])[0]
+        fail = int(query.get('fail', ['0'])[0])
+        delay = float(query.get('delay', [server.latency])[0])
+        with server.lock:
+            server.connections.add(self.client_address)
+            server.hits[key] += 1
+            attempt = server.hits[key]
+        time.sleep(delay)
+
+        if attempt <= fail:
+            self.send_response(503)
+            self.send_header('Retry-After', '0')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        if self.headers.get('If-None-Match') == server.etag:
+            self.send_response(304)
+            self.send_header('ETag', server.etag)
+            self.end_headers()
+            return
+        body = server.payload
+        self.send_response(200)
+        self.send_header('ETag', server.etag)
+        self.send_header('Content-Type', 'application/json')
+        if 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = server.payload_gzip
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # the client gave up waiting (hung server scenario)
+            return
+        with server.lock:
+            server.bytes_sent += len(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub(size, latency):
+    """
+    Starts the stub server on a free local port in a daemon thread.
+
+    Returns:
+        ThreadingHTTPServer: The running server (base URL in server.url).
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    server.daemon_threads = True
+    entry = {'name': 'Participant', 'availability': ['2025-03-03T09:00:00.000Z'] * 4}
+    server.payload = json.dumps([entry] * max(1, size // len(json.dumps(entry)))).encode()
+    server.payload_gzip = gzip.compress(server.payload)
+    server.etag = f'"{zlib.crc32(server.payload):08x}"'
+    server.latency = latency
+    server.lock = threading.Lock()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/poll"
+    reset_stub(server)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def reset_stub(server):
+    server.hits = defaultdict(int)
+    server.connections = set()
+    server.bytes_sent = 0
+
+
+def measure(server, fetch, count, prefix, fail=0, delay=None):
+    """
+    Runs count fetches with distinct keys.
+
+    Returns:
+        dict: Measurements of the run.
+    """
+    reset_stub(server)
+    times, ok, errors = [], 0, defaultdict(int)
+    for k in range(count):
+        params = {'id': f'{prefix}{k}', 'fail': fail}
+        if delay is not None:
+            params['delay'] = delay
+        started = time.perf_counter()
+        try:
+            ok += fetch(server.url, params=params).status_code == 200
+        except requests.RequestException as e:
+            errors[type(e).__name__] += 1
+        times.append(time.perf_counter() - started)
+    return {
+        'ok': f"{ok}/{count}",
+        'mean [ms]': 1000 * statistics.mean(times),
+        'p95 [ms]': 1000 * sorted(times)[int(0.95 * (len(times) - 1))],
+        'connections': len(server.connections),
+        'kB received': server.bytes_sent / 1024,
+        'errors': ", ".join(f"{name} x{n}" for name, n in errors.items()) or "-",
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=50)
+    parser.add_argument('--size', type=int, default=200_000, help="payload size in bytes")
+    parser.add_argument('--latency', type=float, default=0.02, help="server think time in seconds")
+    parser.add_argument('--read-timeout', type=float, default=1.0)
+    args = parser.parse_args()
+
+    server = start_stub(args.size, args.latency)
+    http_client.configure(connect_timeout=2, read_timeout=args.read_timeout, retries=3)
+
+    def bare(url, params):
+        return requests.get(url, params=params)
+
+    def client(url, params):
+        return http_client.get(url, params=params)
+
+    scenarios = [
+        ("sequential", dict(count=args.requests)),
+        ("503 twice, then 200", dict(count=max(1, args.requests // 5), fail=2)),
+        # note: without a timeout requests.get() would wait for the hung server forever
+        (f"hangs {2 * args.read_timeout:g} s", dict(count=2, delay=2 * args.read_timeout)),
+    ]
+    for title, options in scenarios:
+        results = {}
+        for name, fetch in (("requests.get", bare), ("http_client", client)):
+            if name == "requests.get" and 'delay' in options:
+                results[name] = None
+                continue
+            results[name] = measure(server, fetch, prefix=f"{title}-{name}-", **options)
+        print_table(title, results)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        http_client.configure(cache_dir=cache_dir)
+        count = max(1, args.requests // 5)
+        # info: first visit of every poll fills the cache
+        measure(server, json_fetch(), count, prefix="reopen-")
+        results = {
+            "no cache": measure(server, json_fetch(use_cache=False), count, prefix="reopen-"),
+            "revalidated": measure(server, json_fetch(), count, prefix="reopen-"),
+        }
+        http_client.configure(offline=True)
+        results["offline"] = measure(server, json_fetch(), count, prefix="reopen-")
+        http_client.configure(offline=False)
+        print_table("reopen unchanged poll (get_json)", results)
+    server.shutdown()
+
+
+def json_fetch(use_cache=True):
+    """
+    Fetch function for measure() calling http_client.get_json().
+    """
+    def fetch(url, params):
+        http_client.get_json(url, params=params, use_cache=use_cache)
+        # note: get_json() raises unless the status was 200 (or 304)
+        return SimpleNamespace(status_code=200)
+    return fetch
+
+
+def print_table(title, results):
+    """
+    Prints the measure() results side by side, None for a client that was not run.
+    """
+    print(f"\n{title}")
+    keys = next(r for r in results.values() if r)
+    print(f"{'':<14}" + "".join(f"{name:>20}" for name in results))
+    for key in keys:
+        row = []
+        for r in results.values():
+            value = "(blocks)" if r is None else r[key]
+            row.append(f"{value:>20.1f}" if isinstance(value, float) else f"{value:>20}")
+        print(f"{key:<14}" + "".join(row))
+
+if __name__ == '__main__':
+    main()
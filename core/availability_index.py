@@ -0,0 +1,124 @@
+from bisect import bisect_right
+
+
+def merge_intervals(intervals):
+    """
+    Sorts the given intervals and merges the ones that overlap or touch.
+
+    Args:
+        intervals (list): List of tuples (start_dt, end_dt).
+
+    Returns:
+        list: Sorted list of disjoint (start_dt, end_dt) tuples.
+    """
+    merged = []
+    for interval in sorted(intervals):
+        if merged and interval[0] <= merged[-1][1]:
+            if interval[1] > merged[-1][1]:
+                merged[-1] = (merged[-1][0], interval[1])
+        else:
+            # note: intervals that are not extended are kept as they are (shared slot tuples stay shared)
+            merged.append(tuple(interval))
+    return merged
+
+
+class AvailabilityIndex:
+    """
+    Eligibility index built once per poll.
+
+    Each participant's 'availabilities' and 'ifNeeded' lists are merged into sorted,
+    disjoint intervals, so checking whether a slot fits into someone's availability
+    is a single bisect instead of a linear any() scan.
+
+    Rows follow the order of the participants list. Name lookups resolve to the first
+    participant with that name, the same way the rest of the application does.
+    """
+
+    def __init__(self, participants):
+        """
+        Builds the index.
+
+        Args:
+            participants (list): List of participant dictionaries with keys
+                'name', 'availabilities' and (optionally) 'ifNeeded'.
+        """
+        self.names = []
+        self.rows = {}
+        self._normal = []
+        self._if_needed = []
+        for row, p in enumerate(participants):
+            self.names.append(p['name'])
+            self.rows.setdefault(p['name'], row)
+            self._normal.append(self._split(merge_intervals(p.get('availabilities', []))))
+            self._if_needed.append(self._split(merge_intervals(p.get('ifNeeded', []))))
+
+    def __len__(self):
+        return len(self.names)
+
+    @staticmethod
+    def _split(intervals):
+        return [s for s, _ in intervals], [e for _, e in intervals]
+
+    @staticmethod
+    def _contains(split_intervals, start_dt, end_dt):
+        starts, ends = split_intervals
+        k = bisect_right(starts, start_dt) - 1
+        return k >= 0 and end_dt <= ends[k]
+
+    def intervals(self, row, if_needed=False):
+        """
+        Returns the merged intervals of a participant as two sorted lists (starts, ends).
+
+        Args:
+            row (int): Participant index (position in the participants list).
+            if_needed (bool, optional): Return the 'ifNeeded' intervals instead of the normal ones.
+        """
+        return self._if_needed[row] if if_needed else self._normal[row]
+
+    def flags(self, row, start_dt, end_dt):
+        """
+        Returns the availability flags of a participant for a single slot.
+
+        Args:
+            row (int): Participant index (position in the participants list).
+            start_dt (datetime): Slot start.
+            end_dt (datetime): Slot end.
+
+        Returns:
+            tuple: (normal_ok, ifneeded_ok) booleans.
+        """
+        return (
+            self._contains(self._normal[row], start_dt, end_dt),
+            self._contains(self._if_needed[row], start_dt, end_dt)
+        )
+
+    def flags_for(self, name, start_dt, end_dt):
+        """
+        Same as flags(), but looks the participant up by name.
+        Unknown names (e.g. externally added people) have no availability.
+        """
+        row = self.rows.get(name)
+        if row is None:
+            return False, False
+        return self.flags(row, start_dt, end_dt)
+
+    def eligibility(self, slot_list):
+        """
+        Computes the eligible slots of every participant.
+
+        Args:
+            slot_list (list): List of time slots as tuples (start_dt, end_dt).
+
+        Returns:
+            list: One dict per participant mapping a slot index to a boolean that is True
+                when the slot is covered only by 'ifNeeded' availability.
+        """
+        result = []
+        for row in range(len(self.names)):
+            eligible = {}
+            for j, (start_dt, end_dt) in enumerate(slot_list):
+                normal_ok, ifneeded_ok = self.flags(row, start_dt, end_dt)
+                if normal_ok or ifneeded_ok:
+                    eligible[j] = not normal_ok
+            result.append(eligible)
+        return result
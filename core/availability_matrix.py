@@ -0,0 +1,143 @@
+import numpy as np
+
+from core.availability_index import AvailabilityIndex
+
+# Availability states stored in AvailabilityMatrix.states
+UNAVAILABLE = 0
+IF_NEEDED = 1
+AVAILABLE = 2
+
+
+def _to_datetime64(values):
+    return np.array(values, dtype='datetime64[s]').reshape(-1)
+
+
+class AvailabilityMatrix:
+    """
+    Dense participant x slot availability matrix.
+
+    states[i, j] holds the availability state of participant i in slot j:
+        - UNAVAILABLE (0): the slot does not fit the participant's availability,
+        - IF_NEEDED (1): the slot is covered only by 'ifNeeded' availability,
+        - AVAILABLE (2): the slot is covered by normal availability.
+
+    Rows follow the order of the participants list and columns follow slot_list,
+    so model construction, coverage counts, highlight masks and validation can be
+    done with vectorized operations.
+
+    Attributes:
+        states (np.ndarray): uint8 array of shape (participants, slots).
+        row_of (dict): Maps a participant name to its row (first participant with that name).
+        col_of (dict): Maps a slot tuple (start_dt, end_dt) to its column.
+        slot_list (list): The slots the columns refer to.
+    """
+
+    def __init__(self, participants, slot_list, availability_index=None):
+        """
+        Builds the matrix.
+
+        Args:
+            participants (list): List of participant dictionaries.
+            slot_list (list): List of time slots as tuples (start_dt, end_dt).
+            availability_index (AvailabilityIndex, optional): Index to build from; built here if omitted.
+        """
+        if availability_index is None or len(availability_index) != len(participants):
+            availability_index = AvailabilityIndex(participants)
+
+        self.slot_list = list(slot_list)
+        self.row_of = dict(availability_index.rows)
+        self.col_of = {}
+        for j, slot in enumerate(self.slot_list):
+            self.col_of.setdefault(slot, j)
+
+        self.states = np.zeros((len(participants), len(self.slot_list)), dtype=np.uint8)
+        if not self.slot_list:
+            return
+
+        slot_starts = _to_datetime64([s for s, _ in self.slot_list])
+        slot_ends = _to_datetime64([e for _, e in self.slot_list])
+
+        # info: all interval bounds are converted to datetime64 in one batch and sliced per participant
+        for state, if_needed in ((IF_NEEDED, True), (AVAILABLE, False)):
+            per_row = [availability_index.intervals(row, if_needed=if_needed) for row in range(len(participants))]
+            all_starts = _to_datetime64([s for starts, _ in per_row for s in starts])
+            all_ends = _to_datetime64([e for _, ends in per_row for e in ends])
+            offset = 0
+            for row, (starts, _) in enumerate(per_row):
+                count = len(starts)
+                if count:
+                    covered = self._covered(
+                        all_starts[offset:offset + count], all_ends[offset:offset + count],
+                        slot_starts, slot_ends
+                    )
+                    self.states[row, covered] = state
+                offset += count
+
+    @staticmethod
+    def _covered(starts, ends, slot_starts, slot_ends):
+        """
+        Vectorized bisect: True for every slot contained in one of the merged intervals.
+        """
+        k = np.searchsorted(starts, slot_starts, side='right') - 1
+        valid = k >= 0
+        covered = np.zeros(len(slot_starts), dtype=bool)
+        covered[valid] = slot_ends[valid] <= ends[k[valid]]
+        return covered
+
+    def subset(self, columns, slot_list=None):
+        """
+        Returns a new matrix restricted to the given columns.
+
+        Args:
+            columns (list): Column indices to keep, in the order of the new matrix.
+            slot_list (list, optional): Slot tuples labelling the new columns. Defaults to
+                the original slots of the kept columns.
+        """
+        sub = object.__new__(AvailabilityMatrix)
+        sub.slot_list = list(slot_list) if slot_list is not None else [self.slot_list[j] for j in columns]
+        sub.row_of = dict(self.row_of)
+        sub.col_of = {}
+        for j, slot in enumerate(sub.slot_list):
+            sub.col_of.setdefault(slot, j)
+        sub.states = self.states[:, list(columns)]
+        return sub
+
+    @property
+    def shape(self):
+        return self.states.shape
+
+    def eligible(self):
+        """
+        Returns a boolean mask of the (participant, slot) pairs that can be assigned.
+        """
+        return self.states != UNAVAILABLE
+
+    def eligible_counts(self):
+        """
+        Returns the number of eligible participants per slot.
+        """
+        return self.eligible().sum(axis=0)
+
+    def row(self, name):
+        """
+        Returns the availability states of a participant across all slots.
+        Unknown names (e.g. externally added people) get an all-UNAVAILABLE row.
+        """
+        row = self.row_of.get(name)
+        if row is None:
+            return np.zeros(len(self.slot_list), dtype=np.uint8)
+        return self.states[row]
+
+    def state(self, name, slot):
+        """
+        Returns the availability state of a participant in a single slot.
+
+        Args:
+            name (str): Participant name.
+            slot (tuple): Slot tuple (start_dt, end_dt).
+        """
+        row = self.row_of.get(name)
+        col = self.col_of.get(slot)
+        if row is None or col is None:
+            return UNAVAILABLE
+        return int(self.states[row, col])
@@ -1,8 +1,10 @@
-import requests
 from datetime import timedelta, datetime
 from dateutil import parser, tz
 from urllib.parse import urlparse, urlunparse
 
+from core import http_client
+from core.availability_index import merge_intervals
+
 def convert_to_local(time_str, time_offset_hours):
     """
     Convert an ISO-formatted UTC time string to local time by applying the specified offset.
@@ -23,7 +25,7 @@ def convert_to_local(time_str, time_offset_hours):
     except Exception:
         return None
 
-def fetch_event_data(user_url):
+def fetch_event_data(user_url, on_progress=None, cancel=None):
     """
     Convert a user-provided URL to the corresponding API URL and fetch event data.
 
@@ -33,12 +35,16 @@ def fetch_event_data(user_url):
 
     Args:
         user_url (str): The URL provided by the user.
+        on_progress (callable, optional): Called as on_progress(received, total) with the bytes
+            received so far (see http_client.get_json()).
+        cancel (threading.Event, optional): Cancels the download when set.
 
     Returns:
         dict: The JSON response from the API.
 
     Raises:
         Exception: If the HTTP request fails.
+        http_client.FetchCancelled: If cancel was set.
     """
     parsed = urlparse(user_url)
     if not parsed.netloc.startswith("api."):
@@ -50,12 +56,9 @@ def fetch_event_data(user_url):
     api_url = urlunparse((parsed.scheme, new_netloc, new_path, parsed.params, parsed.query, parsed.fragment))
     
     headers = {"Accept": "application/json"}
-    response = requests.get(api_url, headers=headers)
-    if response.status_code != 200:
-        raise Exception(f"Request failed with status code: {response.status_code}")
-    return response.json()
+    return http_client.get_json(api_url, on_progress=on_progress, cancel=cancel, headers=headers)
 
-def process_data(json_response, time_offset_hours=0):
+def process_data(json_response, time_offset_hours=0, on_progress=None):
     """
     Process the JSON response and return participants, poll dates, and day ranges.
 
@@ -67,34 +70,42 @@ def process_data(json_response, time_offset_hours=0):
     Args:
         json_response (dict): JSON data from the event API.
         time_offset_hours (int or float, optional): Hours to adjust times to local time. Defaults to 0.
+        on_progress (callable, optional): Called as on_progress(parsed, total) after every respondent.
 
     Returns:
         tuple: A tuple containing:
             - participants (list): Each participant is a dict with keys 'name', 'email',
-                'availabilities' (list of (start, end) tuples), and 'ifNeeded' (empty list).
+                'availabilities' (sorted list of disjoint (start, end) tuples, adjacent slots
+                merged), and 'ifNeeded' (empty list).
             - poll_dates (list): List of date strings.
             - day_ranges (dict): Mapping of each date to a (local_start, local_end) tuple.
     """
     poll_dates = json_response.get("tentativeDates", [])
     respondents = json_response.get("respondents", [])
     participants = []
+    # note: respondents share the poll's slot timestamps, every distinct string is parsed once
+    local_slots = {}
+
+    def to_slot(time_str):
+        if time_str not in local_slots:
+            start_time = convert_to_local(time_str, time_offset_hours)
+            local_slots[time_str] = (start_time, start_time + timedelta(minutes=30)) if start_time else None
+        return local_slots[time_str]
 
     for respondent in respondents:
         name = respondent.get("name", "Brak imienia")
         email = "Brak emaila"
         availabilities_raw = respondent.get("availabilities", [])
-        avail_times = []
-        for time_str in availabilities_raw:
-            start_time = convert_to_local(time_str, time_offset_hours)
-            if start_time:
-                end_time = start_time + timedelta(minutes=30)
-                avail_times.append((start_time, end_time))
+        # info: adjacent 30-minute points are coalesced into maximal intervals
+        avail_times = merge_intervals([slot for slot in map(to_slot, availabilities_raw) if slot])
         participants.append({
             'name': name,
             'email': email,
             'availabilities': avail_times,
             'ifNeeded': []  # note: cabbageMeet does not support the ifNeeded option -> empty list
         })
+        if on_progress is not None:
+            on_progress(len(participants), len(respondents))
 
     min_start = json_response.get("minStartHour", 9)
     max_end = json_response.get("maxEndHour", 17)
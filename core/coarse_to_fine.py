@@ -0,0 +1,154 @@
+import time
+
+import numpy as np
+
+from core.availability_matrix import AvailabilityMatrix, UNAVAILABLE, IF_NEEDED, AVAILABLE
+from core.scheduler import assign_shifts, schedule_to_rows, build_schedule
+from core.slot_blocks import expand_schedule
+
+
+def coarse_blocks(slot_list, coarse_minutes):
+    """
+    Groups consecutive slots into blocks aligned to a coarser grid of the clock
+    (e.g. 15-minute slots into full hours for coarse_minutes=60).
+
+    Args:
+        slot_list (list): List of time slots as tuples (start_dt, end_dt).
+        coarse_minutes (int): Length of the coarse grid in minutes.
+
+    Returns:
+        list: Blocks as lists of slot indices, in time order.
+    """
+    order = sorted(range(len(slot_list)), key=lambda j: slot_list[j][0])
+    blocks = []
+    previous_key = None
+    for j in order:
+        start_dt, _ = slot_list[j]
+        key = (start_dt.date(), (start_dt.hour * 60 + start_dt.minute) // coarse_minutes)
+        if blocks and key == previous_key and slot_list[blocks[-1][-1]][1] == start_dt:
+            blocks[-1].append(j)
+        else:
+            blocks.append([j])
+        previous_key = key
+    return blocks
+
+
+def coarse_matrix(availability_matrix, blocks, block_list):
+    """
+    Availability over coarse blocks: a participant is eligible for a block when eligible for at
+    least half of its slots, and 'ifNeeded' there when any of those slots is 'ifNeeded'.
+
+    Returns:
+        AvailabilityMatrix: Matrix over the participants and block_list.
+    """
+    states = availability_matrix.states
+    matrix = availability_matrix.subset([b[0] for b in blocks], block_list)
+    coarse_states = np.full(matrix.states.shape, UNAVAILABLE, dtype=states.dtype)
+    for b, block in enumerate(blocks):
+        eligible = states[:, block] != UNAVAILABLE
+        mostly = 2 * eligible.sum(axis=1) >= len(block)
+        if_needed = (states[:, block] == IF_NEEDED).any(axis=1)
+        coarse_states[mostly, b] = np.where(if_needed[mostly], IF_NEEDED, AVAILABLE)
+    matrix.states = coarse_states
+    return matrix
+
+
+def assign_shifts_coarse_to_fine(
+    participants,
+    slot_list,
+    num_required,
+    min_required,
+    max_hours,
+    max_hours_per_day,
+    solver_time_limit,
+    solver_num_threads,
+    coarse_minutes=60,
+    coarse_share=0.3,
+    solve=assign_shifts,
+    availability_index=None,
+    availability_matrix=None,
+    hint_schedule=None,
+    on_solution=None,
+    control=None,
+    **kwargs
+):
+    """
+    Two-stage solve for fine slot grids (e.g. the 15-minute slots of Timeful polls).
+
+    The poll is first solved over coarse blocks of coarse_minutes (see coarse_blocks() and
+    coarse_matrix()) for coarse_share of the time limit. The fine solve then runs on the full
+    model for the rest of the time, starting from the coarse schedule as a hint. The coarse
+    model is several times smaller and yields a good schedule quickly, so the fine solve starts
+    far ahead of a direct solve; nothing is ruled out, so its optimum and bound are those of
+    the direct solve.
+
+    Args:
+        participants, slot_list, num_required, min_required, max_hours, max_hours_per_day,
+        solver_time_limit, solver_num_threads, availability_index, availability_matrix,
+        control: Same as in assign_shifts().
+        coarse_minutes (int, optional): Length of the coarse blocks in minutes.
+        coarse_share (float, optional): Share of solver_time_limit given to the coarse solve.
+        solve (callable, optional): Solver run in both stages, assign_shifts() or
+            core.symmetry.assign_shifts_grouped().
+        hint_schedule (list, optional): Hint on the original slot grid, used by the coarse solve.
+        on_solution (callable, optional): Progress callback of the fine solve.
+        **kwargs: Objective weights and options passed on to solve. A model_cache keeps the
+            coarse and the fine model, both are the same between re-solves of a poll.
+
+    Returns:
+        tuple: (schedule_data, total_hours), or (None, None) if no feasible solution is found.
+    """
+    if not participants or not slot_list:
+        return None, None
+
+    if availability_matrix is None or availability_matrix.shape != (len(participants), len(slot_list)):
+        availability_matrix = AvailabilityMatrix(participants, slot_list, availability_index)
+    if max_hours_per_day > 0:
+        coarse_minutes = min(coarse_minutes, int(max_hours_per_day * 60))
+    blocks = coarse_blocks(slot_list, coarse_minutes)
+    common = dict(
+        kwargs,
+        participants=participants,
+        num_required=num_required,
+        min_required=min_required,
+        max_hours=max_hours,
+        max_hours_per_day=max_hours_per_day,
+        solver_num_threads=solver_num_threads,
+    )
+    if len(blocks) == len(slot_list):
+        return solve(
+            **common, slot_list=slot_list, solver_time_limit=solver_time_limit,
+            availability_matrix=availability_matrix, hint_schedule=hint_schedule,
+            on_solution=on_solution, control=control
+        )
+
+    started = time.monotonic()
+    block_list = [(slot_list[b[0]][0], slot_list[b[-1]][1]) for b in blocks]
+    if hint_schedule:
+        hint_rows = schedule_to_rows(hint_schedule, participants, slot_list)
+        hint_schedule, _ = build_schedule(participants, block_list, {
+            b: sorted({i for j in block for i in hint_rows.get(j, ())}) for b, block in enumerate(blocks)
+        })
+    coarse_schedule, _ = solve(
+        **common,
+        slot_list=block_list,
+        solver_time_limit=coarse_share * solver_time_limit,
+        availability_matrix=coarse_matrix(availability_matrix, blocks, block_list),
+        slot_weights=[len(b) for b in blocks],
+        hint_schedule=hint_schedule,
+        control=control.child() if control is not None else None,
+    )
+
+    fine_hint = None
+    if coarse_schedule is not None:
+        fine_hint = expand_schedule(coarse_schedule, blocks, block_list, slot_list)
+
+    return solve(
+        **common,
+        slot_list=slot_list,
+        solver_time_limit=max(1.0, solver_time_limit - (time.monotonic() - started)),
+        availability_matrix=availability_matrix,
+        hint_schedule=fine_hint,
+        on_solution=on_solution,
+        control=control,
+    )
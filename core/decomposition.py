@@ -0,0 +1,297 @@
+import math
+import multiprocessing
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from core.availability_matrix import AvailabilityMatrix
+from core.scheduler import assign_shifts, group_slots_by_day, schedule_to_rows, SolveControl, relative_gap
+
+# Set in each worker process by _init_part()
+_shared = {}
+
+# Share of solver_time_limit kept for the rebalancing pass of assign_shifts_decomposed()
+REBALANCE_SHARE = 0.2
+# Shortest time limit a part is started with, in seconds
+MIN_PART_TIME = 0.1
+
+
+def split_slots(slot_list, split_by='day'):
+    """
+    Splits the slots into independent parts.
+
+    Args:
+        slot_list (list): List of time slots as tuples (start_dt, end_dt).
+        split_by (str, optional): 'day' or 'week' (ISO week).
+
+    Returns:
+        list: Parts in time order, each a sorted list of slot indices.
+    """
+    parts = {}
+    for d, slots_idx in sorted(group_slots_by_day(slot_list).items()):
+        key = d if split_by == 'day' else tuple(d.isocalendar())[:2]
+        parts.setdefault(key, []).extend(slots_idx)
+    return list(parts.values())
+
+
+def allocate_hour_budgets(availability_matrix, slot_list, parts, num_required, max_minutes, max_minutes_per_day):
+    """
+    Splits every participant's max_hours cap into per-part budgets.
+
+    A participant's capacity in a part is the time they can work there under the daily cap.
+    When the capacities of all parts fit into max_minutes there is no coupling and each part
+    gets its full capacity. Otherwise the cap is handed out in chunks of one working day
+    (max_hours_per_day), each chunk going to the part whose staffing demand is the least
+    covered by the budgets allocated so far, which acts as a price on over-supplied parts.
+    Participants with the fewest options are allocated first.
+
+    Args:
+        availability_matrix (AvailabilityMatrix): Matrix over participants and slot_list.
+        slot_list (list): List of time slots as tuples (start_dt, end_dt).
+        parts (list): Output of split_slots().
+        num_required (int): Maximum number of participants per slot.
+        max_minutes (int): Maximum minutes per participant over the entire period.
+        max_minutes_per_day (int): Maximum minutes per participant per day.
+
+    Returns:
+        tuple: (budgets, capacity) integer arrays of shape (participants, parts) in minutes.
+    """
+    eligible = availability_matrix.states > 0
+    minutes = np.array([int((end_dt - start_dt).total_seconds() // 60) for start_dt, end_dt in slot_list])
+
+    num_participants = eligible.shape[0]
+    capacity = np.zeros((num_participants, len(parts)), dtype=int)
+    demand = np.zeros(len(parts))
+    for p, part in enumerate(parts):
+        for slots_idx in group_slots_by_day([slot_list[j] for j in part]).values():
+            cols = [part[k] for k in slots_idx]
+            capacity[:, p] += np.minimum(eligible[:, cols] @ minutes[cols], max_minutes_per_day)
+        demand[p] = (np.minimum(num_required, eligible[:, part].sum(axis=0)) * minutes[part]).sum()
+
+    budgets = np.minimum(capacity, max_minutes)
+    coupled = np.nonzero(capacity.sum(axis=1) > max_minutes)[0]
+    # Demand left for the coupled participants once the uncoupled ones have taken their full capacity
+    remaining = demand - np.delete(budgets, coupled, axis=0).sum(axis=0)
+    chunk = max(1, min(max_minutes_per_day, max_minutes)) if max_minutes_per_day > 0 else max(1, max_minutes)
+    for i in sorted(coupled, key=lambda i: (np.count_nonzero(capacity[i]), i)):
+        budgets[i] = 0
+        left = max_minutes
+        while left > 0:
+            open_parts = np.nonzero(budgets[i] < capacity[i])[0]
+            if not len(open_parts):
+                break
+            p = open_parts[np.argmax(remaining[open_parts] / np.maximum(1, demand[open_parts]))]
+            amount = min(chunk, left, capacity[i, p] - budgets[i, p])
+            budgets[i, p] += amount
+            remaining[p] -= amount
+            left -= amount
+    return budgets, capacity
+
+
+def _init_part(stop_event):
+    _shared['stop'] = stop_event
+
+
+def _solve_part(engine, kwargs):
+    """
+    Solves one part; executed in a worker process.
+    """
+    control = SolveControl(
+        kwargs.pop('relative_gap_limit', 0.0), kwargs.pop('no_improvement_time', 0), stop_event=_shared['stop']
+    )
+    schedule_data, total_hours = engine(**kwargs, control=control)
+    return control.objective, control.best_bound, schedule_data, total_hours
+
+
+def _merge(participants, part_results):
+    schedule_data = []
+    total_hours = {p['name']: 0.0 for p in participants}
+    for _, _, part_schedule, part_hours in part_results:
+        schedule_data.extend(part_schedule or [])
+        for name, hours in (part_hours or {}).items():
+            total_hours[name] = total_hours.get(name, 0.0) + hours
+    schedule_data.sort(key=lambda entry: entry['Shift Start'])
+    return schedule_data, total_hours
+
+
+def assign_shifts_decomposed(
+    participants,
+    slot_list,
+    num_required,
+    min_required,
+    max_hours,
+    max_hours_per_day,
+    solver_time_limit,
+    solver_num_threads,
+    split_by='day',
+    engine=assign_shifts,
+    availability_index=None,
+    hint_schedule=None,
+    on_solution=None,
+    control=None,
+    **kwargs
+):
+    """
+    Solves the poll as independent day or week parts in parallel processes.
+
+    Within a day nothing couples the parts, so the only link is the max_hours cap, which is
+    split into per-part budgets by allocate_hour_budgets(). Parts run in a process pool.
+    If a participant ends up with unused hours while being held back by a part budget, the
+    affected parts are re-solved once with the slack added to their budgets (hinted with
+    their first result).
+
+    solver_time_limit bounds the whole run: the first pass ends REBALANCE_SHARE of it before
+    the deadline and the rebalancing pass uses the rest. A part is started with its share
+    of the time left in its pass, split evenly over the waves of parts still to run, so no
+    part can outlive the pass.
+
+    Args:
+        participants, slot_list, num_required, min_required, max_hours, max_hours_per_day,
+        solver_time_limit, solver_num_threads: Same as in assign_shifts(). Both are totals:
+            solver_time_limit is the time of the whole run and solver_num_threads bounds the
+            number of parallel parts.
+        split_by (str, optional): 'day' or 'week'.
+        engine (callable, optional): Module-level solver for the parts, assign_shifts() or
+            core.slot_blocks.assign_shifts_aggregated(); it must accept max_hours_by_participant.
+        availability_index (AvailabilityIndex, optional): Index built once per poll.
+        hint_schedule (list, optional): Hint for the whole poll; every part uses its own slots of it.
+        on_solution (callable, optional): Called after every finished part with a progress dict
+            (see SolutionStreamer) for the parts solved so far.
+        control (SolveControl, optional): stop() stops all parts; the gap and no-improvement
+            limits apply to each part.
+        **kwargs: Objective weights passed on to engine.
+
+    Returns:
+        tuple: (schedule_data, total_hours), or (None, None) if no part found a solution.
+    """
+    if not participants or not slot_list:
+        return None, None
+
+    started = time.monotonic()
+    deadline = started + solver_time_limit
+    matrix = AvailabilityMatrix(participants, slot_list, availability_index)
+    parts = split_slots(slot_list, split_by)
+    max_minutes = int(max_hours * 60)
+    budgets, capacity = allocate_hour_budgets(
+        matrix, slot_list, parts, num_required, max_minutes, int(max_hours_per_day * 60)
+    )
+
+    workers = max(1, min(solver_num_threads, multiprocessing.cpu_count(), len(parts)))
+    common = dict(
+        kwargs,
+        participants=participants,
+        num_required=num_required,
+        min_required=min_required,
+        max_hours=max_hours,
+        max_hours_per_day=max_hours_per_day,
+        solver_num_threads=max(1, solver_num_threads // workers),
+        availability_index=availability_index,
+    )
+    if control is not None:
+        common['relative_gap_limit'] = control.relative_gap_limit
+        common['no_improvement_time'] = control.no_improvement_time
+
+    def part_job(p, part_budgets, hint, time_limit):
+        part_slots = [slot_list[j] for j in parts[p]]
+        slot_set = set(part_slots)
+        return dict(
+            common,
+            slot_list=part_slots,
+            solver_time_limit=time_limit,
+            max_hours_by_participant=[b / 60 for b in part_budgets],
+            hint_schedule=[e for e in hint or [] if (e['Shift Start'], e['Shift End']) in slot_set] or None,
+        )
+
+    stop_event = multiprocessing.Event()
+    results = [(None, None, None, None)] * len(parts)
+
+    def run(jobs, report, pass_deadline):
+        # info: jobs maps a part to (budgets, hint); parts are submitted as workers become free,
+        # so each one gets its share of the time actually left in the pass
+        queue = list(jobs)
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_part, initargs=(stop_event,))
+        try:
+            pending = {}
+            while queue or pending:
+                if control is not None and control.stop_requested:
+                    stop_event.set()
+                while queue and len(pending) < workers:
+                    waves = math.ceil(len(queue) / workers)
+                    time_limit = max(MIN_PART_TIME, (pass_deadline - time.monotonic()) / waves)
+                    p = queue.pop(0)
+                    pending[executor.submit(_solve_part, engine, part_job(p, *jobs[p], time_limit))] = p
+                done, _ = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+                for future in done:
+                    report(pending.pop(future), future.result())
+        finally:
+            executor.shutdown(wait=True)
+
+    def report_first(p, result):
+        results[p] = result
+        finished = [r for r in results if r[2] is not None]
+        if control is not None and finished:
+            control.objective = sum(r[0] for r in finished)
+            control.best_bound = sum(r[1] for r in finished)
+        if on_solution and finished:
+            objective = sum(r[0] for r in finished)
+            best_bound = sum(r[1] for r in finished)
+            schedule_data, total_hours = _merge(participants, finished)
+            on_solution({
+                'objective': objective,
+                'best_bound': best_bound,
+                'gap': relative_gap(objective, best_bound),
+                'wall_time': time.monotonic() - started,
+                'schedule_data': schedule_data,
+                'total_hours': total_hours,
+            })
+
+    run(
+        {p: (budgets[:, p], hint_schedule) for p in range(len(parts))},
+        report_first,
+        deadline - REBALANCE_SHARE * solver_time_limit,
+    )
+    if all(r[2] is None for r in results):
+        return None, None
+
+    # Rebalancing: give unused hours to the parts where a participant was held back by the budget
+    used = np.zeros(budgets.shape, dtype=int)
+    for p, (_, _, part_schedule, _) in enumerate(results):
+        part_slots = [slot_list[j] for j in parts[p]]
+        for k, rows in schedule_to_rows(part_schedule, participants, part_slots).items():
+            start_dt, end_dt = part_slots[k]
+            for i in rows:
+                used[i, p] += int((end_dt - start_dt).total_seconds() // 60)
+    slack = max_minutes - used.sum(axis=1)
+    smallest = min(int((end_dt - start_dt).total_seconds() // 60) for start_dt, end_dt in slot_list)
+    held_back = (budgets - used < smallest) & (capacity > used) & (slack[:, None] >= smallest)
+    rebalance = [p for p in range(len(parts)) if held_back[:, p].any() and results[p][2] is not None]
+    if (
+        rebalance
+        and deadline - time.monotonic() >= MIN_PART_TIME
+        and not stop_event.is_set()
+        and not (control is not None and control.stop_requested)
+    ):
+        # note: the slack is handed out slot by slot, largest headroom first, so it never exceeds max_hours
+        new_budgets = used.copy()
+        for i in np.nonzero(slack >= smallest)[0]:
+            left = slack[i]
+            while left >= smallest:
+                headroom = capacity[i, rebalance] - new_budgets[i, rebalance]
+                k = int(np.argmax(headroom))
+                if headroom[k] <= 0:
+                    break
+                amount = min(smallest, headroom[k], left)
+                new_budgets[i, rebalance[k]] += amount
+                left -= amount
+
+        def report_rebalanced(p, result):
+            if result[2] is not None and result[0] >= results[p][0]:
+                results[p] = result
+
+        run({p: (new_budgets[:, p], results[p][2]) for p in rebalance}, report_rebalanced, deadline)
+
+    finished = [r for r in results if r[2] is not None]
+    if control is not None:
+        control.objective = sum(r[0] for r in finished)
+        control.best_bound = sum(r[1] for r in finished)
+    return _merge(participants, finished)
@@ -0,0 +1,154 @@
+import numpy as np
+from collections import defaultdict
+
+from ortools.graph.python import max_flow
+
+from core.availability_matrix import UNAVAILABLE
+
+
+def check_pinned_feasibility(
+    availability_matrix,
+    slot_list,
+    pinned_rows,
+    pinned_slots_idx,
+    pinned_participants_idx,
+    num_required,
+    min_required,
+    max_hours,
+    max_hours_per_day,
+    max_hours_by_participant=None
+):
+    """
+    Polynomial pre-check of a pinned solve (see assign_shifts()), run before the model is built.
+
+    Without pins the empty schedule satisfies every limit, so only pinned assignments can make
+    the model infeasible. The check mirrors the model: assignments of pinned slots and pinned
+    participants are fixed, pinned assignments outside the availability (no variable in the model)
+    only use up hours. It finds
+        - pinned slots staffed below min_required or above num_required, and slots where pinned
+          participants alone exceed num_required,
+        - participants whose pinned shifts exceed their hour cap or the daily cap,
+        - slots where pinned participants are fewer than min_required and the missing people can
+          not be supplied. This is decided by a max-flow over source -> participant (hours left)
+          -> participant and day (daily hours left) -> slot (free eligible pairs) -> sink (missing
+          minutes). The flow is a relaxation of the model, so a shortfall proves infeasibility;
+          the min cut names the participants whose hours are the bottleneck.
+    A returned None means no conflict was found, not that the model is feasible.
+
+    Args:
+        availability_matrix (AvailabilityMatrix): Matrix over the participants and slot_list,
+            the same one the model is built from.
+        slot_list (list): List of time slots as tuples (start_dt, end_dt).
+        pinned_rows (dict): Pinned schedule as output by schedule_to_rows().
+        pinned_slots_idx (iterable): Indices of the pinned slots.
+        pinned_participants_idx (iterable): Indices of the pinned participants.
+        num_required, min_required, max_hours, max_hours_per_day, max_hours_by_participant:
+            Same as in assign_shifts().
+
+    Returns:
+        dict or None: None if no conflict was found, else a dict with the slot indices that are
+            'overstaffed', 'understaffed' (pinned slots below min_required) or 'unmet' (missing
+            people can not be supplied), the participant indices over their total cap ('hours'),
+            the (participant index, date) pairs over the daily cap ('day_hours') and the
+            participant indices whose hours are the 'bottleneck' of the unmet slots.
+    """
+    eligible = availability_matrix.states != UNAVAILABLE
+    num_participants, num_slots = eligible.shape
+    slot_minutes = [int((end_dt - start_dt).total_seconds() // 60) for start_dt, end_dt in slot_list]
+    slot_day = [start_dt.date() for start_dt, _ in slot_list]
+    pinned_slots_idx = set(pinned_slots_idx)
+    pinned_participants_idx = set(pinned_participants_idx)
+
+    fixed = np.zeros_like(eligible)
+    fixed[:, sorted(pinned_slots_idx)] = True
+    fixed[sorted(pinned_participants_idx), :] = True
+    assigned = np.zeros_like(eligible)
+    for j, rows in pinned_rows.items():
+        assigned[sorted(rows), j] = True
+    assigned &= fixed
+
+    # Hour caps in minutes, as configured in the model
+    max_minutes = int(max_hours * 60)
+    max_minutes_per_day = int(max_hours_per_day * 60)
+    caps = [max_hours] * num_participants if max_hours_by_participant is None else list(max_hours_by_participant)
+    used = [0] * num_participants
+    used_per_day = defaultdict(int)
+    for i, j in zip(*np.nonzero(assigned)):
+        i, j = int(i), int(j)
+        if eligible[i, j]:
+            used[i] += slot_minutes[j]
+            used_per_day[(i, slot_day[j])] += slot_minutes[j]
+        else:
+            # note: assign_shifts() takes these out of the participant's cap
+            caps[i] = max(0.0, caps[i] - slot_minutes[j] / 60)
+    caps = [min(max_minutes, int(round(hours * 60))) for hours in caps]
+
+    report = {
+        'overstaffed': [],
+        'understaffed': [],
+        'unmet': [],
+        'hours': [i for i in range(num_participants) if used[i] > caps[i]],
+        'day_hours': sorted(key for key, minutes in used_per_day.items() if minutes > max_minutes_per_day),
+        'bottleneck': [],
+    }
+
+    staffed = (assigned & eligible).sum(axis=0)
+    missing = {}
+    for j in range(num_slots):
+        count = int(staffed[j])
+        if count > num_required:
+            report['overstaffed'].append(j)
+        elif 0 < count < min_required:
+            if j in pinned_slots_idx:
+                report['understaffed'].append(j)
+            else:
+                missing[j] = min_required - count
+
+    if missing and not report['hours'] and not report['day_hours']:
+        report['unmet'], report['bottleneck'] = _supply_missing(
+            eligible & ~fixed, missing, slot_minutes, slot_day, caps, used, used_per_day, max_minutes_per_day
+        )
+
+    if not any(report.values()):
+        return None
+    return report
+
+
+def _supply_missing(free, missing, slot_minutes, slot_day, caps, used, used_per_day, max_minutes_per_day):
+    """
+    Max-flow of the free hours into the slots missing people (see check_pinned_feasibility()).
+
+    Returns:
+        tuple: (unmet, bottleneck) lists of slot and participant indices, both empty if every
+            slot can be supplied.
+    """
+    flow = max_flow.SimpleMaxFlow()
+    source, sink = 0, 1
+    nodes = {}
+
+    def node(key):
+        return nodes.setdefault(key, len(nodes) + 2)
+
+    slot_arcs = {}
+    demand = 0
+    for j, count in missing.items():
+        slot_arcs[j] = flow.add_arc_with_capacity(node(('slot', j)), sink, count * slot_minutes[j])
+        demand += count * slot_minutes[j]
+        for i in np.nonzero(free[:, j])[0]:
+            i, d = int(i), slot_day[j]
+            if ('person', i) not in nodes:
+                flow.add_arc_with_capacity(source, node(('person', i)), caps[i] - used[i])
+            if ('day', i, d) not in nodes:
+                flow.add_arc_with_capacity(
+                    node(('person', i)), node(('day', i, d)), max_minutes_per_day - used_per_day[(i, d)]
+                )
+            flow.add_arc_with_capacity(node(('day', i, d)), node(('slot', j)), slot_minutes[j])
+
+    if flow.solve(source, sink) != flow.OPTIMAL or flow.optimal_flow() >= demand:
+        return [], []
+
+    unmet = sorted(j for j, arc in slot_arcs.items() if flow.flow(arc) < flow.capacity(arc))
+    # Nodes that can still reach the sink: their incoming hour arcs are saturated by the cut
+    sink_side = set(flow.get_sink_side_min_cut())
+    bottleneck = sorted({key[1] for key, n in nodes.items() if key[0] != 'slot' and n in sink_side})
+    return unmet, bottleneck
@@ -0,0 +1,155 @@
+import numpy as np
+
+from ortools.graph.python import min_cost_flow
+
+from core.availability_matrix import AvailabilityMatrix, IF_NEEDED
+from core.scheduler import build_schedule, group_slots_by_day
+
+
+def is_pure_coverage(
+    slot_list,
+    min_required,
+    gap_penalty=3,
+    coverage_reward=2,
+    day_coverage_reward=2,
+    pinned_schedule=None,
+    relax=False,
+    **kwargs
+):
+    """
+    Tells whether an assign_shifts() call is a pure coverage problem that assign_shifts_flow()
+    solves exactly: no gap penalty or continuity reward, no minimum staffing above one person,
+    a non-negative day coverage reward, slots of equal length and nothing pinned or relaxed.
+    Arguments have the same meaning as in assign_shifts(); the others are ignored.
+    """
+    return (
+        gap_penalty == 0
+        and coverage_reward == 0
+        and day_coverage_reward >= 0
+        and min_required <= 1
+        and pinned_schedule is None
+        and not relax
+        and len({end_dt - start_dt for start_dt, end_dt in slot_list}) <= 1
+    )
+
+
+def assign_shifts_flow(
+    participants,
+    slot_list,
+    num_required,
+    min_required,
+    max_hours,
+    max_hours_per_day,
+    solver_time_limit=None,
+    solver_num_threads=None,
+    gap_penalty=0,
+    coverage_reward=0,
+    day_coverage_reward=2,
+    ifNeeded_penalty=2,
+    availability_index=None,
+    availability_matrix=None,
+    slot_weights=None,
+    max_hours_by_participant=None,
+    on_solution=None,
+    control=None,
+    **kwargs
+):
+    """
+    Min-cost flow engine with the assign_shifts contract for pure coverage problems
+    (see is_pure_coverage()), where the model is a b-matching with hour capacities.
+
+    One unit of flow is one assignment:
+        source -> participant (max_hours in slots) -> participant and day (max_hours_per_day
+        in slots) -> slot (one unit per available pair, costing minus its assign_shifts()
+        objective term) -> day (num_required per slot) -> sink.
+    Each day has two arcs to the sink, one unit earning day_coverage_reward and an uncapped
+    free one, so the first assignment of a day gets the reward. A free arc from the source to
+    the sink lets the flow leave unprofitable assignments out. The optimum equals the optimum
+    of the CP-SAT model (core.scheduler.ShiftModel) with the same arguments, and assign_shifts()
+    hands pure coverage problems over to this function.
+
+    Args:
+        participants, slot_list, num_required, min_required, max_hours, max_hours_per_day,
+        gap_penalty, coverage_reward, day_coverage_reward, ifNeeded_penalty, availability_index,
+        availability_matrix, slot_weights, max_hours_by_participant: Same as in assign_shifts().
+        solver_time_limit, solver_num_threads, on_solution, **kwargs: Accepted for compatibility
+            with the other engines and ignored.
+        control (SolveControl, optional): objective and best_bound are set to the optimum.
+
+    Returns:
+        tuple: (schedule_data, total_hours), or (None, None) if there is nothing to schedule.
+    """
+    if not is_pure_coverage(slot_list, min_required, gap_penalty, coverage_reward, day_coverage_reward, **kwargs):
+        raise ValueError("assign_shifts_flow only solves pure coverage problems")
+    if not participants or not slot_list:
+        return None, None
+
+    if availability_matrix is None or availability_matrix.shape != (len(participants), len(slot_list)):
+        availability_matrix = AvailabilityMatrix(participants, slot_list, availability_index)
+    states = availability_matrix.states
+    num_participants, num_slots = states.shape
+    start_dt, end_dt = slot_list[0]
+    slot_length = int((end_dt - start_dt).total_seconds() // 60)
+    weights = np.array(slot_weights if slot_weights is not None else [1] * num_slots, dtype=np.int64)
+
+    day_to_slots_idx = group_slots_by_day(slot_list)
+    day_of_slot = np.zeros(num_slots, dtype=np.int64)
+    for d, slots_idx in enumerate(day_to_slots_idx.values()):
+        day_of_slot[slots_idx] = d
+    num_days = len(day_to_slots_idx)
+
+    # Capacities in slots
+    max_minutes = int(max_hours * 60)
+    if max_hours_by_participant is None:
+        caps = np.full(num_participants, max_minutes)
+    else:
+        caps = np.array([min(max_minutes, int(round(h * 60))) for h in max_hours_by_participant])
+    units = caps // slot_length
+    day_units = int(max_hours_per_day * 60) // slot_length
+
+    # Node numbering
+    source, sink = 0, 1
+    person_node = 2 + np.arange(num_participants)
+    person_day_node = 2 + num_participants + np.arange(num_participants * num_days).reshape(num_participants, num_days)
+    slot_node = person_day_node.size + 2 + num_participants + np.arange(num_slots)
+    day_node = slot_node[-1] + 1 + np.arange(num_days)
+
+    tails, heads, capacities, costs = [], [], [], []
+
+    def arcs(tail, head, capacity, cost):
+        tails.append(np.asarray(tail, dtype=np.int64).ravel())
+        heads.append(np.asarray(head, dtype=np.int64).ravel())
+        size = tails[-1].size
+        capacities.append(np.broadcast_to(np.asarray(capacity, dtype=np.int64), tails[-1].shape).ravel())
+        costs.append(np.broadcast_to(np.asarray(cost, dtype=np.int64), (size,)).ravel())
+
+    pair_i, pair_j = np.nonzero(states)
+    profit = weights[pair_j] - int(ifNeeded_penalty) * weights[pair_j] * (states[pair_i, pair_j] == IF_NEEDED)
+    supply = int(np.minimum(units, np.bincount(pair_i, minlength=num_participants)).sum())
+
+    arcs(np.full(num_participants, source), person_node, units, 0)
+    arcs(np.repeat(person_node, num_days), person_day_node, day_units, 0)
+    pair_arcs = sum(t.size for t in tails)
+    arcs(person_day_node[pair_i, day_of_slot[pair_j]], slot_node[pair_j], 1, -profit)
+    arcs(slot_node, day_node[day_of_slot], num_required, 0)
+    arcs(day_node, np.full(num_days, sink), 1, -int(day_coverage_reward))
+    arcs(day_node, np.full(num_days, sink), supply, 0)
+    arcs([source], [sink], supply, 0)
+
+    flow = min_cost_flow.SimpleMinCostFlow()
+    flow.add_arcs_with_capacity_and_unit_cost(
+        np.concatenate(tails), np.concatenate(heads), np.concatenate(capacities), np.concatenate(costs)
+    )
+    flow.set_node_supply(source, supply)
+    flow.set_node_supply(sink, -supply)
+    if flow.solve() != flow.OPTIMAL:
+        return None, None
+
+    used = flow.flows(np.arange(pair_arcs, pair_arcs + pair_i.size)) > 0
+    assigned_rows = {}
+    for i, j in zip(pair_i[used], pair_j[used]):
+        assigned_rows.setdefault(int(j), []).append(int(i))
+
+    if control is not None:
+        control.objective = control.best_bound = -flow.optimal_cost()
+    return build_schedule(participants, slot_list, assigned_rows)
@@ -0,0 +1,107 @@
+import numpy as np
+from collections import defaultdict
+
+from core.availability_matrix import AvailabilityMatrix, AVAILABLE
+from core.scheduler import group_slots_by_day, build_schedule
+
+
+def assign_shifts_greedy(
+    participants,
+    slot_list,
+    num_required,
+    min_required,
+    max_hours,
+    max_hours_per_day,
+    solver_time_limit=None,
+    solver_num_threads=None,
+    availability_index=None,
+    availability_matrix=None,
+    on_solution=None,
+    control=None,
+    **kwargs
+):
+    """
+    Greedy heuristic with the assign_shifts contract, meant for instant drafts and warm-start hints.
+
+    Slots are filled scarcest first: in ascending order of the number of eligible people,
+    ties in time order, so the hours of people who can cover a hard-to-staff slot are not
+    used up elsewhere before it gets its turn. For every slot the people who still fit into
+    max_hours and max_hours_per_day are ranked by:
+        - already working an adjacent slot (keeps shifts continuous),
+        - not working elsewhere that day (a second block would be a gap),
+        - 'availabilities' before 'ifNeeded',
+        - most available time left in the slots still to be filled compared to their hours
+          left (saves people who are needed later),
+    and up to num_required of them are assigned, except that people who would open a second
+    block that day are only taken up to max(1, min_required). A slot with fewer than
+    min_required candidates stays empty.
+
+    Args:
+        participants, slot_list, num_required, min_required, max_hours, max_hours_per_day:
+            Same as in assign_shifts().
+        solver_time_limit, solver_num_threads, on_solution, control, **kwargs: Accepted for
+            compatibility with the other engines and ignored.
+        availability_index (AvailabilityIndex, optional): Index built once per poll.
+        availability_matrix (AvailabilityMatrix, optional): Matrix over participants and slot_list.
+
+    Returns:
+        tuple: (schedule_data, total_hours), or (None, None) if there is nothing to schedule.
+    """
+    if not participants or not slot_list:
+        return None, None
+
+    if availability_matrix is None or availability_matrix.shape != (len(participants), len(slot_list)):
+        availability_matrix = AvailabilityMatrix(participants, slot_list, availability_index)
+    states = availability_matrix.states
+    eligible = states > 0
+
+    slot_minutes = np.array([int((end_dt - start_dt).total_seconds() // 60) for start_dt, end_dt in slot_list])
+    day_to_slots_idx = group_slots_by_day(slot_list)
+    time_order = [j for d in sorted(day_to_slots_idx) for j in day_to_slots_idx[d]]
+    # note: the sort is stable, so slots with the same number of eligible people stay in time order
+    order = sorted(time_order, key=lambda j: eligible[:, j].sum())
+    neighbours = {}
+    day_of_slot = {}
+    for d, slots_idx in day_to_slots_idx.items():
+        for k, j in enumerate(slots_idx):
+            day_of_slot[j] = d
+            neighbours[j] = slots_idx[max(0, k - 1):k] + slots_idx[k + 1:k + 2]
+
+    # Available minutes of every person from each slot to the last one filled, in filling order
+    future_minutes = np.zeros(states.shape, dtype=int)
+    future_minutes[:, order] = np.cumsum((eligible * slot_minutes)[:, order[::-1]], axis=1)[:, ::-1]
+
+    max_minutes_per_day = int(max_hours_per_day * 60)
+    remaining_total = np.full(len(participants), int(max_hours * 60))
+    remaining_day = {d: np.full(len(participants), max_minutes_per_day) for d in day_to_slots_idx}
+    assigned = np.zeros(states.shape, dtype=bool)
+
+    for j in order:
+        minutes = slot_minutes[j]
+        day_left = remaining_day[day_of_slot[j]]
+        candidates = np.nonzero(eligible[:, j] & (remaining_total >= minutes) & (day_left >= minutes))[0]
+        if len(candidates) < max(1, min_required):
+            continue
+        continuing = assigned[np.ix_(candidates, neighbours[j])].any(axis=1)
+        # note: lexsort uses the last key as the primary one
+        ranking = np.lexsort((
+            remaining_total[candidates] - future_minutes[candidates, j],
+            states[candidates, j] != AVAILABLE,
+            day_left[candidates] < max_minutes_per_day,
+            ~continuing,
+        ))
+        chosen = candidates[ranking[:num_required]]
+        # note: someone who would open a second block that day only fills a slot that is still short
+        opens_gap = ~continuing[ranking[:num_required]] & (day_left[chosen] < max_minutes_per_day)
+        if (~opens_gap).sum() >= max(1, min_required):
+            chosen = chosen[~opens_gap]
+        else:
+            chosen = chosen[:max(1, min_required)]
+        assigned[chosen, j] = True
+        remaining_total[chosen] -= minutes
+        day_left[chosen] -= minutes
+
+    assigned_rows = defaultdict(list)
+    for i, j in zip(*np.nonzero(assigned)):
+        assigned_rows[int(j)].append(int(i))
+    return build_schedule(participants, slot_list, assigned_rows)
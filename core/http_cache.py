@@ -0,0 +1,106 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from urllib.parse import urlencode
+
+from PyQt6.QtCore import QStandardPaths
+
+
+def default_cache_dir():
+    """
+    Returns the directory of the HTTP cache under the per-user application data directory.
+    """
+    base = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.GenericDataLocation)
+    return os.path.join(base, "Harmobot", "http_cache")
+
+
+def cache_key(url, params=None):
+    """
+    Returns the cache key of a GET request: a hash of the URL and its sorted query parameters.
+    """
+    if params:
+        url = url + "?" + urlencode(sorted(params.items()))
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    """
+    On-disk cache of response bodies with their validators (ETag, Last-Modified).
+
+    Every entry is a pair of files named after cache_key(): <key>.body with the decoded
+    body and <key>.json with the URL, validators and fetch time. Both are written to a
+    temporary file first and moved into place, so a crash never leaves a torn entry.
+    """
+
+    def __init__(self, directory=None):
+        """
+        Args:
+            directory (str, optional): Cache directory, default_cache_dir() if None.
+        """
+        self.directory = directory or default_cache_dir()
+
+    def _path(self, key, suffix):
+        return os.path.join(self.directory, key + suffix)
+
+    def load(self, key):
+        """
+        Returns the cached entry of key.
+
+        Returns:
+            tuple: (meta, body), or (None, None) if there is no usable entry.
+        """
+        try:
+            with open(self._path(key, ".json"), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(self._path(key, ".body"), "rb") as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None, None
+        if len(body) != meta.get("size"):
+            return None, None
+        return meta, body
+
+    def store(self, key, url, body, etag=None, last_modified=None):
+        """
+        Stores a response body with its validators. Errors writing the cache are ignored,
+        the cache is an optimization only.
+        """
+        meta = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "size": len(body),
+            "fetched_at": time.time(),
+        }
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # note: body first, a meta file always describes a complete body
+            self._write(self._path(key, ".body"), body)
+            self._write(self._path(key, ".json"), json.dumps(meta).encode("utf-8"))
+        except OSError:
+            pass
+
+    def _write(self, path, data):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            os.unlink(tmp_path)
+            raise
+
+    def clear(self):
+        """
+        Removes all cached entries.
+        """
+        if not os.path.isdir(self.directory):
+            return
+        for name in os.listdir(self.directory):
+            if name.endswith((".json", ".body", ".tmp")):
+                try:
+                    os.unlink(os.path.join(self.directory, name))
+                except OSError:
+                    pass
@@ -0,0 +1,225 @@
+import json
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import MaxRetryError, ReadTimeoutError
+from urllib3.util import Retry, make_headers
+
+from core.http_cache import DiskCache, cache_key
+from core.version import __app_version__
+
+# (connect, read) timeouts in seconds
+DEFAULT_TIMEOUT = (5, 30)
+# Responses retried with exponential backoff (honouring Retry-After)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Bytes read per step by get_json(), the granularity of its progress and cancel checks
+CHUNK_SIZE = 64 * 1024
+
+_lock = threading.Lock()
+_session = None
+_timeout = DEFAULT_TIMEOUT
+_cache = None
+_offline = False
+
+
+class FetchCancelled(Exception):
+    """
+    Raised by get_json() when the download was cancelled.
+    """
+
+
+class NotCached(Exception):
+    """
+    Raised by get_json() in offline mode when the URL has no cached copy.
+    """
+
+
+def build_session(retries=3, backoff_factor=0.5, pool_maxsize=4):
+    """
+    Builds a requests session with a keep-alive connection pool, retries and compression.
+
+    Failed connections and RETRY_STATUSES responses are retried up to retries times, waiting
+    backoff_factor * 2 ** (attempt - 1) seconds in between (or what Retry-After asks for).
+    A read timeout is retried once only, so a hung server can not block for retries * timeout.
+    Accept-Encoding lists gzip and deflate, plus br when a brotli package is installed
+    (urllib3 decodes every encoding it announces).
+
+    Args:
+        retries (int, optional): Maximum number of retries per request.
+        backoff_factor (float, optional): Base of the exponential backoff in seconds.
+        pool_maxsize (int, optional): Connections kept open per host.
+
+    Returns:
+        requests.Session: The configured session.
+    """
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=min(1, retries),
+        status=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({'GET', 'HEAD'}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=4, pool_maxsize=pool_maxsize)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update(make_headers(accept_encoding=True))
+    session.headers['User-Agent'] = f"Harmobot/{__app_version__}"
+    return session
+
+
+def get_session():
+    """
+    Returns the session shared by all services, building it on first use.
+    """
+    global _session
+    with _lock:
+        if _session is None:
+            _session = build_session()
+        return _session
+
+
+def get_cache():
+    """
+    Returns the disk cache used by get_json(), creating it on first use.
+    """
+    global _cache
+    with _lock:
+        if _cache is None:
+            _cache = DiskCache()
+        return _cache
+
+
+def configure(connect_timeout=None, read_timeout=None, retries=None, offline=None, cache_dir=None):
+    """
+    Changes the defaults used by get() and get_json(). Arguments left as None keep their current value.
+
+    Args:
+        connect_timeout (float, optional): Seconds to wait for a connection.
+        read_timeout (float, optional): Seconds to wait for the server between received bytes.
+        retries (int, optional): Maximum number of retries per request (rebuilds the session).
+        offline (bool, optional): Serve get_json() from the disk cache only, without any request.
+        cache_dir (str, optional): Directory of the disk cache.
+    """
+    global _session, _timeout, _offline, _cache
+    with _lock:
+        if offline is not None:
+            _offline = offline
+        if cache_dir is not None:
+            _cache = DiskCache(cache_dir)
+        _timeout = (
+            connect_timeout if connect_timeout is not None else _timeout[0],
+            read_timeout if read_timeout is not None else _timeout[1],
+        )
+        if retries is not None:
+            if _session is not None:
+                _session.close()
+            _session = build_session(retries=retries)
+
+
+def get(url, timeout=None, **kwargs):
+    """
+    GET through the shared session with the configured timeouts.
+
+    Args:
+        url (str): Requested URL.
+        timeout (float or tuple, optional): Overrides the configured (connect, read) timeouts.
+        **kwargs: Passed on to requests.Session.get() (params, headers, ...).
+
+    Returns:
+        requests.Response: The response (the last one if every retry failed).
+
+    Raises:
+        requests.Timeout: If the server did not answer in time, also after the read retry.
+        requests.RequestException: If no response was received for another reason.
+    """
+    try:
+        return get_session().get(url, timeout=timeout if timeout is not None else _timeout, **kwargs)
+    except requests.ConnectionError as e:
+        # note: once the read retry is used up, requests reports the timeout as a ConnectionError
+        reason = e.args[0] if e.args else None
+        if isinstance(reason, MaxRetryError) and isinstance(reason.reason, ReadTimeoutError):
+            raise requests.ReadTimeout(*e.args, request=e.request, response=e.response) from e
+        raise
+
+
+def get_json(url, on_progress=None, cancel=None, use_cache=True, **kwargs):
+    """
+    GET a JSON document through get(), reading the body in chunks of CHUNK_SIZE.
+
+    With use_cache the body is kept in the disk cache (see get_cache()) and later requests
+    for the same URL and params are conditional (If-None-Match / If-Modified-Since), so an
+    unchanged document costs one round trip without a body. In offline mode (see configure())
+    the cached copy is returned without any request.
+
+    Args:
+        url (str): Requested URL.
+        on_progress (callable, optional): Called as on_progress(received, total) after every
+            chunk, with the bytes received over the wire so far and the Content-Length
+            (0 if the server did not send one).
+        cancel (threading.Event, optional): Checked before the request and after every chunk.
+        use_cache (bool, optional): Use the disk cache.
+        **kwargs: Passed on to get() (params, headers, timeout, ...).
+
+    Returns:
+        The decoded JSON document.
+
+    Raises:
+        FetchCancelled: If cancel was set.
+        NotCached: In offline mode, if there is no cached copy.
+        Exception: If the server did not answer with status 200 (or 304 to a conditional request).
+        requests.RequestException: If no response was received (see get()).
+    """
+    if cancel is not None and cancel.is_set():
+        raise FetchCancelled()
+    key = cache_key(url, kwargs.get('params'))
+    meta, body = get_cache().load(key) if use_cache else (None, None)
+    if use_cache and _offline:
+        if body is None:
+            raise NotCached(url)
+        return _cached_json(body, on_progress)
+
+    headers = dict(kwargs.pop('headers', None) or {})
+    if meta is not None:
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+
+    with get(url, stream=True, headers=headers, **kwargs) as response:
+        if response.status_code == 304 and body is not None:
+            # note: reading the (empty) body hands the connection back to the pool
+            response.content
+            return _cached_json(body, on_progress)
+        if response.status_code != 200:
+            raise Exception(f"Request failed with status code: {response.status_code}")
+        total = int(response.headers.get('Content-Length', 0) or 0)
+        chunks = []
+        for chunk in response.iter_content(CHUNK_SIZE):
+            chunks.append(chunk)
+            if on_progress is not None:
+                # note: tell() counts the compressed bytes, the ones Content-Length refers to
+                on_progress(response.raw.tell(), total)
+            if cancel is not None and cancel.is_set():
+                raise FetchCancelled()
+    body = b"".join(chunks)
+    data = json.loads(body)
+    if use_cache:
+        get_cache().store(
+            key, url, body,
+            etag=response.headers.get('ETag'),
+            last_modified=response.headers.get('Last-Modified'),
+        )
+    return data
+
+
+def _cached_json(body, on_progress):
+    if on_progress is not None:
+        on_progress(len(body), len(body))
+    return json.loads(body)
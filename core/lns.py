@@ -0,0 +1,206 @@
+import random
+import time
+
+from core.availability_matrix import AvailabilityMatrix
+from core.greedy import assign_shifts_greedy
+from core.pruning import prune_availability
+from core.scheduler import (
+    ShiftModel, SolveControl, group_slots_by_day, schedule_to_rows, solve_model, relative_gap
+)
+
+NEIGHBOURHOODS = ('day', 'band', 'participants')
+
+
+def pick_neighbourhood(kind, scale, rng, shift_model, day_to_slots_idx, slot_list):
+    """
+    Chooses the assignments freed in one LNS step.
+
+    Args:
+        kind (str): 'day' (whole days), 'band' (a time-of-day band across all days) or
+            'participants' (every slot of a few people).
+        scale (float): Size multiplier, adapted by the driver (1.0 = one day, a 1 h band, 4 people).
+        rng (random.Random): Random generator.
+        shift_model (ShiftModel): Model whose assignments are considered.
+        day_to_slots_idx (dict): Output of group_slots_by_day().
+        slot_list (list): List of time slots as tuples (start_dt, end_dt).
+
+    Returns:
+        set: (participant index, slot index) pairs to re-optimize.
+    """
+    if kind == 'day':
+        days = rng.sample(sorted(day_to_slots_idx), min(len(day_to_slots_idx), max(1, round(scale))))
+        slots = {j for d in days for j in day_to_slots_idx[d]}
+        return {key for key in shift_model.assignments if key[1] in slots}
+    if kind == 'band':
+        minute_of_day = [start_dt.hour * 60 + start_dt.minute for start_dt, _ in slot_list]
+        width = 60 * scale
+        start = rng.choice(minute_of_day)
+        return {key for key in shift_model.assignments if start <= minute_of_day[key[1]] < start + width}
+    people = sorted({i for i, _ in shift_model.assignments})
+    chosen = set(rng.sample(people, min(len(people), max(2, round(4 * scale)))))
+    return {key for key in shift_model.assignments if key[0] in chosen}
+
+
+def assign_shifts_lns(
+    participants,
+    slot_list,
+    num_required,
+    min_required,
+    max_hours,
+    max_hours_per_day,
+    solver_time_limit,
+    solver_num_threads,
+    gap_penalty=3,
+    coverage_reward=2,
+    day_coverage_reward=2,
+    ifNeeded_penalty=2,
+    availability_index=None,
+    availability_matrix=None,
+    hint_schedule=None,
+    on_solution=None,
+    control=None,
+    model_cache=None,
+    step_time_limit=1.0,
+    seed=0,
+    formulation='standard',
+    **kwargs
+):
+    """
+    Large neighbourhood search over the assign_shifts model, for polls too big to solve at once.
+
+    Starting from hint_schedule (or a greedy draft when it is missing or violates the limits),
+    every step frees one neighbourhood (see pick_neighbourhood()), fixes all other assignments
+    to the current schedule, re-optimizes the rest for at most step_time_limit seconds and keeps
+    the result if it is better. Fixed assignments still count towards the hour caps, so a step
+    only uses the hours that are left. A short full solve at the start provides the bound used
+    for the gap. Each kind of neighbourhood grows after steps that were solved to optimality and shrink
+    after steps that ran out of time.
+
+    Args:
+        participants, slot_list, num_required, min_required, max_hours, max_hours_per_day,
+        gap_penalty, coverage_reward, day_coverage_reward, ifNeeded_penalty,
+        availability_index, availability_matrix, model_cache, formulation: Same as in assign_shifts().
+        solver_time_limit (int): Total time budget in seconds.
+        solver_num_threads (int): Number of threads for every step.
+        hint_schedule (list, optional): Starting schedule.
+        on_solution (callable, optional): Progress callback, called for every accepted improvement.
+        control (SolveControl, optional): Stop button and relative gap target; no_improvement_time
+            ends the search after that many seconds without an accepted step.
+        step_time_limit (float, optional): Time limit of one step in seconds.
+        seed (int, optional): Seed of the neighbourhood choice.
+
+    Returns:
+        tuple: (schedule_data, total_hours), or (None, None) if there is nothing to schedule.
+    """
+    if not participants or not slot_list:
+        return None, None
+
+    started = time.monotonic()
+    deadline = started + solver_time_limit
+    control = control if control is not None else SolveControl()
+    rng = random.Random(seed)
+
+    if availability_matrix is None or availability_matrix.shape != (len(participants), len(slot_list)):
+        availability_matrix = AvailabilityMatrix(participants, slot_list, availability_index)
+    pruned_matrix, caps, control.pruning = prune_availability(
+        availability_matrix, slot_list, min_required, max_hours, max_hours_per_day
+    )
+    if model_cache is not None:
+        shift_model = model_cache.get(participants, slot_list, availability_matrix, formulation=formulation)
+    else:
+        shift_model = ShiftModel(participants, slot_list, availability_matrix, formulation=formulation)
+    shift_model.configure(
+        num_required, min_required, max_hours, max_hours_per_day,
+        gap_penalty, coverage_reward, day_coverage_reward, ifNeeded_penalty, caps,
+        availability_matrix=pruned_matrix
+    )
+    day_to_slots_idx = group_slots_by_day(slot_list)
+
+    def run(time_limit, fixed_rows=None, free=(), hint=None):
+        step = control.child()
+        shift_model.set_hint(hint)
+        if fixed_rows is not None:
+            shift_model.fix_assignments(fixed_rows, free=free)
+        try:
+            result = solve_model(
+                shift_model.model, max(0.1, time_limit), solver_num_threads, shift_model.decode, None, step
+            )
+        finally:
+            if fixed_rows is not None:
+                shift_model.release_assignments()
+        return result, step
+
+    # Starting point: evaluate the given schedule with every assignment fixed, else a greedy draft
+    current = None
+    for start in (hint_schedule, 'greedy'):
+        if start == 'greedy':
+            start, _ = assign_shifts_greedy(
+                participants, slot_list, num_required, min_required, max_hours, max_hours_per_day,
+                availability_matrix=availability_matrix
+            )
+        if not start:
+            continue
+        result, step = run(step_time_limit, schedule_to_rows(start, participants, slot_list))
+        if result[0] is not None:
+            current, objective = result, step.objective
+            break
+    if current is None:
+        # note: the empty schedule satisfies every limit, so this only fails when stopped
+        current, step = run(step_time_limit, {})
+        objective = step.objective
+        if current[0] is None:
+            return None, None
+    best_bound = float('inf')
+
+    def report():
+        control.notify_solution(objective, best_bound)
+        if on_solution:
+            on_solution({
+                'objective': objective,
+                'best_bound': best_bound,
+                'gap': relative_gap(objective, best_bound),
+                'wall_time': time.monotonic() - started,
+                'schedule_data': current[0],
+                'total_hours': current[1],
+            })
+
+    # Short full solve from the current schedule: gives the bound and often a first improvement
+    result, step = run(min(step_time_limit, 0.1 * solver_time_limit), hint=current[0])
+    if step.best_bound is not None:
+        best_bound = step.best_bound
+    if result[0] is not None and step.objective > objective:
+        current, objective = result, step.objective
+    report()
+
+    scale = dict.fromkeys(NEIGHBOURHOODS, 1.0)
+    last_improvement = time.monotonic()
+    k = 0
+    while not control.stop_requested:
+        now = time.monotonic()
+        if now >= deadline:
+            break
+        if control.relative_gap_limit > 0 and relative_gap(objective, best_bound) <= control.relative_gap_limit:
+            control.stop_reason = control.stop_reason or 'gap'
+            break
+        if control.no_improvement_time > 0 and now - last_improvement >= control.no_improvement_time:
+            control.stop_reason = control.stop_reason or 'stall'
+            break
+
+        kind = NEIGHBOURHOODS[k % len(NEIGHBOURHOODS)]
+        k += 1
+        free = pick_neighbourhood(kind, scale[kind], rng, shift_model, day_to_slots_idx, slot_list)
+        if not free:
+            continue
+        rows = schedule_to_rows(current[0], participants, slot_list)
+        result, step = run(min(step_time_limit, deadline - now), rows, free, hint=current[0])
+        if result[0] is not None and step.objective > objective:
+            current, objective = result, step.objective
+            last_improvement = time.monotonic()
+            report()
+        proven = step.objective is not None and relative_gap(step.objective, step.best_bound) == 0
+        # note: every kind keeps its own size, they are not equally hard to solve
+        scale[kind] = min(scale[kind] * 1.25, len(day_to_slots_idx)) if proven else max(0.5, scale[kind] / 1.25)
+
+    control.objective = objective
+    control.best_bound = best_bound
+    return current
@@ -0,0 +1,163 @@
+import multiprocessing
+import queue
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from core.scheduler import SolveControl, relative_gap
+
+# Search settings cycled through by the portfolio members (each member also gets its own seed)
+PORTFOLIO_VARIANTS = [
+    {},
+    {'linearization_level': 2},
+    {'randomize_search': True},
+    {'optimize_with_core': True},
+    {'linearization_level': 0},
+    {'use_lns_only': True},
+]
+
+# Shared between the members of a running portfolio; set in each worker process by _init_member()
+_shared = {}
+
+
+def split_threads(max_threads, members):
+    """
+    Splits a thread budget across portfolio members.
+
+    Args:
+        max_threads (int): Total number of solver threads allowed.
+        members (int): Requested number of members.
+
+    Returns:
+        list: Threads per member. There are never more members than threads, and the
+            remainder goes to the first members.
+    """
+    members = max(1, min(members, max_threads))
+    base, extra = divmod(max(max_threads, 1), members)
+    return [base + (1 if k < extra else 0) for k in range(members)]
+
+
+def member_params(k):
+    """
+    Returns the CP-SAT parameters of the k-th portfolio member.
+    """
+    params = dict(PORTFOLIO_VARIANTS[k % len(PORTFOLIO_VARIANTS)])
+    params['random_seed'] = k
+    return params
+
+
+def _init_member(stop_event, best_objective, progress_queue):
+    _shared['stop'] = stop_event
+    _shared['best'] = best_objective
+    _shared['queue'] = progress_queue
+
+
+def _run_member(engine, kwargs):
+    """
+    Runs one portfolio member; executed in a worker process.
+
+    Every solution that beats the best objective of the whole portfolio is sent to the
+    parent. A member that proves optimality stops the others.
+    """
+    best = _shared['best']
+    progress_queue = _shared['queue']
+    control = SolveControl(
+        kwargs.pop('relative_gap_limit', 0.0), kwargs.pop('no_improvement_time', 0), stop_event=_shared['stop']
+    )
+
+    def on_solution(progress):
+        with best.get_lock():
+            improved = progress['objective'] > best.value
+            if improved:
+                best.value = progress['objective']
+        if improved:
+            progress_queue.put(progress)
+
+    schedule_data, total_hours = engine(**kwargs, on_solution=on_solution, control=control)
+    if control.objective is not None and relative_gap(control.objective, control.best_bound) == 0:
+        _shared['stop'].set()
+    return control.objective, control.best_bound, schedule_data, total_hours
+
+
+def run_portfolio(
+    engine,
+    members,
+    solver_num_threads,
+    on_solution=None,
+    control=None,
+    **kwargs
+):
+    """
+    Runs several independent solves with different seeds and search settings in separate
+    processes and returns the best schedule.
+
+    Args:
+        engine (callable): Module-level solver with the assign_shifts contract (assign_shifts,
+            assign_shifts_grouped or assign_shifts_aggregated).
+        members (int): Number of portfolio members; limited by solver_num_threads.
+        solver_num_threads (int): Total thread budget, split across members by split_threads().
+        on_solution (callable, optional): Receives the progress dict (see SolutionStreamer) of every
+            solution improving on the whole portfolio; best_bound is the best bound of all members.
+        control (SolveControl, optional): stop() stops all members; relative_gap_limit and
+            no_improvement_time apply to each member. objective / best_bound describe the best
+            result after the run.
+        **kwargs: Arguments passed on to engine (participants, slot_list, limits, weights, ...).
+
+    Returns:
+        tuple: (schedule_data, total_hours) of the best member, or (None, None) if none found a solution.
+    """
+    threads = split_threads(solver_num_threads, members)
+    if control is not None:
+        kwargs['relative_gap_limit'] = control.relative_gap_limit
+        kwargs['no_improvement_time'] = control.no_improvement_time
+
+    stop_event = multiprocessing.Event()
+    best_objective = multiprocessing.Value('d', float('-inf'))
+    progress_queue = multiprocessing.Queue()
+    best_bound = float('inf')
+
+    def drain():
+        nonlocal best_bound
+        while True:
+            try:
+                progress = progress_queue.get_nowait()
+            except queue.Empty:
+                return
+            best_bound = min(best_bound, progress['best_bound'])
+            progress['best_bound'] = best_bound
+            progress['gap'] = relative_gap(progress['objective'], best_bound)
+            progress['wall_time'] = time.monotonic() - started
+            if control is not None:
+                control.notify_solution(progress['objective'], best_bound)
+            if on_solution:
+                on_solution(progress)
+
+    started = time.monotonic()
+    results = []
+    executor = ProcessPoolExecutor(
+        max_workers=len(threads), initializer=_init_member,
+        initargs=(stop_event, best_objective, progress_queue)
+    )
+    try:
+        pending = {
+            executor.submit(_run_member, engine, dict(kwargs, solver_num_threads=n, solver_params=member_params(k)))
+            for k, n in enumerate(threads)
+        }
+        while pending:
+            if control is not None and control.stop_requested:
+                stop_event.set()
+            done, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+            results.extend(future.result() for future in done)
+            drain()
+    finally:
+        stop_event.set()
+        executor.shutdown(wait=True)
+    drain()
+
+    solved = [r for r in results if r[2] is not None]
+    if not solved:
+        return None, None
+    objective, _, schedule_data, total_hours = max(solved, key=lambda r: r[0])
+    if control is not None:
+        control.objective = objective
+        control.best_bound = min(r[1] for r in solved)
+    return schedule_data, total_hours
@@ -0,0 +1,63 @@
+import numpy as np
+from collections import defaultdict
+
+from core.availability_matrix import UNAVAILABLE
+
+
+def prune_availability(availability_matrix, slot_list, min_required, max_hours, max_hours_per_day):
+    """
+    Removes the parts of a poll that can never be staffed, before the model is solved.
+
+    The pass never changes the optimum, it only drops what the solver would have to rule out
+    itself:
+        - (participant, slot) pairs whose slot is longer than the participant may work at all
+          (max_hours or max_hours_per_day),
+        - slots with fewer than min_required eligible participants (they stay unassigned),
+        - participants without any eligible slot and days without any staffable slot
+          (reported; ShiftModel.configure() fixes their variables to 0),
+    and tightens every participant's hour cap to their eligible minutes, so caps that can never
+    bind are dropped by the presolve instead of being carried into the search.
+
+    Rows and columns are kept, so indices, hints and pinned schedules stay valid.
+
+    Args:
+        availability_matrix (AvailabilityMatrix): Matrix over participants and slot_list.
+        slot_list (list): List of time slots as tuples (start_dt, end_dt).
+        min_required (int): Minimum number of participants per staffed slot.
+        max_hours (float): Maximum total hours per participant.
+        max_hours_per_day (float): Maximum hours per participant per day.
+
+    Returns:
+        tuple: (matrix, max_hours_by_participant, report) where matrix is a pruned copy of
+            availability_matrix, max_hours_by_participant the tightened caps in hours and report
+            a dict with the number of removed 'pairs', the indices of the impossible 'slots',
+            the 'participants' (indices) and 'days' (dates) without anything to staff, and
+            the number of participants whose cap was 'tightened'.
+    """
+    states = availability_matrix.states
+    eligible = states != UNAVAILABLE
+    slot_minutes = np.array([int((end_dt - start_dt).total_seconds() // 60) for start_dt, end_dt in slot_list])
+    max_minutes = int(max_hours * 60)
+    max_minutes_per_day = int(max_hours_per_day * 60)
+
+    pruned = eligible & (slot_minutes <= min(max_minutes, max_minutes_per_day))
+    counts = pruned.sum(axis=0)
+    impossible = (counts > 0) & (counts < max(1, min_required))
+    pruned[:, impossible] = False
+
+    day_to_slots_idx = defaultdict(list)
+    for j, (start_dt, _) in enumerate(slot_list):
+        day_to_slots_idx[start_dt.date()].append(j)
+    dead_days = [d for d, slots_idx in sorted(day_to_slots_idx.items()) if not pruned[:, slots_idx].any()]
+    caps = np.minimum(pruned @ slot_minutes, max_minutes)
+
+    matrix = availability_matrix.subset(range(len(slot_list)))
+    matrix.states = np.where(pruned, states, UNAVAILABLE).astype(states.dtype)
+    report = {
+        'pairs': int(eligible.sum() - pruned.sum()),
+        'slots': [int(j) for j in np.nonzero(impossible)[0]],
+        'participants': [int(i) for i in np.nonzero(~pruned.any(axis=1))[0]],
+        'days': dead_days,
+        'tightened': int(np.count_nonzero(pruned.any(axis=1) & (caps < max_minutes))),
+    }
+    return matrix, [int(c) / 60 for c in caps], report
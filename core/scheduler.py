@@ -1,8 +1,15 @@
 import multiprocessing
+import threading
+import time
+import numpy as np
 from ortools.sat.python import cp_model
 from datetime import datetime, timedelta
 from collections import defaultdict
 
+from core.availability_matrix import AvailabilityMatrix, IF_NEEDED, UNAVAILABLE
+from core.feasibility import check_pinned_feasibility
+from core.pruning import prune_availability
+
 def build_day_slots(participants, poll_dates, shift_duration, day_ranges=None):
     """
     Builds a list of time slots (start_dt, end_dt) for all days in poll_dates based on the available time ranges.
@@ -56,6 +63,912 @@ def build_day_slots(participants, poll_dates, shift_duration, day_ranges=None):
     return day_slots_dict, unique_slots
 
 
+def group_slots_by_day(slot_list):
+    """
+    Groups slot indices by the date of the slot start.
+
+    Args:
+        slot_list (list): List of time slots as tuples (start_dt, end_dt).
+
+    Returns:
+        dict: Maps each date to the list of its slot indices, sorted by start time.
+    """
+    day_to_slots_idx = defaultdict(list)
+    for j, slot in enumerate(slot_list):
+        d = slot[0].date()
+        day_to_slots_idx[d].append(j)
+    for d in day_to_slots_idx:
+        day_to_slots_idx[d].sort(key=lambda idx: slot_list[idx][0])
+    return day_to_slots_idx
+
+
+def add_coverage_terms(model, shift_assigned, day_to_slots_idx, slot_weights=None, staffable=None, compact=False):
+    """
+    Adds the slot-level objective terms shared by all formulations.
+
+    Args:
+        model (cp_model.CpModel): Model to extend.
+        shift_assigned (dict): Maps a slot index to its 'slot is staffed' BoolVar.
+        day_to_slots_idx (dict): Output of group_slots_by_day().
+        slot_weights (list, optional): Number of grid slots each slot stands for. A staffed slot
+            of weight w also contributes the w - 1 continuity pairs it contains.
+        staffable (set, optional): Slot indices that can be staffed at all; pairs and days
+            without them get no variables. All slots by default.
+        compact (bool, optional): Only bound the reward variables from above (by implications and
+            one clause per day). Valid because they are maximized with non-negative weights.
+
+    Returns:
+        tuple: (sum_of_continuity, sum_of_covered_days) linear expressions.
+    """
+    # (2) coverage_reward: reward for continuity
+    if staffable is not None:
+        day_to_slots_idx = {
+            d: slots_idx for d, slots_idx in day_to_slots_idx.items() if any(j in staffable for j in slots_idx)
+        }
+    continuity_vars = []
+    for d, slots_idx in day_to_slots_idx.items():
+        for k in range(len(slots_idx) - 1):
+            j1 = slots_idx[k]
+            j2 = slots_idx[k + 1]
+            if staffable is not None and (j1 not in staffable or j2 not in staffable):
+                continue
+            cvar = model.NewBoolVar(f'cont_j{j1}_j{j2}')
+            if compact:
+                model.AddImplication(cvar, shift_assigned[j1])
+                model.AddImplication(cvar, shift_assigned[j2])
+            else:
+                model.Add(cvar <= shift_assigned[j1])
+                model.Add(cvar <= shift_assigned[j2])
+                model.Add(cvar >= shift_assigned[j1] + shift_assigned[j2] - 1)
+            continuity_vars.append(cvar)
+    sum_of_continuity = sum(continuity_vars)
+    if slot_weights is not None:
+        sum_of_continuity += sum((slot_weights[j] - 1) * var for j, var in shift_assigned.items())
+
+    # (3) Day coverage: reward for each day that is covered
+    day_covered = {}
+    for d, slots_idx in day_to_slots_idx.items():
+        dc = model.NewBoolVar(f'day_covered_{d}')
+        if compact:
+            model.AddBoolOr([shift_assigned[j] for j in slots_idx] + [dc.Not()])
+        else:
+            sum_in_day = sum(shift_assigned[j] for j in slots_idx)
+            model.Add(sum_in_day == 0).OnlyEnforceIf(dc.Not())
+            model.Add(sum_in_day >= 1).OnlyEnforceIf(dc)
+        day_covered[d] = dc
+    sum_of_covered_days = sum(day_covered.values())
+    return sum_of_continuity, sum_of_covered_days
+
+
+def build_schedule(participants, slot_list, assigned_rows):
+    """
+    Converts solved assignments into the assign_shifts output format.
+
+    Args:
+        participants (list): List of participant dictionaries.
+        slot_list (list): List of time slots as tuples (start_dt, end_dt).
+        assigned_rows (dict): Maps a slot index to the list of assigned participant indices.
+
+    Returns:
+        tuple: (schedule_data, total_hours) as returned by assign_shifts().
+    """
+    schedule_data = []
+    total_hours = {p['name']: 0.0 for p in participants}
+    for j in range(len(slot_list)):
+        assigned_names = [participants[i]['name'] for i in sorted(assigned_rows.get(j, []))]
+        if assigned_names:
+            start_dt, end_dt = slot_list[j]
+            dur_hrs = (end_dt - start_dt).total_seconds() / 3600.0
+            schedule_data.append({
+                'Shift Start': start_dt,
+                'Shift End': end_dt,
+                'Assigned To': ", ".join(assigned_names)
+            })
+            for nm in assigned_names:
+                total_hours[nm] += dur_hrs
+    return schedule_data, total_hours
+
+
+def schedule_to_rows(schedule_data, participants, slot_list):
+    """
+    Maps a schedule in the assign_shifts output format onto slot and participant indices.
+
+    Entries whose slot is not in slot_list and names that are not participants are skipped.
+
+    Args:
+        schedule_data (list): Schedule entries with 'Shift Start', 'Shift End' and 'Assigned To'.
+        participants (list): List of participant dictionaries.
+        slot_list (list): List of time slots as tuples (start_dt, end_dt).
+
+    Returns:
+        dict: Maps a slot index to the set of assigned participant indices.
+    """
+    row_of = {}
+    for i, p in enumerate(participants):
+        row_of.setdefault(p['name'], i)
+    col_of = {}
+    for j, slot in enumerate(slot_list):
+        col_of.setdefault(slot, j)
+
+    assigned_rows = defaultdict(set)
+    for entry in schedule_data or []:
+        j = col_of.get((entry['Shift Start'], entry['Shift End']))
+        if j is None:
+            continue
+        for name in entry['Assigned To'].split(','):
+            i = row_of.get(name.strip())
+            if i is not None:
+                assigned_rows[j].add(i)
+    return assigned_rows
+
+
+def hint_retention(hint_schedule, schedule_data):
+    """
+    Counts how many (slot, person) assignments of a hint survived in a new schedule.
+
+    Args:
+        hint_schedule (list): Schedule passed as hint_schedule to the solver.
+        schedule_data (list): Schedule returned by the solver.
+
+    Returns:
+        tuple: (kept, total) assignment counts.
+    """
+    def pairs(schedule):
+        result = set()
+        for entry in schedule or []:
+            slot = (entry['Shift Start'], entry['Shift End'])
+            for name in entry['Assigned To'].split(','):
+                if name.strip():
+                    result.add((slot, name.strip()))
+        return result
+
+    hinted = pairs(hint_schedule)
+    return len(hinted & pairs(schedule_data)), len(hinted)
+
+
+def relative_gap(objective, best_bound):
+    """
+    Returns the relative gap between an objective value and the best bound (0.0 = proven optimal).
+    """
+    return abs(best_bound - objective) / max(1.0, abs(objective))
+
+
+class SolutionStreamer(cp_model.CpSolverSolutionCallback):
+    """
+    CP-SAT solution callback that reports every improving solution.
+
+    For each solution, on_solution receives a dict with keys:
+        - 'objective': objective value of the solution,
+        - 'best_bound': best proven bound at that moment,
+        - 'gap': relative gap between the two (see relative_gap()),
+        - 'wall_time': seconds since the solve started,
+        - 'schedule_data', 'total_hours': the solution decoded to the assign_shifts output format.
+    """
+
+    def __init__(self, decode, on_solution=None, control=None):
+        """
+        Args:
+            decode (callable): Takes a variable -> value function and returns (schedule_data, total_hours).
+            on_solution (callable, optional): Receives the progress dict of each solution.
+            control (SolveControl, optional): Notified about every solution.
+        """
+        super().__init__()
+        self._decode = decode
+        self._on_solution = on_solution
+        self._control = control
+
+    def on_solution_callback(self):
+        objective = self.ObjectiveValue()
+        best_bound = self.BestObjectiveBound()
+        if self._control is not None:
+            self._control.notify_solution(objective, best_bound)
+        if self._on_solution is None:
+            return
+        schedule_data, total_hours = self._decode(self.Value)
+        self._on_solution({
+            'objective': objective,
+            'best_bound': best_bound,
+            'gap': relative_gap(objective, best_bound),
+            'wall_time': self.WallTime(),
+            'schedule_data': schedule_data,
+            'total_hours': total_hours
+        })
+
+
+class SolveControl:
+    """
+    Stop conditions for a running CP-SAT solve, shared between the solver and the UI thread.
+
+    - stop() may be called from any thread; the solver stops and the best solution found so far is kept.
+    - relative_gap_limit stops the search once the relative gap drops to the given fraction.
+    - no_improvement_time stops the search when no better solution was found for that many seconds.
+
+    After the solve, stop_reason is None (time limit or optimum), 'user', 'stall' or 'gap',
+    objective holds the value of the best solution and best_bound the final proven bound.
+    """
+
+    POLL_INTERVAL = 0.1
+
+    def __init__(self, relative_gap_limit=0.0, no_improvement_time=0, stop_event=None):
+        """
+        Args:
+            relative_gap_limit (float, optional): Target relative gap (0 = off).
+            no_improvement_time (float, optional): Seconds without a better solution (0 = off).
+            stop_event (optional): Event used for stop requests, e.g. a multiprocessing.Event
+                shared by several solver processes. A private threading.Event by default.
+        """
+        self.relative_gap_limit = relative_gap_limit
+        self.no_improvement_time = no_improvement_time
+        self.stop_reason = None
+        self.objective = None
+        self.best_bound = None
+        # Report of the pre-solve pruning pass (see core.pruning), set by assign_shifts()
+        self.pruning = None
+        # Conflicts of the pinned assignments (see core.feasibility), set by assign_shifts()
+        self.infeasibility = None
+        # Limits bent by a relaxed solve, set by assign_shifts(relax=True)
+        self.relaxation = None
+        # Assignments the grouped solve could not split across people, set by core.symmetry
+        self.dropped = None
+        self._stop_requested = stop_event if stop_event is not None else threading.Event()
+        self._finished = threading.Event()
+        self._last_improvement = None
+        self._solver = None
+        self._watchdog = None
+
+    def stop(self):
+        """
+        Requests the running (or next) solve to stop and keep its best solution.
+        """
+        # note: a request arriving after the solve has already returned does not change its outcome
+        if self.stop_reason is None and not self._finished.is_set():
+            self.stop_reason = 'user'
+        self._stop_requested.set()
+
+    @property
+    def stop_requested(self):
+        return self._stop_requested.is_set()
+
+    def child(self, relative_gap_limit=0.0, no_improvement_time=0):
+        """
+        Returns a control for a sub-solve that shares this control's stop requests.
+        """
+        return SolveControl(relative_gap_limit, no_improvement_time, stop_event=self._stop_requested)
+
+    def notify_solution(self, objective, best_bound):
+        self.objective = objective
+        self.best_bound = best_bound
+        self._last_improvement = time.monotonic()
+        if self.relative_gap_limit > 0 and relative_gap(objective, best_bound) <= self.relative_gap_limit:
+            if self.stop_reason is None:
+                self.stop_reason = 'gap'
+
+    def attach(self, solver):
+        """
+        Configures the solver and starts the watchdog thread that stops it when requested.
+        """
+        if self.relative_gap_limit > 0:
+            solver.parameters.relative_gap_limit = self.relative_gap_limit
+        self._solver = solver
+        self._finished.clear()
+        self._last_improvement = None
+        self._watchdog = threading.Thread(target=self._watch, daemon=True)
+        self._watchdog.start()
+
+    def detach(self):
+        self._finished.set()
+        if self._watchdog is not None:
+            self._watchdog.join()
+        self._watchdog = None
+        self._solver = None
+
+    def _watch(self):
+        # info: StopSearch is repeated on every tick, so a request made just before Solve() starts is not lost
+        while not self._finished.wait(self.POLL_INTERVAL):
+            stalled = (
+                self.no_improvement_time > 0
+                and self._last_improvement is not None
+                and time.monotonic() - self._last_improvement >= self.no_improvement_time
+            )
+            if stalled and self.stop_reason is None:
+                self.stop_reason = 'stall'
+            if stalled or self._stop_requested.is_set():
+                self._solver.StopSearch()
+
+
+def solve_model(model, solver_time_limit, solver_num_threads, decode, on_solution=None, control=None,
+                solver_params=None):
+    """
+    Solves a CP-SAT model and decodes the best solution found.
+
+    Args:
+        model (cp_model.CpModel): Model to solve.
+        solver_time_limit (int): Time limit for the solver in seconds.
+        solver_num_threads (int): Number of threads for the solver.
+        decode (callable): Takes a variable -> value function and returns (schedule_data, total_hours).
+        on_solution (callable, optional): Progress callback (see SolutionStreamer).
+        control (SolveControl, optional): Stop conditions shared with the caller.
+        solver_params (dict, optional): Extra CP-SAT parameters by name (e.g. random_seed).
+
+    Returns:
+        tuple: (schedule_data, total_hours), or (None, None) if no feasible solution was found.
+    """
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = solver_time_limit
+    solver.parameters.num_search_workers = solver_num_threads
+    for name, value in (solver_params or {}).items():
+        setattr(solver.parameters, name, value)
+
+    callback = None
+    if on_solution is not None or control is not None:
+        callback = SolutionStreamer(decode, on_solution, control)
+
+    if control is not None:
+        control.attach(solver)
+    try:
+        status = solver.Solve(model, callback)
+    finally:
+        if control is not None:
+            control.detach()
+    if control is not None and status in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
+        control.objective = solver.ObjectiveValue()
+        control.best_bound = solver.BestObjectiveBound()
+        if relative_gap(control.objective, control.best_bound) == 0:
+            # info: the optimum was proven before the stop took effect
+            control.stop_reason = None
+    if status not in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
+        return None, None
+    return decode(solver.Value)
+
+
+class ShiftModel:
+    """
+    The CP-SAT model of assign_shifts, built once and re-configured between solves.
+
+    The variables and the constraint structure depend only on the participants, the slots and
+    their availability matrix. The staffing limits, hour caps and objective weights are written
+    into the model by configure(), which only rewrites constraint bounds, variable domains and
+    the objective, so changing them does not require building the model again. The pairs a
+    pruning pass (see core.pruning) rules out are fixed to 0 by configure() in the same way,
+    so the model is built once for the unpruned matrix whatever the limits are.
+
+    Two formulations of the same objective are available:
+        - 'standard': every auxiliary variable is tied to its definition from both sides
+          (start of a block, blocks per person and day, extra blocks, continuity, covered day),
+        - 'compact': auxiliary variables are only bounded in the direction the objective pushes
+          them, with implications, clauses and max-equalities. A block start reuses the
+          assignment literal where the previous slot can not be assigned, and the extra blocks
+          of a person and day are one integer bounded below by (starts - 1), without the
+          blocks-per-day variable and its two-sided definition.
+          Its optimum is the same as long as the objective weights are non-negative.
+
+    A relaxed model can bend every staffing limit and hour cap at a cost of relax_penalty per
+    person-minute (see configure()), which is far above anything an assignment can gain, so it
+    only bends what pinned assignments leave no way around.
+    """
+
+    FORMULATIONS = ('standard', 'compact')
+    # Limits with slack in a relaxed model, named after the assign_shifts() arguments
+    RELAXABLE_LIMITS = ('min_required', 'num_required', 'max_hours', 'max_hours_per_day')
+
+    def __init__(self, participants, slot_list, availability_matrix, slot_weights=None, formulation='standard',
+                 relaxed=False):
+        """
+        Builds the model.
+
+        Args:
+            participants (list): List of participant dictionaries.
+            slot_list (list): List of time slots as tuples (start_dt, end_dt).
+            availability_matrix (AvailabilityMatrix): Matrix over participants and slot_list.
+            slot_weights (list, optional): Number of grid slots each slot stands for.
+            formulation (str, optional): 'standard' or 'compact' (see the class docstring).
+            relaxed (bool, optional): Give every staffing limit and hour cap a slack variable, penalized
+                by configure(), so that conflicting pins still yield a schedule (see bent_limits()
+                and find_conflict()).
+        """
+        if formulation not in self.FORMULATIONS:
+            raise ValueError(f"Unknown formulation: {formulation}")
+        compact = formulation == 'compact'
+        self.formulation = formulation
+        self.relaxed = relaxed
+        self.participants = participants
+        self.slot_list = slot_list
+        self.model = model = cp_model.CpModel()
+
+        # Duration of each slot in minutes
+        slot_minutes = [int((end_dt - start_dt).total_seconds() // 60) for start_dt, end_dt in slot_list]
+        weights = slot_weights if slot_weights is not None else [1] * len(slot_list)
+
+        num_participants = len(participants)
+        num_shifts = len(slot_list)
+        states = availability_matrix.states
+
+        # Constraint indices whose bounds are set by configure()
+        self._min_required_cts = []
+        self._num_required_cts = []
+        self._max_minutes_cts = {}
+        self._max_minutes_per_day_cts = []
+        # Slack variables of the relaxed model: limit -> [(key, variable, minutes per unit)]
+        self._slacks = {limit: [] for limit in self.RELAXABLE_LIMITS}
+        # Assignments fixed to 0 by the last configure() (pairs ruled out by pruning)
+        self._blocked = set()
+
+        def slack(limit, key, upper, minutes=1):
+            if not relaxed:
+                return 0
+            var = model.NewIntVar(0, upper, f'slack_{limit}_{key}')
+            self._slacks[limit].append((key, var, minutes))
+            return var
+
+        # Decision variables: assignments[i,j], shift_assigned[j], and ifNeeded flag
+        self.assignments = assignments = {}
+        self.shift_assigned = shift_assigned = {}
+        if_needed_flag = {}
+
+        for j in range(num_shifts):
+            shift_assigned[j] = model.NewBoolVar(f'shift_assigned_{j}')
+
+        # Variables exist only for eligible (participant, slot) pairs
+        vars_by_slot = defaultdict(list)
+        slots_by_person = defaultdict(list)
+        for i, j in zip(*np.nonzero(states)):
+            i, j = int(i), int(j)
+            assignments[(i, j)] = model.NewBoolVar(f'assign_p{i}_s{j}')
+            # ifNeeded flag is set when the slot is covered only by 'ifNeeded' availability
+            if_needed_flag[(i, j)] = 1 if states[i, j] == IF_NEEDED else 0
+            vars_by_slot[j].append(assignments[(i, j)])
+            slots_by_person[i].append(j)
+
+        # Constraints: enforce min_required and num_required per shift
+        for j in range(num_shifts):
+            vars_in_shift = vars_by_slot.get(j, [])
+            if vars_in_shift:
+                num_assigned = sum(vars_in_shift)
+                short = slack('min_required', j, num_participants, slot_minutes[j])
+                over = slack('num_required', j, len(vars_in_shift), slot_minutes[j])
+            if vars_in_shift and compact:
+                model.AddMaxEquality(shift_assigned[j], vars_in_shift)
+                ct = model.Add(num_assigned + short >= 0)
+                ct.OnlyEnforceIf(shift_assigned[j])
+                self._min_required_cts.append(ct.Index())
+                self._num_required_cts.append(model.Add(num_assigned - over <= 0).Index())
+            elif vars_in_shift:
+                ct = model.Add(num_assigned + short >= 0)
+                ct.OnlyEnforceIf(shift_assigned[j])
+                self._min_required_cts.append(ct.Index())
+                model.Add(num_assigned == 0).OnlyEnforceIf(shift_assigned[j].Not())
+                ct = model.Add(num_assigned - over <= 0)
+                ct.OnlyEnforceIf(shift_assigned[j])
+                self._num_required_cts.append(ct.Index())
+                for var in vars_in_shift:
+                    model.Add(var <= shift_assigned[j])
+            else:
+                model.Add(shift_assigned[j] == 0)
+
+        # Hourly constraints for each participant
+        for i, person_slots in slots_by_person.items():
+            total_shifts_i = [assignments[(i, j)] * slot_minutes[j] for j in person_slots]
+            if total_shifts_i:
+                total_minutes = sum(total_shifts_i)
+                over = slack('max_hours', i, sum(slot_minutes[j] for j in person_slots))
+                self._max_minutes_cts[i] = model.Add(total_minutes - over <= 0).Index()
+
+                shifts_per_day = defaultdict(list)
+                for j in person_slots:
+                    day_of_shift = slot_list[j][0].date()
+                    shifts_per_day[day_of_shift].append((assignments[(i, j)], slot_minutes[j]))
+                for day, arr in shifts_per_day.items():
+                    day_minutes = sum(var * minutes for var, minutes in arr)
+                    over = slack('max_hours_per_day', (i, day), sum(minutes for _, minutes in arr))
+                    self._max_minutes_per_day_cts.append(model.Add(day_minutes - over <= 0).Index())
+
+        # Assumption literals of the relaxed model: each one forbids bending one limit
+        self._keep_limit = {}
+        for limit, slacks in self._slacks.items():
+            if slacks:
+                self._keep_limit[limit] = keep = model.NewBoolVar(f'keep_{limit}')
+                model.Add(sum(var for _, var, _ in slacks) == 0).OnlyEnforceIf(keep)
+
+        # Structures for gap_penalty, coverage_reward, etc.
+        day_to_slots_idx = group_slots_by_day(slot_list)
+
+        # (1) gap_penalty: penalty for extra blocks (gaps)
+        if compact:
+            self._sum_of_extras = self._add_compact_gap_terms(day_to_slots_idx)
+        else:
+            self._sum_of_extras = self._add_gap_terms(day_to_slots_idx)
+
+        # (2) coverage_reward and (3) day coverage
+        self._sum_of_continuity, self._sum_of_covered_days = add_coverage_terms(
+            model, shift_assigned, day_to_slots_idx, slot_weights, staffable=set(vars_by_slot), compact=compact
+        )
+
+        # Total assignments across all slots
+        all_assigns = [var * weights[j] for (i, j), var in assignments.items()]
+        self._sum_of_assignments = sum(all_assigns)
+
+        # Sum of ifNeeded assignments
+        ifNeeded_assigns = []
+        for (i, j), var in assignments.items():
+            if if_needed_flag.get((i, j), 0) == 1:
+                ifNeeded_assigns.append(var * weights[j])
+        self._sum_of_ifNeeded = sum(ifNeeded_assigns)
+
+    def _add_gap_terms(self, day_to_slots_idx):
+        """
+        Standard gap terms: a start variable per assignment, and block and extra block counts
+        per person and day. Returns the sum of extra blocks.
+        """
+        model = self.model
+        assignments = self.assignments
+        num_participants = len(self.participants)
+        start_vars = {}
+        for i in range(num_participants):
+            for d, slots_idx in day_to_slots_idx.items():
+                for idx_in_day, j in enumerate(slots_idx):
+                    if (i, j) in assignments:
+                        start_vars[(i, j)] = model.NewBoolVar(f'start_i{i}_s{j}')
+                        if idx_in_day == 0:
+                            model.Add(start_vars[(i, j)] == assignments[(i, j)])
+                        else:
+                            j_prev = slots_idx[idx_in_day - 1]
+                            if (i, j_prev) not in assignments:
+                                model.Add(start_vars[(i, j)] == assignments[(i, j)])
+                            else:
+                                model.Add(start_vars[(i, j)] <= assignments[(i, j)])
+                                model.Add(start_vars[(i, j)] <= 1 - assignments[(i, j_prev)])
+                                model.Add(start_vars[(i, j)] >= assignments[(i, j)] - assignments[(i, j_prev)])
+
+        block_count = {}
+        for i in range(num_participants):
+            for d, slots_idx in day_to_slots_idx.items():
+                start_list = [start_vars[(i, j)] for j in slots_idx if (i, j) in start_vars]
+                # note: a person with nothing to staff that day can not have a gap
+                if start_list:
+                    bc = model.NewIntVar(0, len(start_list), f'block_count_i{i}_d{d}')
+                    model.Add(bc == sum(start_list))
+                    block_count[(i, d)] = bc
+
+        extra_blocks = []
+        for (i, d), bc in block_count.items():
+            max_possible = len(day_to_slots_idx[d])
+            ebd = model.NewIntVar(0, max_possible, f'extra_blocks_i{i}_d{d}')
+            extra_blocks.append(ebd)
+            model.Add(ebd >= bc - 1)
+            model.Add(ebd <= bc)
+
+        return sum(extra_blocks)
+
+    def _add_compact_gap_terms(self, day_to_slots_idx):
+        """
+        Compact gap terms: extra blocks of a person and day >= block starts - 1.
+        A start is only forced up by a clause (assigned and previous slot free -> start); where
+        the previous slot can not be assigned, the assignment itself is the start. Returns the
+        sum of extra blocks.
+        """
+        model = self.model
+        assignments = self.assignments
+        extras = []
+        for i in range(len(self.participants)):
+            for d, slots_idx in day_to_slots_idx.items():
+                starts = []
+                for idx_in_day, j in enumerate(slots_idx):
+                    var = assignments.get((i, j))
+                    if var is None:
+                        continue
+                    prev = assignments.get((i, slots_idx[idx_in_day - 1])) if idx_in_day > 0 else None
+                    if prev is None:
+                        starts.append(var)
+                    else:
+                        start = model.NewBoolVar(f'start_i{i}_s{j}')
+                        model.AddBoolOr([var.Not(), prev, start])
+                        starts.append(start)
+                # note: a person with nothing to staff that day can not have a gap
+                if len(starts) > 1:
+                    extra = model.NewIntVar(0, len(starts) - 1, f'extra_blocks_i{i}_d{d}')
+                    model.Add(extra >= sum(starts) - 1)
+                    extras.append(extra)
+        return sum(extras)
+
+    def _set_bounds(self, constraint_indices, lower=None, upper=None):
+        constraints = self.model.Proto().constraints
+        for k in constraint_indices:
+            domain = constraints[k].linear.domain
+            if lower is not None:
+                domain[0] = lower
+            if upper is not None:
+                domain[1] = upper
+
+    def configure(
+        self,
+        num_required,
+        min_required,
+        max_hours,
+        max_hours_per_day,
+        gap_penalty=3,
+        coverage_reward=2,
+        day_coverage_reward=2,
+        ifNeeded_penalty=2,
+        max_hours_by_participant=None,
+        relax_penalty=50,
+        availability_matrix=None
+    ):
+        """
+        Writes the staffing limits, hour caps and objective weights into the model.
+        Arguments have the same meaning as in assign_shifts(); relax_penalty is the cost of one
+        person-minute of slack in a relaxed model.
+
+        availability_matrix is the pruned matrix (see core.pruning.prune_availability()): the
+        assignments of pairs it marks unavailable are fixed to 0, all others get back their
+        0..1 domain. This also undoes fix_assignments() and pin(), so configure() comes first.
+        """
+        if self.formulation == 'compact' and min(gap_penalty, coverage_reward, day_coverage_reward) < 0:
+            raise ValueError("The compact formulation requires non-negative objective weights")
+        max_minutes_per_day = int(max_hours_per_day * 60)
+
+        self._set_bounds(self._min_required_cts, lower=min_required)
+        self._set_bounds(self._num_required_cts, upper=num_required)
+        self.set_hour_caps(max_hours, max_hours_by_participant)
+        self._set_bounds(self._max_minutes_per_day_cts, upper=max_minutes_per_day)
+
+        if availability_matrix is None:
+            self._blocked = set()
+        else:
+            states = availability_matrix.states
+            self._blocked = {(i, j) for i, j in self.assignments if states[i, j] == UNAVAILABLE}
+        self.release_assignments()
+
+        # Objective function
+        objective_expr = (
+            self._sum_of_assignments
+            + coverage_reward * self._sum_of_continuity
+            - gap_penalty * self._sum_of_extras
+            + day_coverage_reward * self._sum_of_covered_days
+            - ifNeeded_penalty * self._sum_of_ifNeeded
+            - relax_penalty * sum(var * minutes for slacks in self._slacks.values() for _, var, minutes in slacks)
+        )
+        self._objective = objective_expr
+        self.model.Maximize(objective_expr)
+
+    def set_hour_caps(self, max_hours, max_hours_by_participant=None):
+        """
+        Rewrites the hour cap of every participant (see configure()).
+        """
+        max_minutes = int(max_hours * 60)
+        if max_hours_by_participant is None:
+            self._set_bounds(self._max_minutes_cts.values(), upper=max_minutes)
+        else:
+            for i, k in self._max_minutes_cts.items():
+                self._set_bounds([k], upper=min(max_minutes, int(round(max_hours_by_participant[i] * 60))))
+
+    def set_hint(self, hint_schedule):
+        """
+        Replaces the solution hints with the given schedule (None clears them).
+        """
+        self.model.ClearHints()
+        # Warm start: hint every assignment of the previous schedule, and 0 everywhere else
+        if hint_schedule:
+            hinted_rows = schedule_to_rows(hint_schedule, self.participants, self.slot_list)
+            for (i, j), var in self.assignments.items():
+                hinted = i in hinted_rows.get(j, ()) and (i, j) not in self._blocked
+                self.model.AddHint(var, 1 if hinted else 0)
+            for j, var in self.shift_assigned.items():
+                self.model.AddHint(var, 1 if hinted_rows.get(j) else 0)
+
+    def fix_assignments(self, assigned_rows, keys=None, free=()):
+        """
+        Fixes assignments to their value in assigned_rows (see schedule_to_rows()).
+        Fixed variables become constants that the presolve removes from the search.
+        release_assignments() undoes it. Blocked pairs (see configure()) stay at 0.
+
+        Args:
+            assigned_rows (dict): Maps a slot index to the assigned participant indices.
+            keys (iterable, optional): (participant index, slot index) pairs to fix; all by default.
+            free (set, optional): Pairs left free even if they are in keys.
+        """
+        variables = self.model.Proto().variables
+        for i, j in self.assignments if keys is None else keys:
+            var = self.assignments.get((i, j))
+            if var is None or (i, j) in free or (i, j) in self._blocked:
+                continue
+            value = 1 if i in assigned_rows.get(j, ()) else 0
+            domain = variables[var.Index()].domain
+            domain[0] = value
+            domain[1] = value
+
+    def pin(self, pinned_schedule, pinned_slots=(), pinned_names=()):
+        """
+        Fixes the pinned part of a schedule (see assign_shifts()).
+
+        Returns:
+            dict: Maps a slot index to the pinned names that have no variable in the model
+                (people from outside the poll, or slots outside their availability).
+        """
+        slot_set = set(pinned_slots)
+        name_set = set(pinned_names)
+        pinned_rows = schedule_to_rows(pinned_schedule, self.participants, self.slot_list)
+        keys = [
+            (i, j) for i, j in self.assignments
+            if self.slot_list[j] in slot_set or self.participants[i]['name'] in name_set
+        ]
+        self.fix_assignments(pinned_rows, keys)
+
+        col_of = {slot: j for j, slot in enumerate(self.slot_list)}
+        row_of = {}
+        for i, p in enumerate(self.participants):
+            row_of.setdefault(p['name'], i)
+        unmodelled = defaultdict(list)
+        for entry in pinned_schedule or []:
+            slot = (entry['Shift Start'], entry['Shift End'])
+            j = col_of.get(slot)
+            if j is None:
+                continue
+            for name in (n.strip() for n in entry['Assigned To'].split(',')):
+                if not name or (slot not in slot_set and name not in name_set):
+                    continue
+                key = (row_of.get(name), j)
+                if key not in self.assignments or key in self._blocked:
+                    unmodelled[j].append(name)
+        return unmodelled
+
+    def release_assignments(self):
+        """
+        Restores the 0..1 domain of every assignment, except the blocked ones (see configure()).
+        """
+        variables = self.model.Proto().variables
+        for key, var in self.assignments.items():
+            domain = variables[var.Index()].domain
+            domain[0] = 0
+            domain[1] = 0 if key in self._blocked else 1
+
+    def find_conflict(self, time_limit, num_threads=1):
+        """
+        Finds which limits of a configured relaxed model can not all hold at once, e.g. because of
+        pinned assignments. Solves the model without its objective, assuming that no limit is bent:
+        the infeasible core CP-SAT returns is shrunk by dropping one limit at a time, and a set of
+        limits that can hold together is grown one limit at a time.
+
+        Args:
+            time_limit (float): Time limit of each feasibility solve in seconds.
+            num_threads (int, optional): Number of solver threads.
+
+        Returns:
+            tuple: (conflict, holding) lists of limit names (see RELAXABLE_LIMITS): a minimal set
+                that can not hold together (empty if all can, or the time ran out) and a maximal set
+                proven to hold together, which hold_limits() can make hard.
+        """
+        model = self.model
+        model.ClearObjective()
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = time_limit
+        solver.parameters.num_workers = num_threads
+
+        def status(limits):
+            model.ClearAssumptions()
+            model.AddAssumptions([self._keep_limit[limit] for limit in limits])
+            return solver.Solve(model)
+
+        feasible = (cp_model.OPTIMAL, cp_model.FEASIBLE)
+        try:
+            limits = list(self._keep_limit)
+            result = status(limits)
+            if result in feasible:
+                return [], limits
+            conflict = []
+            if result == cp_model.INFEASIBLE:
+                core_vars = set(solver.SufficientAssumptionsForInfeasibility())
+                conflict = [limit for limit, keep in self._keep_limit.items() if keep.Index() in core_vars]
+                for limit in list(conflict):
+                    if len(conflict) > 1 and status([c for c in conflict if c != limit]) == cp_model.INFEASIBLE:
+                        conflict.remove(limit)
+            holding = []
+            for limit in limits:
+                if status(holding + [limit]) in feasible:
+                    holding.append(limit)
+            return conflict, holding
+        finally:
+            model.ClearAssumptions()
+            model.Maximize(self._objective)
+
+    def hold_limits(self, limits=()):
+        """
+        Forbids bending the given limits of a relaxed model (see find_conflict()); the others,
+        and all of them when called without limits, may be bent again.
+        """
+        variables = self.model.Proto().variables
+        for limit, keep in self._keep_limit.items():
+            variables[keep.Index()].domain[0] = 1 if limit in limits else 0
+
+    def bent_limits(self, value):
+        """
+        Lists the limits a solved relaxed model had to bend (value: variable -> value function).
+
+        Returns:
+            list: Dicts with the 'limit' name (see RELAXABLE_LIMITS), its 'key' (slot index for the
+                staffing limits, participant index for max_hours, (participant index, date) for
+                max_hours_per_day) and the 'amount' (people for the staffing limits, minutes for
+                the hour caps).
+        """
+        return [
+            {'limit': limit, 'key': key, 'amount': value(var)}
+            for limit, slacks in self._slacks.items()
+            for key, var, _ in slacks if value(var) > 0
+        ]
+
+    def decode(self, value):
+        """
+        Converts solved assignments (value: variable -> value function) into (schedule_data, total_hours).
+        """
+        assigned_rows = defaultdict(list)
+        for (i, j), var in self.assignments.items():
+            if value(var) == 1:
+                assigned_rows[j].append(i)
+        return build_schedule(self.participants, self.slot_list, assigned_rows)
+
+
+def add_pinned_names(schedule_data, total_hours, slot_list, pinned_names_by_slot):
+    """
+    Adds names to a schedule in the assign_shifts output format (used for pinned assignments
+    the model could not represent, see ShiftModel.pin()).
+
+    Returns:
+        tuple: (schedule_data, total_hours) including the added names.
+    """
+    names_by_slot = {(e['Shift Start'], e['Shift End']): e['Assigned To'] for e in schedule_data}
+    for j, names in pinned_names_by_slot.items():
+        start_dt, end_dt = slot_list[j]
+        assigned = names_by_slot.get((start_dt, end_dt))
+        names_by_slot[(start_dt, end_dt)] = ", ".join(([assigned] if assigned else []) + names)
+        for name in names:
+            total_hours[name] = total_hours.get(name, 0.0) + (end_dt - start_dt).total_seconds() / 3600.0
+    schedule_data = [
+        {'Shift Start': start_dt, 'Shift End': end_dt, 'Assigned To': names_by_slot[(start_dt, end_dt)]}
+        for start_dt, end_dt in slot_list if (start_dt, end_dt) in names_by_slot
+    ]
+    return schedule_data, total_hours
+
+
+class ModelCache:
+    """
+    Keeps recently built ShiftModels so that re-solving the same poll skips building the model.
+
+    Models are keyed by the participant names, the slots (which reflect the active days),
+    the slot weights, the availability matrix, the formulation and relaxation, i.e. everything the model
+    structure depends on. The matrix is the unpruned one: pruning only fixes variables (see
+    ShiftModel.configure()), so changing the limits reuses the model. The least recently used model
+    is dropped once max_size is exceeded.
+    """
+
+    def __init__(self, max_size=2):
+        self.max_size = max_size
+        self._models = {}
+
+    def clear(self):
+        self._models.clear()
+
+    def get(self, participants, slot_list, availability_matrix, slot_weights=None, formulation='standard',
+            relaxed=False):
+        """
+        Returns the cached ShiftModel for the given poll content, building it on a miss.
+        """
+        key = (
+            tuple(p['name'] for p in participants),
+            tuple(slot_list),
+            tuple(slot_weights) if slot_weights is not None else None,
+            availability_matrix.states.tobytes(),
+            formulation,
+            relaxed
+        )
+        shift_model = self._models.pop(key, None)
+        if shift_model is None:
+            shift_model = ShiftModel(participants, slot_list, availability_matrix, slot_weights, formulation, relaxed)
+        # note: re-inserting keeps the dict ordered from least to most recently used
+        self._models[key] = shift_model
+        while len(self._models) > self.max_size:
+            del self._models[next(iter(self._models))]
+        return shift_model
+
+
 def assign_shifts(
     participants,
     slot_list,
@@ -68,7 +981,22 @@ def assign_shifts(
     gap_penalty=3,          # penalty for breaks
     coverage_reward=2,      # reward for continuity within a day
     day_coverage_reward=2,  # reward for each covered day
-    ifNeeded_penalty=2      # penalty for 'ifNeeded' slots
+    ifNeeded_penalty=2,     # penalty for 'ifNeeded' slots
+    availability_index=None,  # prebuilt AvailabilityIndex for the participants
+    availability_matrix=None, # prebuilt AvailabilityMatrix over participants x slot_list
+    slot_weights=None,        # number of grid slots each entry of slot_list stands for
+    hint_schedule=None,       # previous or manually edited schedule used as solution hints
+    on_solution=None,         # callback receiving every improving solution
+    control=None,             # SolveControl with stop conditions
+    model_cache=None,         # ModelCache reused between solves of the same poll
+    solver_params=None,       # extra CP-SAT parameters (e.g. random_seed)
+    max_hours_by_participant=None, # individual caps over slot_list, tighter than max_hours
+    pinned_schedule=None,     # schedule whose pinned part is kept unchanged
+    pinned_slots=None,        # slots whose staffing is pinned
+    pinned_names=None,        # participants whose shifts are pinned
+    prune=True,               # drop what can never be staffed before building the model
+    formulation='standard',   # ShiftModel formulation, 'standard' or 'compact'
+    relax=False               # bend limits instead of failing when pins conflict with them
 ):
     """
     Assigns shifts and returns (schedule_data, total_hours).
@@ -89,6 +1017,44 @@ def assign_shifts(
         coverage_reward (int, optional): Reward for continuity in a day.
         day_coverage_reward (int, optional): Reward for each day that is covered.
         ifNeeded_penalty (int, optional): Penalty for assignments in 'ifNeeded' slots.
+        availability_index (AvailabilityIndex, optional): Index built once per poll; built here if omitted.
+        availability_matrix (AvailabilityMatrix, optional): Matrix over participants and slot_list;
+            built from the index if omitted.
+        slot_weights (list, optional): Number of grid slots each slot stands for (see core.slot_blocks).
+            Assignment rewards, ifNeeded penalties and continuity are weighted by it. Defaults to 1.
+        hint_schedule (list, optional): Schedule in the output format (e.g. the previous result or
+            ScheduleMatrixWidget.get_current_schedule_data()) loaded into CP-SAT as solution hints.
+        on_solution (callable, optional): Called from the solver thread with a progress dict
+            for every improving solution (see SolutionStreamer).
+        control (SolveControl, optional): Lets the caller stop the solve early (stop button,
+            relative gap target, no-improvement cutoff) while keeping the best solution.
+        model_cache (ModelCache, optional): When given, the built model is taken from / stored in
+            the cache, and a re-solve of the same poll only rewrites the limits and the objective.
+        solver_params (dict, optional): Extra CP-SAT parameters by name, see core.portfolio.
+        max_hours_by_participant (list, optional): Hour cap of each participant over slot_list
+            (e.g. their share of max_hours in one part of a decomposed poll, see core.decomposition).
+            max_hours still applies on top of it.
+        pinned_schedule (list, optional): Schedule in the output format (e.g. the manually edited
+            one) whose pinned part is kept unchanged; only the rest is re-solved. Pinned
+            assignments become constants and count towards the hour caps.
+        pinned_slots (iterable, optional): Slots (start_dt, end_dt) in which nobody is added or removed.
+        pinned_names (iterable, optional): Participant names whose shifts are neither added nor removed.
+            Pins that can not be satisfied are found by core.feasibility.check_pinned_feasibility()
+            before the model is built; the solve then returns (None, None) at once and the
+            conflicts are stored in control.infeasibility.
+        prune (bool, optional): Run core.pruning.prune_availability() first: impossible slots and
+            pairs are fixed to 0 (see ShiftModel.configure()) and hour caps are tightened to the workable minutes. The optimum
+            is unchanged; the report is stored in control.pruning.
+        formulation (str, optional): 'standard' or 'compact' model (see ShiftModel). Both have the
+            same optimum; the compact one has fewer auxiliary variables and constraints.
+        relax (bool, optional): Solve a relaxed model (see ShiftModel) in which the staffing limits
+            and hour caps may be bent at a high cost, so conflicting pins still give a schedule.
+            With a pinned schedule, a minimal set of conflicting limits is found first (see
+            ShiftModel.find_conflict()). control.relaxation is set to a dict with that 'conflict'
+            list and the 'bent' limits of the returned schedule (see ShiftModel.bent_limits()).
+
+    A pure coverage problem (see core.flow.is_pure_coverage()) is solved exactly by
+    core.flow.assign_shifts_flow() instead, without building a CP-SAT model.
 
     Returns:
         tuple: (schedule_data, total_hours) where:
@@ -99,212 +1065,104 @@ def assign_shifts(
     if not participants or not slot_list:
         return None, None
 
-    model = cp_model.CpModel()
-
-    # Duration of a slot in minutes
-    shift_minutes = int((slot_list[0][1] - slot_list[0][0]).total_seconds() // 60)
+    # note: imported here, core.flow builds on this module
+    from core.flow import assign_shifts_flow, is_pure_coverage
+    if is_pure_coverage(
+        slot_list, min_required, gap_penalty, coverage_reward, day_coverage_reward, pinned_schedule, relax
+    ):
+        return assign_shifts_flow(
+            participants, slot_list, num_required, min_required, max_hours, max_hours_per_day,
+            gap_penalty=gap_penalty, coverage_reward=coverage_reward, day_coverage_reward=day_coverage_reward,
+            ifNeeded_penalty=ifNeeded_penalty, availability_index=availability_index,
+            availability_matrix=availability_matrix, slot_weights=slot_weights,
+            max_hours_by_participant=max_hours_by_participant, control=control
+        )
 
-    # Convert hour limits to minutes
-    max_minutes = int(max_hours * 60)
-    max_minutes_per_day = int(max_hours_per_day * 60)
+    if availability_matrix is None or availability_matrix.shape != (len(participants), len(slot_list)):
+        availability_matrix = AvailabilityMatrix(participants, slot_list, availability_index)
+    # note: the model is built for the unpruned matrix, pruning only fixes variables to 0
+    pruned_matrix = None
+    if prune:
+        pruned_matrix, caps, report = prune_availability(
+            availability_matrix, slot_list, min_required, max_hours, max_hours_per_day
+        )
+        if max_hours_by_participant is not None:
+            caps = [min(cap, hours) for cap, hours in zip(caps, max_hours_by_participant)]
+        max_hours_by_participant = caps
+        if control is not None:
+            control.pruning = report
 
-    num_participants = len(participants)
-    num_shifts = len(slot_list)
+    if pinned_schedule is not None and not relax:
+        name_set = set(pinned_names or ())
+        slot_set = set(pinned_slots or ())
+        conflicts = check_pinned_feasibility(
+            pruned_matrix if pruned_matrix is not None else availability_matrix, slot_list,
+            schedule_to_rows(pinned_schedule, participants, slot_list),
+            [j for j, slot in enumerate(slot_list) if slot in slot_set],
+            [i for i, p in enumerate(participants) if p['name'] in name_set],
+            num_required, min_required, max_hours, max_hours_per_day, max_hours_by_participant
+        )
+        if control is not None:
+            control.infeasibility = conflicts
+        if conflicts:
+            return None, None
 
-    # Decision variables: assignments[i,j], shift_assigned[j], and ifNeeded flag
-    assignments = {}
-    shift_assigned = {}
-    if_needed_flag = {}
+    if model_cache is not None:
+        shift_model = model_cache.get(participants, slot_list, availability_matrix, slot_weights, formulation, relax)
+    else:
+        shift_model = ShiftModel(participants, slot_list, availability_matrix, slot_weights, formulation, relax)
 
-    for j in range(num_shifts):
-        shift_assigned[j] = model.NewBoolVar(f'shift_assigned_{j}')
-
-    for i in range(num_participants):
-        for j in range(num_shifts):
-            start_dt, end_dt = slot_list[j]
-
-            # Check if the slot is within normal availability
-            normal_ok = any(
-                start_dt >= avs and end_dt <= ave
-                for (avs, ave) in participants[i]['availabilities']
-            )
-            # Check if the slot is within 'ifNeeded'
-            ifneeded_ok = any(
-                start_dt >= ivs and end_dt <= ive
-                for (ivs, ive) in participants[i]['ifNeeded']
-            )
-
-            if normal_ok or ifneeded_ok:
-                assignments[(i, j)] = model.NewBoolVar(f'assign_p{i}_s{j}')
-
-                if ifneeded_ok and not normal_ok:
-                    if_needed_flag[(i, j)] = 1
-                else:
-                    if_needed_flag[(i, j)] = 0
-            else:
-                assignments[(i, j)] = None
-
-    # Constraints: enforce min_required and num_required per shift
-    for j in range(num_shifts):
-        vars_in_shift = [
-            assignments[(i, j)]
-            for i in range(num_participants)
-            if assignments[(i, j)] is not None
-        ]
-        if vars_in_shift:
-            num_assigned = sum(vars_in_shift)
-            model.Add(num_assigned >= min_required).OnlyEnforceIf(shift_assigned[j])
-            model.Add(num_assigned == 0).OnlyEnforceIf(shift_assigned[j].Not())
-            model.Add(num_assigned <= num_required).OnlyEnforceIf(shift_assigned[j])
-            for var in vars_in_shift:
-                model.Add(var <= shift_assigned[j])
-        else:
-            model.Add(shift_assigned[j] == 0)
-
-    # Hourly constraints for each participant
-    for i in range(num_participants):
-        total_shifts_i = [
-            assignments[(i, j)]
-            for j in range(num_shifts)
-            if assignments[(i, j)] is not None
-        ]
-        if total_shifts_i:
-            total_minutes = sum(total_shifts_i) * shift_minutes
-            model.Add(total_minutes <= max_minutes)
-
-            shifts_per_day = defaultdict(list)
-            for j in range(num_shifts):
-                if assignments.get((i, j)) is not None:
-                    day_of_shift = slot_list[j][0].date()
-                    shifts_per_day[day_of_shift].append(assignments[(i, j)])
-            for day, arr in shifts_per_day.items():
-                day_minutes = sum(arr) * shift_minutes
-                model.Add(day_minutes <= max_minutes_per_day)
-
-    # Structures for gap_penalty, coverage_reward, etc.
-    day_to_slots_idx = defaultdict(list)
-    for j, slot in enumerate(slot_list):
-        d = slot[0].date()
-        day_to_slots_idx[d].append(j)
-    for d in day_to_slots_idx:
-        day_to_slots_idx[d].sort(key=lambda idx: slot_list[idx][0])
-
-    # (1) gap_penalty: penalty for extra blocks (gaps)
-    start_vars = {}
-    for i in range(num_participants):
-        for d, slots_idx in day_to_slots_idx.items():
-            for idx_in_day, j in enumerate(slots_idx):
-                if assignments[(i, j)] is not None:
-                    start_vars[(i, j)] = model.NewBoolVar(f'start_i{i}_s{j}')
-                    if idx_in_day == 0:
-                        model.Add(start_vars[(i, j)] == assignments[(i, j)])
-                    else:
-                        j_prev = slots_idx[idx_in_day - 1]
-                        if assignments[(i, j_prev)] is None:
-                            model.Add(start_vars[(i, j)] == assignments[(i, j)])
-                        else:
-                            model.Add(start_vars[(i, j)] <= assignments[(i, j)])
-                            model.Add(start_vars[(i, j)] <= 1 - assignments[(i, j_prev)])
-                            model.Add(start_vars[(i, j)] >= assignments[(i, j)] - assignments[(i, j_prev)])
-                else:
-                    start_vars[(i, j)] = model.NewConstant(0)
-
-    block_count = {}
-    for i in range(num_participants):
-        for d, slots_idx in day_to_slots_idx.items():
-            start_list = [start_vars[(i, j)] for j in slots_idx if (i, j) in start_vars]
-            if start_list:
-                bc = model.NewIntVar(0, len(start_list), f'block_count_i{i}_d{d}')
-                model.Add(bc == sum(start_list))
-                block_count[(i, d)] = bc
-            else:
-                block_count[(i, d)] = model.NewConstant(0)
-
-    extra_blocks = []
-    for (i, d), bc in block_count.items():
-        max_possible = len(day_to_slots_idx[d])
-        ebd = model.NewIntVar(0, max_possible, f'extra_blocks_i{i}_d{d}')
-        extra_blocks.append(ebd)
-        model.Add(ebd >= bc - 1)
-        model.Add(ebd <= bc)
-
-    sum_of_extras = sum(extra_blocks)
-
-    # (2) coverage_reward: reward for continuity
-    continuity_vars = []
-    for d, slots_idx in day_to_slots_idx.items():
-        for k in range(len(slots_idx) - 1):
-            j1 = slots_idx[k]
-            j2 = slots_idx[k + 1]
-            cvar = model.NewBoolVar(f'cont_j{j1}_j{j2}')
-            model.Add(cvar <= shift_assigned[j1])
-            model.Add(cvar <= shift_assigned[j2])
-            model.Add(cvar >= shift_assigned[j1] + shift_assigned[j2] - 1)
-            continuity_vars.append(cvar)
-    sum_of_continuity = sum(continuity_vars)
-
-    # (3) Day coverage: reward for each day that is covered
-    day_covered = {}
-    for d, slots_idx in day_to_slots_idx.items():
-        dc = model.NewBoolVar(f'day_covered_{d}')
-        sum_in_day = sum(shift_assigned[j] for j in slots_idx)
-        model.Add(sum_in_day == 0).OnlyEnforceIf(dc.Not())
-        model.Add(sum_in_day >= 1).OnlyEnforceIf(dc)
-        day_covered[d] = dc
-    sum_of_covered_days = sum(day_covered.values())
-
-    # Total assignments across all slots
-    all_assigns = []
-    for i in range(num_participants):
-        for j in range(num_shifts):
-            if assignments[(i, j)] is not None:
-                all_assigns.append(assignments[(i, j)])
-    sum_of_assignments = sum(all_assigns)
-
-    # Sum of ifNeeded assignments
-    ifNeeded_assigns = []
-    for (i, j), var in assignments.items():
-        if var is not None and if_needed_flag.get((i, j), 0) == 1:
-            ifNeeded_assigns.append(var)
-    sum_of_ifNeeded = sum(ifNeeded_assigns)
-
-    # Objective function
-    objective_expr = (
-        sum_of_assignments
-        + coverage_reward * sum_of_continuity
-        - gap_penalty * sum_of_extras
-        + day_coverage_reward * sum_of_covered_days
-        - ifNeeded_penalty * sum_of_ifNeeded
-    )
-    model.Maximize(objective_expr)
-
-    # Solver configuration
-    solver = cp_model.CpSolver()
-    solver.parameters.max_time_in_seconds = solver_time_limit
-    solver.parameters.num_search_workers = solver_num_threads
-
-    # Solve the model
-    status = solver.Solve(model)
-    if status not in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
-        return None, None
-
-    schedule_data = []
-    total_hours = {p['name']: 0.0 for p in participants}
-    for j in range(num_shifts):
-        if solver.Value(shift_assigned[j]) == 1:
-            assigned_names = []
-            for i in range(num_participants):
-                if assignments[(i, j)] is not None and solver.Value(assignments[(i, j)]) == 1:
-                    assigned_names.append(participants[i]['name'])
-            if assigned_names:
+    decode = shift_model.decode
+    try:
+        shift_model.configure(
+            num_required, min_required, max_hours, max_hours_per_day,
+            gap_penalty, coverage_reward, day_coverage_reward, ifNeeded_penalty, max_hours_by_participant,
+            availability_matrix=pruned_matrix
+        )
+        if pinned_schedule is not None:
+            unmodelled = shift_model.pin(pinned_schedule, pinned_slots or (), pinned_names or ())
+            # note: pinned shifts outside the model still use up the person's hours
+            pinned_hours = defaultdict(float)
+            for j, names in unmodelled.items():
                 start_dt, end_dt = slot_list[j]
-                dur_hrs = (end_dt - start_dt).total_seconds() / 3600.0
-                schedule_data.append({
-                    'Shift Start': start_dt,
-                    'Shift End': end_dt,
-                    'Assigned To': ", ".join(assigned_names)
-                })
-                for nm in assigned_names:
-                    total_hours[nm] += dur_hrs
+                for name in names:
+                    pinned_hours[name] += (end_dt - start_dt).total_seconds() / 3600.0
+            if pinned_hours:
+                if max_hours_by_participant is None:
+                    max_hours_by_participant = [max_hours] * len(participants)
+                max_hours_by_participant = [
+                    max(0.0, max_hours_by_participant[i] - pinned_hours.get(p['name'], 0.0))
+                    for i, p in enumerate(participants)
+                ]
+                shift_model.set_hour_caps(max_hours, max_hours_by_participant)
+            if unmodelled:
+                def decode(value):
+                    return add_pinned_names(*shift_model.decode(value), slot_list, unmodelled)
+        shift_model.set_hint(hint_schedule)
+        if relax:
+            relaxation = {'conflict': [], 'bent': []}
+            holding = ShiftModel.RELAXABLE_LIMITS
+            if pinned_schedule is not None:
+                relaxation['conflict'], holding = shift_model.find_conflict(
+                    max(1.0, 0.1 * solver_time_limit), solver_num_threads
+                )
+            # note: only pinned assignments can force a limit to bend, the others stay hard
+            shift_model.hold_limits(holding)
+            if control is not None:
+                control.relaxation = relaxation
+            relaxed_decode = decode
 
-    return schedule_data, total_hours
+            def decode(value):
+                relaxation['bent'] = shift_model.bent_limits(value)
+                return relaxed_decode(value)
+
+        # Solve the model
+        return solve_model(
+            shift_model.model, solver_time_limit, solver_num_threads, decode, on_solution, control,
+            solver_params
+        )
+    finally:
+        if pinned_schedule is not None:
+            shift_model.release_assignments()
+        if relax:
+            shift_model.hold_limits()
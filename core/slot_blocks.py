@@ -0,0 +1,187 @@
+import numpy as np
+
+from core.availability_matrix import AvailabilityMatrix
+from core.scheduler import assign_shifts, schedule_to_rows
+
+
+def aggregate_slots(availability_matrix, slot_list, max_block_minutes=60):
+    """
+    Merges runs of consecutive slots with identical eligible sets into blocks.
+
+    Two slots end up in the same block when they are adjacent on the same day (one ends where
+    the next starts), every participant has the same availability state in both, and the block
+    stays within max_block_minutes. Solving over the blocks is a heuristic (see
+    assign_shifts_aggregated()).
+
+    Args:
+        availability_matrix (AvailabilityMatrix): Matrix over the participants and slot_list.
+        slot_list (list): List of time slots as tuples (start_dt, end_dt).
+        max_block_minutes (int, optional): Upper bound on the length of a block.
+
+    Returns:
+        list: Blocks as lists of slot indices, in time order.
+    """
+    order = sorted(range(len(slot_list)), key=lambda j: slot_list[j][0])
+    if not order:
+        return []
+    ordered_states = availability_matrix.states[:, order]
+    same_as_previous = np.all(ordered_states[:, 1:] == ordered_states[:, :-1], axis=0)
+
+    blocks = [[order[0]]]
+    block_minutes = (slot_list[order[0]][1] - slot_list[order[0]][0]).total_seconds() / 60
+    for k in range(1, len(order)):
+        j, prev = order[k], order[k - 1]
+        minutes = (slot_list[j][1] - slot_list[j][0]).total_seconds() / 60
+        if (same_as_previous[k - 1]
+                and slot_list[prev][1] == slot_list[j][0]
+                and slot_list[prev][0].date() == slot_list[j][0].date()
+                and block_minutes + minutes <= max_block_minutes):
+            blocks[-1].append(j)
+            block_minutes += minutes
+        else:
+            blocks.append([j])
+            block_minutes = minutes
+    return blocks
+
+
+def expand_schedule(schedule_data, blocks, block_list, slot_list):
+    """
+    Expands a schedule solved over blocks back to the original slot grid.
+
+    Args:
+        schedule_data (list): Schedule entries whose 'Shift Start'/'Shift End' are block bounds.
+        blocks (list): Output of aggregate_slots().
+        block_list (list): Slot tuples (start_dt, end_dt) of the blocks.
+        slot_list (list): Original list of time slots.
+
+    Returns:
+        list: Schedule entries with one entry per original slot.
+    """
+    block_of = {block_slot: b for b, block_slot in enumerate(block_list)}
+    expanded = []
+    for entry in schedule_data:
+        b = block_of[(entry['Shift Start'], entry['Shift End'])]
+        for j in blocks[b]:
+            start_dt, end_dt = slot_list[j]
+            expanded.append({
+                'Shift Start': start_dt,
+                'Shift End': end_dt,
+                'Assigned To': entry['Assigned To']
+            })
+    expanded.sort(key=lambda e: e['Shift Start'])
+    return expanded
+
+
+def collapse_schedule(schedule_data, participants, blocks, block_list, slot_list):
+    """
+    Maps a schedule on the original slot grid onto blocks, e.g. to use it as a hint.
+
+    A participant is put on a block when assigned to at least half of its slots.
+
+    Args:
+        schedule_data (list): Schedule entries on the original slot grid.
+        participants (list): List of participant dictionaries.
+        blocks (list): Output of aggregate_slots().
+        block_list (list): Slot tuples (start_dt, end_dt) of the blocks.
+        slot_list (list): Original list of time slots.
+
+    Returns:
+        list: Schedule entries with one entry per staffed block.
+    """
+    assigned_rows = schedule_to_rows(schedule_data, participants, slot_list)
+    collapsed = []
+    for block, (start_dt, end_dt) in zip(blocks, block_list):
+        slot_count = {}
+        for j in block:
+            for i in assigned_rows.get(j, ()):
+                slot_count[i] = slot_count.get(i, 0) + 1
+        rows = sorted(i for i, count in slot_count.items() if 2 * count >= len(block))
+        if rows:
+            collapsed.append({
+                'Shift Start': start_dt,
+                'Shift End': end_dt,
+                'Assigned To': ", ".join(participants[i]['name'] for i in rows)
+            })
+    return collapsed
+
+
+def assign_shifts_aggregated(
+    participants,
+    slot_list,
+    num_required,
+    min_required,
+    max_hours,
+    max_hours_per_day,
+    solver_time_limit,
+    solver_num_threads,
+    max_block_minutes=60,
+    solve=assign_shifts,
+    availability_index=None,
+    hint_schedule=None,
+    on_solution=None,
+    **kwargs
+):
+    """
+    Solves over aggregated slot blocks and expands the result to the original slots.
+
+    Consecutive slots with identical eligible sets are merged by aggregate_slots(), the solver
+    works on the blocks with minute-weighted hour constraints (see the slot_weights argument
+    of assign_shifts), and the result is expanded back by expand_schedule(). Everyone assigned
+    to a block covers all of its slots, which is why blocks are capped at max_block_minutes
+    (and at max_hours_per_day).
+
+    This is a heuristic: nobody can work only part of a block, so an hour cap or a shift
+    boundary falling inside a block can make the optimum over the blocks lower than the
+    optimum over the original slots. With max_block_minutes equal to the slot length the
+    optimum is unchanged.
+
+    Args:
+        participants, slot_list, num_required, min_required, max_hours, max_hours_per_day,
+        solver_time_limit, solver_num_threads: Same as in assign_shifts().
+        max_block_minutes (int, optional): Upper bound on the length of a block.
+        solve (callable, optional): Solver to run on the blocks, assign_shifts() or
+            core.symmetry.assign_shifts_grouped().
+        availability_index (AvailabilityIndex, optional): Index built once per poll.
+        hint_schedule (list, optional): Hint on the original slot grid; collapsed onto the blocks.
+        on_solution (callable, optional): Progress callback; schedules are expanded before it is called.
+        **kwargs: Objective weights passed on to solve.
+
+    Returns:
+        tuple: (schedule_data, total_hours), or (None, None) if no feasible solution is found.
+    """
+    if not participants or not slot_list:
+        return None, None
+
+    matrix = AvailabilityMatrix(participants, slot_list, availability_index)
+    if max_hours_per_day > 0:
+        max_block_minutes = min(max_block_minutes, max_hours_per_day * 60)
+    blocks = aggregate_slots(matrix, slot_list, max_block_minutes)
+    block_list = [(slot_list[b[0]][0], slot_list[b[-1]][1]) for b in blocks]
+    block_matrix = matrix.subset([b[0] for b in blocks], block_list)
+    if hint_schedule:
+        hint_schedule = collapse_schedule(hint_schedule, participants, blocks, block_list, slot_list)
+
+    block_on_solution = None
+    if on_solution:
+        def block_on_solution(progress):
+            progress['schedule_data'] = expand_schedule(progress['schedule_data'], blocks, block_list, slot_list)
+            on_solution(progress)
+
+    schedule_data, total_hours = solve(
+        participants=participants,
+        slot_list=block_list,
+        num_required=num_required,
+        min_required=min_required,
+        max_hours=max_hours,
+        max_hours_per_day=max_hours_per_day,
+        solver_time_limit=solver_time_limit,
+        solver_num_threads=solver_num_threads,
+        availability_matrix=block_matrix,
+        slot_weights=[len(b) for b in blocks],
+        hint_schedule=hint_schedule,
+        on_solution=block_on_solution,
+        **kwargs
+    )
+    if schedule_data is None:
+        return None, None
+    return expand_schedule(schedule_data, blocks, block_list, slot_list), total_hours
@@ -0,0 +1,208 @@
+import itertools
+import multiprocessing
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from core.availability_matrix import AvailabilityMatrix, IF_NEEDED
+from core.scheduler import assign_shifts, group_slots_by_day, schedule_to_rows, SolveControl
+
+# Objective weights tried by run_sweep() by default (day_coverage_reward keeps its default);
+# the points without gap penalty and continuity reward are pure coverage problems (see core.flow)
+DEFAULT_WEIGHT_GRID = {
+    'gap_penalty': (0, 3, 6),
+    'coverage_reward': (0, 2, 4),
+    'ifNeeded_penalty': (0, 2, 5),
+}
+
+
+def weight_grid(grid=None):
+    """
+    Expands a grid of objective weights into a list of weight settings.
+
+    Args:
+        grid (dict, optional): Maps an assign_shifts weight argument to the values to try.
+            Defaults to DEFAULT_WEIGHT_GRID.
+
+    Returns:
+        list: One dict of weight arguments per combination.
+    """
+    grid = grid or DEFAULT_WEIGHT_GRID
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+# Set in each worker process by _init_point()
+_shared = {}
+
+
+def schedule_metrics(schedule_data, total_hours, participants, slot_list, availability_matrix):
+    """
+    Summarises a schedule with the numbers compared in the sweep table.
+
+    Args:
+        schedule_data (list): Schedule in the assign_shifts output format.
+        total_hours (dict): Maps participant names to their assigned hours.
+        participants (list): List of participant dictionaries.
+        slot_list (list): List of time slots as tuples (start_dt, end_dt).
+        availability_matrix (AvailabilityMatrix): Matrix over participants and slot_list.
+
+    Returns:
+        dict: With keys:
+            - 'coverage': percentage of slots with any available person that are staffed,
+            - 'gaps': number of breaks inside someone's working day,
+            - 'if_needed': number of assignments in 'ifNeeded' slots,
+            - 'hour_spread': difference between the most and the least hours among available people.
+    """
+    states = availability_matrix.states
+    assigned_rows = schedule_to_rows(schedule_data, participants, slot_list)
+
+    coverable = int(states.any(axis=0).sum())
+    staffed = sum(1 for rows in assigned_rows.values() if rows)
+
+    gaps = 0
+    for slots_idx in group_slots_by_day(slot_list).values():
+        blocks = defaultdict(int)
+        previous = set()
+        for j in slots_idx:
+            current = assigned_rows.get(j, set())
+            for i in current - previous:
+                blocks[i] += 1
+            previous = current
+        gaps += sum(count - 1 for count in blocks.values())
+
+    if_needed = sum(
+        1 for j, rows in assigned_rows.items() for i in rows if states[i, j] == IF_NEEDED
+    )
+
+    hours = [total_hours.get(p['name'], 0.0) for i, p in enumerate(participants) if states[i].any()]
+    return {
+        'coverage': 100.0 * staffed / coverable if coverable else 0.0,
+        'gaps': gaps,
+        'if_needed': if_needed,
+        'hour_spread': max(hours) - min(hours) if hours else 0.0,
+    }
+
+
+def pareto_front(results):
+    """
+    Marks the results that no other result beats on every metric.
+
+    Higher coverage and lower gaps, ifNeeded usage and hour spread are better.
+    Sets result['pareto'] on every result in place.
+
+    Args:
+        results (list): Output of run_sweep().
+    """
+    def key(r):
+        return (-r['coverage'], r['gaps'], r['if_needed'], r['hour_spread'])
+
+    for r in results:
+        kr = key(r)
+        r['pareto'] = not any(
+            all(a <= b for a, b in zip(key(o), kr)) and key(o) != kr
+            for o in results if o is not r
+        )
+
+
+def _init_point(stop_event):
+    _shared['stop'] = stop_event
+
+
+def _solve_point(job):
+    """
+    Solves a single sweep point; runs in a worker process.
+    Pure coverage points are solved as a min-cost flow by assign_shifts() (see core.flow).
+    """
+    weights = job.pop('weights')
+    control = SolveControl(stop_event=_shared['stop'])
+    schedule_data, total_hours = assign_shifts(**job, **weights, control=control)
+    return weights, schedule_data, total_hours
+
+
+def run_sweep(
+    participants,
+    slot_list,
+    num_required,
+    min_required,
+    max_hours,
+    max_hours_per_day,
+    solver_time_limit,
+    max_workers,
+    grid=None,
+    availability_index=None,
+    on_result=None,
+    control=None
+):
+    """
+    Solves the schedule for every weight setting of a grid in parallel processes.
+
+    Each point is an independent assign_shifts run with a single CP-SAT worker, so
+    max_workers processes keep at most max_workers cores busy.
+
+    Args:
+        participants, slot_list, num_required, min_required, max_hours, max_hours_per_day:
+            Same as in assign_shifts().
+        solver_time_limit (int): Time limit of every single solve in seconds.
+        max_workers (int): Number of worker processes (capped by the CPU count and the grid size).
+        grid (dict, optional): Weight grid, see weight_grid().
+        availability_index (AvailabilityIndex, optional): Index built once per poll.
+        on_result (callable, optional): Called with (done, total) after every finished point.
+        control (SolveControl, optional): When stop() is called, points that have not started
+            are dropped, running ones stop with their best solution so far, and the results
+            finished up to then are returned.
+
+    Returns:
+        list: Result dicts with the weight arguments, the schedule_metrics() keys, 'pareto',
+            'schedule_data' and 'total_hours'. Points without a solution are left out.
+    """
+    points = weight_grid(grid)
+    if not participants or not slot_list or not points:
+        return []
+
+    availability_matrix = AvailabilityMatrix(participants, slot_list, availability_index)
+    common = dict(
+        participants=participants,
+        slot_list=slot_list,
+        num_required=num_required,
+        min_required=min_required,
+        max_hours=max_hours,
+        max_hours_per_day=max_hours_per_day,
+        solver_time_limit=solver_time_limit,
+        solver_num_threads=1,
+        availability_matrix=availability_matrix,
+    )
+    max_workers = max(1, min(max_workers, multiprocessing.cpu_count(), len(points)))
+
+    stop_event = multiprocessing.Event()
+    results = []
+    executor = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_point, initargs=(stop_event,))
+    try:
+        pending = {executor.submit(_solve_point, dict(common, weights=weights)) for weights in points}
+        while pending:
+            if control is not None and control.stop_requested and not stop_event.is_set():
+                stop_event.set()
+                for future in pending:
+                    future.cancel()
+            done, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.cancelled():
+                    continue
+                weights, schedule_data, total_hours = future.result()
+                if schedule_data is not None:
+                    result = dict(weights)
+                    result.update(schedule_metrics(
+                        schedule_data, total_hours, participants, slot_list, availability_matrix
+                    ))
+                    result['schedule_data'] = schedule_data
+                    result['total_hours'] = total_hours
+                    results.append(result)
+                if on_result:
+                    on_result(len(points) - len(pending), len(points))
+    finally:
+        # note: the stop event reaches every running CP-SAT search, so the pool shuts down at once
+        stop_event.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    pareto_front(results)
+    results.sort(key=lambda r: (not r['pareto'], -r['coverage'], r['gaps']))
+    return results
@@ -0,0 +1,321 @@
+import numpy as np
+from ortools.sat.python import cp_model
+from collections import defaultdict
+
+from core.availability_matrix import AvailabilityMatrix, IF_NEEDED
+from core.pruning import prune_availability
+from core.scheduler import (
+    group_slots_by_day, add_coverage_terms, build_schedule, schedule_to_rows, solve_model
+)
+
+
+def group_participants(availability_matrix, caps=None):
+    """
+    Groups participants whose availability is identical over the matrix slots.
+
+    Args:
+        availability_matrix (AvailabilityMatrix): Matrix over the participants and slots being solved.
+        caps (list, optional): Hour cap of each participant in minutes; participants with different
+            caps are never grouped.
+
+    Returns:
+        list: Equivalence classes as lists of participant indices, ordered by their first member.
+            Participants without any eligible slot are left out.
+    """
+    classes = {}
+    for i, row in enumerate(availability_matrix.states):
+        if not row.any():
+            continue
+        key = (row.tobytes(), caps[i] if caps is not None else None)
+        classes.setdefault(key, []).append(i)
+    return list(classes.values())
+
+
+def split_class_counts(classes, class_counts, day_to_slots_idx, slot_minutes, caps, max_minutes_per_day,
+                       repair_time_limit=1.0):
+    """
+    Splits per-class slot counts back across the individual class members.
+
+    A greedy, deterministic pass comes first. Days and slots are processed in time order;
+    members already working the previous slot keep going first, new blocks go to members
+    that have not worked that day yet, and nobody is given a slot that would exceed their
+    cap or max_minutes_per_day. The greedy pass can strand counts the class budgets allow
+    (e.g. when one member used up their hours before a slot that needs everybody), so a class
+    it leaves short is split again by a small CP-SAT assignment (see _repair_class()).
+
+    Args:
+        classes (list): Output of group_participants().
+        class_counts (dict): Maps (class index, slot index) to the number of members to assign.
+        day_to_slots_idx (dict): Output of group_slots_by_day().
+        slot_minutes (list): Duration of each slot in minutes.
+        caps (list): Cap of each participant in minutes over the entire period.
+        max_minutes_per_day (int): Maximum minutes per participant per day.
+        repair_time_limit (float, optional): Time limit of the repair of one class in seconds.
+
+    Returns:
+        tuple: (assigned_rows, missing) where assigned_rows maps a slot index to the list of
+            assigned participant indices and missing maps a slot index to the number of
+            assignments that could not be placed (empty when the split is complete).
+    """
+    needs_by_class = defaultdict(dict)
+    for (c, j), need in class_counts.items():
+        needs_by_class[c][j] = need
+    assigned_rows = defaultdict(list)
+    missing = defaultdict(int)
+
+    for c, members in enumerate(classes):
+        needs = needs_by_class.get(c, {})
+        rows = _split_greedy(members, needs, day_to_slots_idx, slot_minutes, caps, max_minutes_per_day)
+        if any(len(rows.get(j, ())) < need for j, need in needs.items()):
+            rows = _repair_class(
+                members, needs, day_to_slots_idx, slot_minutes, caps, max_minutes_per_day, rows, repair_time_limit
+            )
+        for j, need in needs.items():
+            if len(rows.get(j, ())) < need:
+                missing[j] += need - len(rows.get(j, ()))
+        for j, chosen in rows.items():
+            assigned_rows[j].extend(chosen)
+    return assigned_rows, dict(missing)
+
+
+def _split_greedy(members, needs, day_to_slots_idx, slot_minutes, caps, max_minutes_per_day):
+    remaining_total = {i: caps[i] for i in members}
+    rows = defaultdict(list)
+    for d in sorted(day_to_slots_idx):
+        remaining_day = {i: max_minutes_per_day for i in members}
+        previous = set()
+        worked_today = set()
+        for j in day_to_slots_idx[d]:
+            need = needs.get(j, 0)
+            if not need:
+                previous = set()
+                continue
+            minutes = slot_minutes[j]
+            fits = [
+                i for i in members
+                if remaining_total[i] >= minutes and remaining_day[i] >= minutes
+            ]
+            continuing = sorted(
+                (i for i in fits if i in previous),
+                key=lambda i: (-remaining_day[i], -remaining_total[i], i)
+            )
+            starting = sorted(
+                (i for i in fits if i not in previous),
+                key=lambda i: (i in worked_today, -remaining_total[i], -remaining_day[i], i)
+            )
+            chosen = (continuing + starting)[:need]
+            for i in chosen:
+                remaining_total[i] -= minutes
+                remaining_day[i] -= minutes
+                worked_today.add(i)
+                rows[j].append(i)
+            previous = set(chosen)
+    return rows
+
+
+def _repair_class(members, needs, day_to_slots_idx, slot_minutes, caps, max_minutes_per_day, rows, time_limit):
+    """
+    Exact split of one class: places as many of its counts as the members' caps allow, then
+    as few blocks as possible. Starts from the greedy split and keeps it if nothing better is found.
+    """
+    model = cp_model.CpModel()
+    x = {(i, j): model.NewBoolVar(f'x_{i}_{j}') for j in needs for i in members}
+    for j, need in needs.items():
+        model.Add(sum(x[(i, j)] for i in members) <= need)
+    starts = []
+    for i in members:
+        model.Add(sum(var * slot_minutes[j] for (ii, j), var in x.items() if ii == i) <= caps[i])
+        for slots_idx in day_to_slots_idx.values():
+            day_vars = [x[(i, j)] for j in slots_idx if (i, j) in x]
+            if not day_vars:
+                continue
+            model.Add(sum(x[(i, j)] * slot_minutes[j] for j in slots_idx if (i, j) in x) <= max_minutes_per_day)
+            for k, j in enumerate(slots_idx):
+                if (i, j) not in x:
+                    continue
+                # note: a block starts unless the member also works the directly preceding slot
+                if k == 0 or (i, slots_idx[k - 1]) not in x:
+                    starts.append(x[(i, j)])
+                else:
+                    start = model.NewBoolVar(f'start_{i}_{j}')
+                    model.Add(start >= x[(i, j)] - x[(i, slots_idx[k - 1])])
+                    starts.append(start)
+    placed = sum(x.values())
+    model.Maximize(len(starts) * placed - sum(starts))
+    greedy = {(i, j) for j, chosen in rows.items() for i in chosen}
+    for key, var in x.items():
+        model.AddHint(var, key in greedy)
+
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = time_limit
+    solver.parameters.num_search_workers = 1
+    if solver.Solve(model) not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        return rows
+    repaired = defaultdict(list)
+    for (i, j), var in x.items():
+        if solver.Value(var):
+            repaired[j].append(i)
+    if sum(map(len, repaired.values())) < len(greedy):
+        return rows
+    return repaired
+
+
+def assign_shifts_grouped(
+    participants,
+    slot_list,
+    num_required,
+    min_required,
+    max_hours,
+    max_hours_per_day,
+    solver_time_limit,
+    solver_num_threads,
+    gap_penalty=3,
+    coverage_reward=2,
+    day_coverage_reward=2,
+    ifNeeded_penalty=2,
+    availability_index=None,
+    availability_matrix=None,
+    slot_weights=None,
+    max_hours_by_participant=None,
+    hint_schedule=None,
+    on_solution=None,
+    control=None,
+    solver_params=None,
+    prune=True
+):
+    """
+    Symmetry-reduced variant of assign_shifts with the same arguments and return value.
+
+    Participants with identical availability form one equivalence class. Instead of a Boolean
+    per person and slot, the model has one integer count per class and slot, and the hour caps
+    become per-class budgets (the sum of the members' caps). Participants with different caps
+    (max_hours_by_participant, or caps tightened by pruning) are never in the same class. The
+    solved counts are then split back across the class members by split_class_counts().
+
+    The gap penalty is modelled per class as the number of blocks exceeding the class size,
+    which is the smallest penalty any split can reach; the split aims for it but does not
+    guarantee it. Assignments the split can not place, and slots that end up below
+    min_required because of them, are left out and reported in control.dropped as
+    {'assignments': count, 'slots': [slot indices]}. A hint_schedule is loaded as per-class
+    counts. With prune, pairs that can never be staffed are dropped first (see core.pruning).
+
+    Returns:
+        tuple: (schedule_data, total_hours), or (None, None) if no feasible solution is found.
+    """
+    if not participants or not slot_list:
+        return None, None
+
+    model = cp_model.CpModel()
+
+    slot_minutes = [int((end_dt - start_dt).total_seconds() // 60) for start_dt, end_dt in slot_list]
+    weights = slot_weights if slot_weights is not None else [1] * len(slot_list)
+    max_minutes = int(max_hours * 60)
+    max_minutes_per_day = int(max_hours_per_day * 60)
+
+    num_shifts = len(slot_list)
+    if availability_matrix is None or availability_matrix.shape != (len(participants), num_shifts):
+        availability_matrix = AvailabilityMatrix(participants, slot_list, availability_index)
+    caps = [max_minutes] * len(participants)
+    if max_hours_by_participant is not None:
+        caps = [min(max_minutes, int(round(hours * 60))) for hours in max_hours_by_participant]
+    if prune:
+        availability_matrix, pruned_caps, report = prune_availability(
+            availability_matrix, slot_list, min_required, max_hours, max_hours_per_day
+        )
+        caps = [min(cap, int(round(hours * 60))) for cap, hours in zip(caps, pruned_caps)]
+        if control is not None:
+            control.pruning = report
+    states = availability_matrix.states
+    classes = group_participants(availability_matrix, caps)
+
+    # Decision variables: counts[c,j] = number of class members assigned to slot j
+    counts = {}
+    vars_by_slot = defaultdict(list)
+    vars_by_class = defaultdict(list)
+    ifNeeded_counts = []
+    for c, members in enumerate(classes):
+        row = states[members[0]]
+        upper = min(len(members), num_required)
+        for j in np.nonzero(row)[0]:
+            j = int(j)
+            counts[(c, j)] = model.NewIntVar(0, upper, f'count_c{c}_s{j}')
+            vars_by_slot[j].append(counts[(c, j)])
+            vars_by_class[c].append(counts[(c, j)] * slot_minutes[j])
+            if row[j] == IF_NEEDED:
+                ifNeeded_counts.append(counts[(c, j)] * weights[j])
+
+    shift_assigned = {}
+    for j in range(num_shifts):
+        shift_assigned[j] = model.NewBoolVar(f'shift_assigned_{j}')
+        vars_in_shift = vars_by_slot.get(j, [])
+        if vars_in_shift:
+            num_assigned = sum(vars_in_shift)
+            model.Add(num_assigned >= min_required).OnlyEnforceIf(shift_assigned[j])
+            model.Add(num_assigned == 0).OnlyEnforceIf(shift_assigned[j].Not())
+            model.Add(num_assigned <= num_required).OnlyEnforceIf(shift_assigned[j])
+        else:
+            model.Add(shift_assigned[j] == 0)
+
+    day_to_slots_idx = group_slots_by_day(slot_list)
+
+    # Hour budgets scaled by class size, and block counting for the gap penalty
+    extra_blocks = []
+    for c, members in enumerate(classes):
+        size = len(members)
+        model.Add(sum(vars_by_class[c]) <= sum(caps[i] for i in members))
+        for d, slots_idx in day_to_slots_idx.items():
+            day_slots = [j for j in slots_idx if (c, j) in counts]
+            if not day_slots:
+                continue
+            model.Add(sum(counts[(c, j)] * slot_minutes[j] for j in day_slots) <= size * max_minutes_per_day)
+
+            starts = []
+            for idx_in_day, j in enumerate(slots_idx):
+                if (c, j) not in counts:
+                    continue
+                start = model.NewIntVar(0, size, f'start_c{c}_s{j}')
+                j_prev = slots_idx[idx_in_day - 1] if idx_in_day > 0 else None
+                if j_prev is None or (c, j_prev) not in counts:
+                    model.Add(start == counts[(c, j)])
+                else:
+                    model.Add(start >= counts[(c, j)] - counts[(c, j_prev)])
+                starts.append(start)
+            ebd = model.NewIntVar(0, len(starts) * size, f'extra_blocks_c{c}_d{d}')
+            model.Add(ebd >= sum(starts) - size)
+            extra_blocks.append(ebd)
+
+    sum_of_continuity, sum_of_covered_days = add_coverage_terms(
+        model, shift_assigned, day_to_slots_idx, slot_weights, staffable=set(vars_by_slot)
+    )
+
+    model.Maximize(
+        sum(var * weights[j] for (_, j), var in counts.items())
+        + coverage_reward * sum_of_continuity
+        - gap_penalty * sum(extra_blocks)
+        + day_coverage_reward * sum_of_covered_days
+        - ifNeeded_penalty * sum(ifNeeded_counts)
+    )
+
+    if hint_schedule:
+        hinted_rows = schedule_to_rows(hint_schedule, participants, slot_list)
+        for (c, j), var in counts.items():
+            model.AddHint(var, min(len(hinted_rows.get(j, set()) & set(classes[c])), num_required))
+        for j, var in shift_assigned.items():
+            model.AddHint(var, 1 if hinted_rows.get(j) else 0)
+
+    def decode(value):
+        class_counts = {key: value(var) for key, var in counts.items() if value(var) > 0}
+        assigned_rows, dropped = split_class_counts(
+            classes, class_counts, day_to_slots_idx, slot_minutes, caps, max_minutes_per_day
+        )
+        for j in list(assigned_rows):
+            if len(assigned_rows[j]) < min_required:
+                dropped[j] = dropped.get(j, 0) + len(assigned_rows[j])
+                del assigned_rows[j]
+        if control is not None:
+            control.dropped = {'assignments': sum(dropped.values()), 'slots': sorted(dropped)} if dropped else None
+        return build_schedule(participants, slot_list, assigned_rows)
+
+    return solve_model(
+        model, solver_time_limit, solver_num_threads, decode, on_solution, control, solver_params
+    )
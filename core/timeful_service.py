@@ -1,7 +1,9 @@
-import requests
 from datetime import timedelta
 from dateutil import parser, tz
 
+from core import http_client
+from core.availability_index import merge_intervals
+
 def convert_to_local(time_str, time_offset_hours):
     """
     Convert an ISO formatted UTC time string to local time.
@@ -22,7 +24,7 @@ def convert_to_local(time_str, time_offset_hours):
     except Exception:
         return None
 
-def fetch_event_data(user_url):
+def fetch_event_data(user_url, on_progress=None, cancel=None):
     """
     Process a user-provided URL to retrieve event and response data.
 
@@ -31,14 +33,35 @@ def fetch_event_data(user_url):
 
     Parameters:
         user_url (str): The URL provided by the user.
+        on_progress (callable, optional): Called as on_progress(received, total) with the bytes
+            received so far over both requests (see http_client.get_json()).
+        cancel (threading.Event, optional): Cancels the download when set.
 
     Returns:
         dict: A dictionary with keys 'eventData' and 'responsesData'.
+
+    Raises:
+        Exception: If an HTTP request fails.
+        http_client.FetchCancelled: If cancel was set.
     """
     api_event_url = user_url.replace('/e/', '/api/events/')
-    
-    event_resp = requests.get(api_event_url)
-    event_data = event_resp.json()
+    # (received, total) bytes of the documents already fetched
+    done = [0, 0]
+
+    def fetch(url, **kwargs):
+        last = [0, 0]
+
+        def track(received, total):
+            last[:] = received, total
+            if on_progress is not None:
+                on_progress(done[0] + received, done[1] + total)
+
+        data = http_client.get_json(url, on_progress=track, cancel=cancel, **kwargs)
+        done[0] += last[0]
+        done[1] += last[1]
+        return data
+
+    event_data = fetch(api_event_url)
     
     dates = event_data.get('dates', [])
     if not dates:
@@ -52,29 +75,30 @@ def fetch_event_data(user_url):
     
     responses_url = api_event_url + '/responses'
     
-    resp_resp = requests.get(
+    responses_data = fetch(
         responses_url,
         params={'timeMin': time_min_str, 'timeMax': time_max_str}
     )
-    responses_data = resp_resp.json()
     
     return {
         'eventData': event_data,
         'responsesData': responses_data
     }
 
-def process_data(json_response, time_offset_hours=0):
+def process_data(json_response, time_offset_hours=0, on_progress=None):
     """
     Process JSON data from a Timeful event.
 
     Parameters:
         json_response (dict): JSON data containing event and response information.
         time_offset_hours (int, optional): Offset in hours for local time conversion. Defaults to 0.
+        on_progress (callable, optional): Called as on_progress(parsed, total) after every respondent.
 
     Returns:
         tuple: A tuple containing:
             - participants (list): List of dictionaries with keys 'name', 'email',
-                'availabilities' (list of (start, end) tuples), and 'ifNeeded'.
+                'availabilities' and 'ifNeeded' (sorted lists of disjoint (start, end) tuples,
+                adjacent slots merged).
             - poll_dates (list): List of date strings in "YYYY-MM-DD" format.
             - day_ranges (dict): Dictionary mapping each date string to a tuple (local_start, local_end).
     """
@@ -123,6 +147,15 @@ def process_data(json_response, time_offset_hours=0):
             'email': possible_email.strip()
         }
     
+    # note: respondents share the poll's slot timestamps, every distinct string is parsed once
+    local_slots = {}
+
+    def to_slot(time_str):
+        if time_str not in local_slots:
+            start_dt = convert_to_local(time_str, time_offset_hours)
+            local_slots[time_str] = (start_dt, start_dt + timedelta(minutes=15)) if start_dt else None
+        return local_slots[time_str]
+
     participants = []
     for key_in_responses, resp_val in responses_data.items():
         info_dict = user_info_map.get(key_in_responses, {})
@@ -136,23 +169,16 @@ def process_data(json_response, time_offset_hours=0):
             name = "Brak imienia"
         if not email.strip():
             email = "Brak emaila"
-        avail = []
-        for t in resp_val.get('availability', []):
-            start_dt = convert_to_local(t, time_offset_hours)
-            if start_dt:
-                end_dt = start_dt + timedelta(minutes=15)
-                avail.append((start_dt, end_dt))
-        if_need = []
-        for t in resp_val.get('ifNeeded', []):
-            start_dt = convert_to_local(t, time_offset_hours)
-            if start_dt:
-                end_dt = start_dt + timedelta(minutes=15)
-                if_need.append((start_dt, end_dt))
+        # info: adjacent 15-minute points are coalesced into maximal intervals
+        avail = merge_intervals([slot for slot in map(to_slot, resp_val.get('availability', [])) if slot])
+        if_need = merge_intervals([slot for slot in map(to_slot, resp_val.get('ifNeeded', [])) if slot])
         participants.append({
             'name': name,
             'email': email,
             'availabilities': avail,
             'ifNeeded': if_need
         })
+        if on_progress is not None:
+            on_progress(len(participants), len(responses_data))
     
     return participants, poll_dates, day_ranges
@@ -1,4 +1,5 @@
 import sys
+import multiprocessing
 from PyQt6.QtWidgets import QApplication, QDialog
 
 from UI.initial_setup_dialog import InitialSetupDialog
@@ -34,4 +35,6 @@ def main():
         sys.exit()
 
 if __name__ == "__main__":
+    # note: required for the solver process pools in the frozen (PyInstaller) build
+    multiprocessing.freeze_support()
     main()
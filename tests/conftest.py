@@ -0,0 +1,62 @@
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.scheduler import assign_shifts, build_day_slots, SolveControl
+
+
+def make_poll(num_participants=6, num_days=1, slot_minutes=15, hours=4, seed=1):
+    """
+    Builds a small deterministic poll: every participant is available in one or two
+    contiguous stretches per day, with an occasional 'ifNeeded' stretch.
+
+    Returns:
+        tuple: (participants, slot_list)
+    """
+    rng = random.Random(seed)
+    slots_per_day = hours * 60 // slot_minutes
+    poll_dates, day_ranges = [], {}
+    for d in range(num_days):
+        day_start = datetime(2025, 3, 3 + d, 9)
+        date_str = day_start.date().isoformat()
+        poll_dates.append(date_str)
+        day_ranges[date_str] = (day_start, day_start + timedelta(hours=hours))
+
+    participants = []
+    for i in range(num_participants):
+        availabilities, if_needed = [], []
+        for date_str in poll_dates:
+            day_start = day_ranges[date_str][0]
+            for _ in range(rng.randint(1, 2)):
+                first = rng.randrange(slots_per_day)
+                length = rng.randint(2, slots_per_day // 2)
+                target = if_needed if rng.random() < 0.2 else availabilities
+                for k in range(first, min(slots_per_day, first + length)):
+                    start = day_start + timedelta(minutes=k * slot_minutes)
+                    target.append((start, start + timedelta(minutes=slot_minutes)))
+        participants.append({'name': f"P{i}", 'email': "", 'availabilities': availabilities, 'ifNeeded': if_needed})
+    _, slot_list = build_day_slots(participants, poll_dates, slot_minutes, day_ranges)
+    return participants, slot_list
+
+
+def schedule_objective(schedule_data, participants, slot_list, **limits):
+    """
+    Objective of a schedule on the original slot grid: assign_shifts() with every slot pinned.
+    """
+    control = SolveControl()
+    schedule, _ = assign_shifts(
+        participants=participants, slot_list=slot_list, solver_time_limit=10, solver_num_threads=1,
+        pinned_schedule=schedule_data, pinned_slots=slot_list, control=control, **limits
+    )
+    assert schedule is not None
+    return control.objective
+
+
+@pytest.fixture
+def poll():
+    return make_poll
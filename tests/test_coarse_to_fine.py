@@ -0,0 +1,21 @@
+from core.coarse_to_fine import assign_shifts_coarse_to_fine
+from core.scheduler import assign_shifts, SolveControl
+
+LIMITS = dict(num_required=2, min_required=1, max_hours=2, max_hours_per_day=1.5)
+
+
+def _solve(solve, participants, slot_list):
+    control = SolveControl()
+    solve(
+        participants=participants, slot_list=slot_list, solver_time_limit=30, solver_num_threads=1,
+        control=control, **LIMITS
+    )
+    assert control.objective == control.best_bound, "the solve must be proven optimal"
+    return control.objective
+
+
+def test_fine_stage_reaches_the_direct_optimum(poll):
+    for seed in range(1, 7):
+        participants, slot_list = poll(num_participants=8, hours=6, seed=seed)
+        direct = _solve(assign_shifts, participants, slot_list)
+        assert _solve(assign_shifts_coarse_to_fine, participants, slot_list) == direct
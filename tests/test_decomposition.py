@@ -0,0 +1,15 @@
+import time
+
+from core.decomposition import assign_shifts_decomposed
+
+
+def test_time_limit_bounds_the_whole_run(poll):
+    participants, slot_list = poll(num_participants=40, num_days=7, hours=10, seed=2)
+    started = time.monotonic()
+    schedule, _ = assign_shifts_decomposed(
+        participants=participants, slot_list=slot_list, num_required=2, min_required=1, max_hours=4,
+        max_hours_per_day=2, solver_time_limit=2, solver_num_threads=1, split_by='day'
+    )
+    assert schedule
+    # note: one worker solves the seven parts one after another; the margin covers process start-up
+    assert time.monotonic() - started < 2 + 3
@@ -0,0 +1,40 @@
+from conftest import schedule_objective
+
+import core.scheduler
+from core.scheduler import assign_shifts, SolveControl
+from core.sweep import weight_grid
+from core.flow import is_pure_coverage
+
+LIMITS = dict(num_required=2, min_required=1, max_hours=2, max_hours_per_day=1.5)
+PURE = dict(gap_penalty=0, coverage_reward=0)
+
+
+def _solve(participants, slot_list, **weights):
+    control = SolveControl()
+    schedule, _ = assign_shifts(
+        participants=participants, slot_list=slot_list, solver_time_limit=30, solver_num_threads=1,
+        control=control, **LIMITS, **weights
+    )
+    return schedule, control
+
+
+def test_pure_coverage_is_solved_as_a_flow(poll, monkeypatch):
+    participants, slot_list = poll(num_days=2, seed=4)
+
+    def no_cp_sat(*args, **kwargs):
+        raise AssertionError("a pure coverage problem must not build a CP-SAT model")
+
+    monkeypatch.setattr(core.scheduler, "ShiftModel", no_cp_sat)
+    schedule, control = _solve(participants, slot_list, **PURE)
+    monkeypatch.undo()
+
+    assert control.objective == control.best_bound
+    assert schedule_objective(schedule, participants, slot_list, **LIMITS, **PURE) == control.objective
+    # info: a relaxed solve always goes to CP-SAT; with nothing pinned no limit bends
+    _, cp_sat = _solve(participants, slot_list, **PURE, relax=True)
+    assert cp_sat.objective == control.objective
+
+
+def test_sweep_grid_has_pure_coverage_points(poll):
+    _, slot_list = poll()
+    assert any(is_pure_coverage(slot_list, LIMITS['min_required'], **weights) for weights in weight_grid())
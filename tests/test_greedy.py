@@ -0,0 +1,19 @@
+from datetime import datetime, timedelta
+
+from core.greedy import assign_shifts_greedy
+
+
+def test_scarce_slot_is_filled_before_the_hours_run_out():
+    start = datetime(2025, 3, 3, 9)
+    slot_list = [(start + timedelta(hours=k), start + timedelta(hours=k + 1)) for k in range(3)]
+    participants = [
+        # note: the only one who can take the last slot, and first in the ranking of the others
+        {'name': "A", 'email': "", 'availabilities': slot_list[:], 'ifNeeded': []},
+        {'name': "B", 'email': "", 'availabilities': slot_list[:2], 'ifNeeded': []},
+    ]
+    schedule, total_hours = assign_shifts_greedy(
+        participants, slot_list, num_required=1, min_required=1, max_hours=1, max_hours_per_day=1
+    )
+    staffed = {(e['Shift Start'], e['Shift End']): e['Assigned To'] for e in schedule}
+    assert staffed[slot_list[2]] == "A"
+    assert total_hours == {"A": 1.0, "B": 1.0}
@@ -0,0 +1,36 @@
+import core.scheduler
+from core.scheduler import assign_shifts, ModelCache, SolveControl
+
+
+def _solve(participants, slot_list, min_required, max_hours, model_cache=None):
+    control = SolveControl()
+    assign_shifts(
+        participants=participants, slot_list=slot_list, num_required=3, min_required=min_required,
+        max_hours=max_hours, max_hours_per_day=1.5, solver_time_limit=30, solver_num_threads=1,
+        control=control, model_cache=model_cache
+    )
+    return control
+
+
+def test_changing_the_limits_hits_the_cache(poll, monkeypatch):
+    participants, slot_list = poll(num_participants=8, seed=2)
+    built = []
+
+    class CountingShiftModel(core.scheduler.ShiftModel):
+        def __init__(self, *args, **kwargs):
+            built.append(self)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(core.scheduler, "ShiftModel", CountingShiftModel)
+    cache = ModelCache()
+    cache_builds = 0
+    pruned_slots = set()
+    for min_required, max_hours in ((1, 2), (2, 2), (3, 2), (1, 1), (2, 2)):
+        before = len(built)
+        cached = _solve(participants, slot_list, min_required, max_hours, cache)
+        cache_builds += len(built) - before
+        pruned_slots.update(cached.pruning['slots'])
+        fresh = _solve(participants, slot_list, min_required, max_hours)
+        assert cached.objective == cached.best_bound == fresh.objective == fresh.best_bound
+    assert pruned_slots, "the instance must have slots pruned for some min_required"
+    assert cache_builds == 1
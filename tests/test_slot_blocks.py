@@ -0,0 +1,37 @@
+from conftest import make_poll, schedule_objective
+
+from core.scheduler import assign_shifts, SolveControl
+from core.slot_blocks import assign_shifts_aggregated
+
+LIMITS = dict(num_required=2, min_required=1, max_hours=2, max_hours_per_day=1.5)
+
+
+def _optimum(participants, slot_list):
+    control = SolveControl()
+    schedule, _ = assign_shifts(
+        participants=participants, slot_list=slot_list, solver_time_limit=30, solver_num_threads=1,
+        control=control, **LIMITS
+    )
+    assert control.objective == control.best_bound, "the plain solve must be proven optimal"
+    return schedule_objective(schedule, participants, slot_list, **LIMITS)
+
+
+def _aggregated(participants, slot_list, max_block_minutes):
+    schedule, _ = assign_shifts_aggregated(
+        participants=participants, slot_list=slot_list, solver_time_limit=30, solver_num_threads=1,
+        max_block_minutes=max_block_minutes, **LIMITS
+    )
+    return schedule_objective(schedule, participants, slot_list, **LIMITS)
+
+
+def test_blocks_of_one_slot_keep_the_optimum():
+    participants, slot_list = make_poll(seed=3)
+    assert _aggregated(participants, slot_list, max_block_minutes=15) == _optimum(participants, slot_list)
+
+
+def test_blocks_are_a_heuristic_that_never_beats_the_optimum():
+    for seed in range(1, 7):
+        participants, slot_list = make_poll(seed=seed)
+        optimum = _optimum(participants, slot_list)
+        aggregated = _aggregated(participants, slot_list, max_block_minutes=60)
+        assert 0 < aggregated <= optimum
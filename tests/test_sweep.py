@@ -0,0 +1,20 @@
+import multiprocessing
+import threading
+import time
+
+from core.scheduler import SolveControl
+from core.sweep import run_sweep
+
+
+def test_stop_ends_running_points(poll):
+    participants, slot_list = poll(num_participants=40, num_days=7, hours=10, seed=2)
+    control = SolveControl()
+    threading.Timer(1.0, control.stop).start()
+    started = time.monotonic()
+    run_sweep(
+        participants=participants, slot_list=slot_list, num_required=2, min_required=1, max_hours=4,
+        max_hours_per_day=2, solver_time_limit=60, max_workers=2, control=control
+    )
+    assert time.monotonic() - started < 10
+    # note: the points that were running stopped too instead of finishing their 60 s in the background
+    assert not multiprocessing.active_children()